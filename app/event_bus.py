@@ -1,36 +1,587 @@
+import os
 import threading
-from collections import defaultdict
+import time
+import weakref
+from collections import deque
+
+from app.logger import app_logger as logger
+
+# Режимы доставки события подписчику
+DELIVERY_SYNC = "sync"                # в потоке публикации
+DELIVERY_MAIN_THREAD = "main_thread"  # в главном потоке Kivy, пачкой раз в кадр
+DELIVERY_WORKER = "worker"            # в фоновом потоке топика через ограниченную очередь
+
+DELIVERY_MODES = (DELIVERY_SYNC, DELIVERY_MAIN_THREAD, DELIVERY_WORKER)
+
+DEFAULT_WORKER_QUEUE_SIZE = 64
+
+# НОВОЕ: Инструментирование (включается env-переменной или enable_metrics())
+METRICS_ENV_VAR = "BEDROCK_EVENTBUS_METRICS"
+DEFAULT_SLOW_HANDLER_MS = 16.0          # бюджет одного кадра при 60 FPS
+SLOW_WARNING_INTERVAL = 5.0             # не чаще одного предупреждения на обработчик за N секунд
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500)  # + последний бакет "> 500"
+
+
+class _Subscription:
+    """
+    ИСПРАВЛЕНО: bound-методы хранятся через WeakMethod - подписка не удерживает
+    объект (экран, виджет) в памяти. Функции и lambda хранятся сильной ссылкой.
+    """
+    __slots__ = ("_callback", "_ref", "mode", "__weakref__")
+
+    def __init__(self, callback, mode, weak=True, on_dead=None):
+        self.mode = mode
+        if weak and getattr(callback, '__self__', None) is not None and hasattr(callback, '__func__'):
+            self._callback = None
+            self._ref = weakref.WeakMethod(callback, on_dead)
+        else:
+            self._callback = callback
+            self._ref = None
+
+    def get(self):
+        """Коллбэк или None, если владелец уже собран сборщиком мусора"""
+        if self._ref is None:
+            return self._callback
+        return self._ref()
+
+    def is_alive(self):
+        return self._ref is None or self._ref() is not None
+
+    def owner(self):
+        callback = self.get()
+        return getattr(callback, '__self__', None)
+
+
+class _Topic:
+    """
+    Подписчики одного события, разложенные по режимам доставки.
+    Кортежи заменяются целиком (copy-on-write), поэтому publish читает
+    их без блокировки.
+    """
+    __slots__ = ("name", "sync", "main_thread", "worker",
+                 "latest_only", "min_interval", "current", "has_current",
+                 "last_delivery", "flush_timer", "coalesced")
+
+    def __init__(self, name):
+        self.name = name
+        self.sync = ()
+        self.main_thread = ()
+        self.worker = ()
+
+        # НОВОЕ: "последнее значение побеждает" с ограничением частоты
+        self.latest_only = False
+        self.min_interval = 0.0
+        self.current = None
+        self.has_current = False
+        self.last_delivery = 0.0
+        self.flush_timer = None
+        self.coalesced = 0
+
+    def all(self):
+        return self.sync + self.main_thread + self.worker
+
+
+class _TopicWorker:
+    """Фоновый поток топика с ограниченной очередью (при переполнении вытесняется старейшее)"""
+
+    def __init__(self, bus, topic_name, maxsize):
+        self._bus = bus
+        self._topic_name = topic_name
+        self._queue = deque(maxlen=maxsize)
+        self._cond = threading.Condition(threading.Lock())
+        self._running = True
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"EventBus-{topic_name}", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, data):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(data)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                data = self._queue.popleft()
+
+            topic = self._bus._topics.get(self._topic_name)
+            if topic:
+                self._bus._dispatch(self._topic_name, topic.worker, data)
+
+
+class _EventBusMetrics:
+    """
+    НОВОЕ: Счётчики event bus: публикации и fan-out по топикам,
+    гистограмма латентности по обработчикам (фиксированные бакеты).
+    """
+
+    def __init__(self, slow_handler_ms=DEFAULT_SLOW_HANDLER_MS):
+        self.slow_handler_ms = slow_handler_ms
+        self._lock = threading.Lock()
+        self._topics = {}
+        self._handlers = {}
+        self._last_slow_warning = {}
+        self.started = time.time()
+
+    @staticmethod
+    def handler_name(callback):
+        owner = getattr(callback, '__self__', None)
+        func = getattr(callback, '__func__', callback)
+        name = getattr(func, '__qualname__', None) or repr(callback)
+        if owner is not None and type(owner).__name__ not in name:
+            name = f"{type(owner).__name__}.{name}"
+        elif owner is None and getattr(func, '__module__', None):
+            name = f"{func.__module__}.{name}"
+        return name
+
+    def record_publish(self, event_name):
+        with self._lock:
+            stats = self._topics.get(event_name)
+            if stats is None:
+                stats = self._topics[event_name] = {
+                    "published": 0, "delivered": 0, "fanout_total": 0, "fanout_max": 0
+                }
+            stats["published"] += 1
+
+    def record_fanout(self, event_name, fanout):
+        with self._lock:
+            stats = self._topics.get(event_name)
+            if stats is None:
+                return
+            stats["delivered"] += 1
+            stats["fanout_total"] += fanout
+            if fanout > stats["fanout_max"]:
+                stats["fanout_max"] = fanout
+
+    def record_call(self, event_name, callback, duration_ms, failed=False):
+        name = self.handler_name(callback)
+        key = (event_name, name)
+
+        bucket = len(LATENCY_BUCKETS_MS)
+        for i, upper in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= upper:
+                bucket = i
+                break
+
+        with self._lock:
+            stats = self._handlers.get(key)
+            if stats is None:
+                stats = self._handlers[key] = {
+                    "calls": 0, "errors": 0, "slow": 0,
+                    "total_ms": 0.0, "max_ms": 0.0,
+                    "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            stats["calls"] += 1
+            stats["total_ms"] += duration_ms
+            stats["histogram"][bucket] += 1
+            if duration_ms > stats["max_ms"]:
+                stats["max_ms"] = duration_ms
+            if failed:
+                stats["errors"] += 1
+
+            slow = duration_ms > self.slow_handler_ms
+            warn = False
+            if slow:
+                stats["slow"] += 1
+                now = time.monotonic()
+                if now - self._last_slow_warning.get(key, 0) >= SLOW_WARNING_INTERVAL:
+                    self._last_slow_warning[key] = now
+                    warn = True
+
+        if warn:
+            logger.warning(
+                f"⚠️ Slow EventBus handler {name} for '{event_name}': "
+                f"{duration_ms:.1f}ms (threshold {self.slow_handler_ms:.1f}ms, "
+                f"thread {threading.current_thread().name})"
+            )
+
+    def snapshot(self):
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            topics = {}
+            for event_name, stats in self._topics.items():
+                topic = dict(stats)
+                topic["fanout_avg"] = round(stats["fanout_total"] / stats["delivered"], 2) if stats["delivered"] else 0
+                topic["handlers"] = {}
+                topics[event_name] = topic
+
+            for (event_name, name), stats in self._handlers.items():
+                topic = topics.setdefault(event_name, {"handlers": {}})
+                topic["handlers"][name] = {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "slow": stats["slow"],
+                    "avg_ms": round(stats["total_ms"] / stats["calls"], 3) if stats["calls"] else 0,
+                    "max_ms": round(stats["max_ms"], 3),
+                    "histogram": dict(zip(labels, stats["histogram"])),
+                }
+
+        return {
+            "since": self.started,
+            "slow_handler_ms": self.slow_handler_ms,
+            "topics": topics,
+        }
+
 
 class EventBus:
     """
     Минимальный потокобезопасный pub-sub event bus.
     Сервисы, страницы и прочие компоненты могут подписываться на события по ключу.
+
+    ИСПРАВЛЕНО: Коллбэки вызываются БЕЗ удержания блокировки реестра.
+    Режим доставки задаётся при подписке:
+      - sync:        сразу в потоке публикации (только для дешёвых обработчиков)
+      - main_thread: в главном потоке Kivy, все события кадра - одним Clock-коллбэком
+      - worker:      в фоновом потоке топика через ограниченную очередь
+    Для main_thread и worker publish кладёт в очередь одну запись на топик,
+    независимо от количества и скорости обработчиков.
+
+    НОВОЕ: Топики, объявленные через declare_topic(latest_only=True, max_rate=N),
+    доставляются не чаще N раз в секунду - промежуточные значения отбрасываются,
+    итоговое значение окна доставляется из таймерного потока.
+    Текущее значение доступно через get_current() без подписки.
+
+    ИСПРАВЛЕНО: Bound-методы подписчиков хранятся слабыми ссылками - экраны,
+    которые никто не держит, собираются сборщиком мусора, а их подписки
+    удаляются при следующей публикации/подписке (subscriber_count() - живые).
     """
-    def __init__(self):
-        self._subscribers = defaultdict(list)
+    def __init__(self, worker_queue_size=DEFAULT_WORKER_QUEUE_SIZE):
+        self._topics = {}
         self._lock = threading.RLock()
+        self._worker_queue_size = worker_queue_size
+        self._workers = {}
+
+        # Топики с умершими weak-подписчиками - чистятся при следующем обращении
+        self._dead_topics = set()
+
+        # Очередь главного потока: (event_name, data)
+        self._main_queue = deque()
+        self._main_lock = threading.Lock()
+        self._main_scheduled = False
+
+        # НОВОЕ: None = инструментирование выключено (одна проверка на публикацию)
+        self._metrics = None
+        if os.environ.get(METRICS_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on"):
+            self.enable_metrics()
+
+    # ========================================
+    # ИНСТРУМЕНТИРОВАНИЕ
+    # ========================================
+
+    def enable_metrics(self, slow_handler_ms=DEFAULT_SLOW_HANDLER_MS):
+        """НОВОЕ: Включение счётчиков, гистограмм латентности и предупреждений о медленных обработчиках"""
+        if self._metrics is None:
+            self._metrics = _EventBusMetrics(slow_handler_ms)
+        else:
+            self._metrics.slow_handler_ms = slow_handler_ms
+        logger.info(f"EventBus metrics enabled (slow handler threshold: {slow_handler_ms}ms)")
+
+    def disable_metrics(self):
+        self._metrics = None
+
+    def snapshot(self):
+        """НОВОЕ: Снимок метрик по топикам и обработчикам (пустой, если выключено)"""
+        metrics = self._metrics
+        if metrics is None:
+            return {"enabled": False, "topics": {}}
+        result = metrics.snapshot()
+        result["enabled"] = True
+        for event_name, count in self.subscriber_count().items():
+            result["topics"].setdefault(event_name, {"handlers": {}})["live_subscribers"] = count
+        return result
+
+    def _get_topic(self, event_name):
+        topic = self._topics.get(event_name)
+        if topic is None:
+            topic = self._topics[event_name] = _Topic(event_name)
+        return topic
+
+    def declare_topic(self, event_name, latest_only=False, max_rate=None):
+        """
+        НОВОЕ: Объявление топика "последнее значение побеждает".
+        max_rate - максимум доставок в секунду: события внутри окна не доставляются,
+        подписчики получают одно итоговое (последнее) значение в конце окна.
+        """
+        with self._lock:
+            topic = self._get_topic(event_name)
+            topic.latest_only = latest_only
+            topic.min_interval = (1.0 / max_rate) if (latest_only and max_rate) else 0.0
+        return topic
+
+    def get_current(self, event_name, default=None):
+        """НОВОЕ: Текущее значение latest-only топика без подписки"""
+        topic = self._topics.get(event_name)
+        if topic is None or not topic.has_current:
+            return default
+        return topic.current
+
+    def set_current(self, event_name, data):
+        """НОВОЕ: Установка текущего значения latest-only топика без доставки подписчикам"""
+        with self._lock:
+            topic = self._get_topic(event_name)
+            topic.current = data
+            topic.has_current = True
+
+    def subscribe(self, event_name, callback, mode=DELIVERY_SYNC, weak=True):
+        """
+        Подписаться на событие. callback(event_data). mode: sync | main_thread | worker.
+        Bound-методы по умолчанию хранятся слабой ссылкой (weak=False - сильной).
+        """
+        if mode not in DELIVERY_MODES:
+            raise ValueError(f"Unknown delivery mode '{mode}' for '{event_name}'")
+
+        on_dead = lambda ref, name=event_name: self._mark_dead(name)
+        subscription = _Subscription(callback, mode, weak=weak, on_dead=on_dead)
 
-    def subscribe(self, event_name, callback):
-        """Подписаться на событие. callback(event_data)."""
         with self._lock:
-            self._subscribers[event_name].append(callback)
+            self._prune_dead()
+            topic = self._get_topic(event_name)
+            setattr(topic, mode, getattr(topic, mode) + (subscription,))
+
+            if mode == DELIVERY_WORKER and event_name not in self._workers:
+                self._workers[event_name] = _TopicWorker(self, event_name, self._worker_queue_size)
 
     def unsubscribe(self, event_name, callback):
         """Отписаться от события."""
         with self._lock:
-            if callback in self._subscribers[event_name]:
-                self._subscribers[event_name].remove(callback)
+            topic = self._topics.get(event_name)
+            if topic:
+                for mode in DELIVERY_MODES:
+                    subs = getattr(topic, mode)
+                    setattr(topic, mode, tuple(s for s in subs if s.is_alive() and s.get() != callback))
+
+    def unsubscribe_owner(self, owner):
+        """Отписать все bound-методы объекта (например выгруженного экрана). Возвращает число отписок."""
+        removed = 0
+        with self._lock:
+            for topic in self._topics.values():
+                for mode in DELIVERY_MODES:
+                    subs = getattr(topic, mode)
+                    kept = tuple(s for s in subs if s.is_alive() and s.owner() is not owner)
+                    removed += len(subs) - len(kept)
+                    setattr(topic, mode, kept)
+        return removed
+
+    # ========================================
+    # СЛАБЫЕ ПОДПИСКИ
+    # ========================================
+
+    def _mark_dead(self, event_name):
+        """Вызывается из weakref-финализатора: только отметка, без блокировок"""
+        self._dead_topics.add(event_name)
+
+    def _prune_dead(self):
+        """Удаление подписок, владельцы которых собраны сборщиком мусора"""
+        if not self._dead_topics:
+            return 0
+        removed = 0
+        with self._lock:
+            while self._dead_topics:
+                topic = self._topics.get(self._dead_topics.pop())
+                if topic is None:
+                    continue
+                for mode in DELIVERY_MODES:
+                    subs = getattr(topic, mode)
+                    kept = tuple(s for s in subs if s.is_alive())
+                    if len(kept) != len(subs):
+                        removed += len(subs) - len(kept)
+                        setattr(topic, mode, kept)
+        if removed:
+            logger.debug(f"EventBus pruned {removed} dead subscriptions")
+        return removed
+
+    def subscriber_count(self, event_name=None):
+        """НОВОЕ: Число живых подписчиков топика (или {топик: число} для всех)"""
+        self._prune_dead()
+        with self._lock:
+            if event_name is not None:
+                topic = self._topics.get(event_name)
+                return sum(1 for s in topic.all() if s.is_alive()) if topic else 0
+            return {
+                name: sum(1 for s in topic.all() if s.is_alive())
+                for name, topic in self._topics.items()
+            }
 
     def publish(self, event_name, data=None):
-        """Вызвать все коллбэки, подписанные на событие."""
+        """Доставить событие подписчикам согласно их режимам."""
+        if self._metrics is not None:
+            self._metrics.record_publish(event_name)
+
+        if self._dead_topics:
+            self._prune_dead()
+
+        topic = self._topics.get(event_name)
+        if topic is None:
+            return
+
+        if topic.latest_only:
+            self._publish_latest(topic, data)
+            return
+
+        self._deliver(topic, data)
+
+    def _deliver(self, topic, data):
+        """Раздача события по режимам доставки"""
+        event_name = topic.name
+        if self._metrics is not None:
+            self._metrics.record_fanout(
+                event_name, len(topic.sync) + len(topic.main_thread) + len(topic.worker)
+            )
+        if topic.main_thread:
+            self._enqueue_main(event_name, data)
+
+        if topic.worker:
+            worker = self._workers.get(event_name)
+            if worker:
+                worker.put(data)
+
+        if topic.sync:
+            self._dispatch(event_name, topic.sync, data)
+
+    # ========================================
+    # LATEST-ONLY ТОПИКИ
+    # ========================================
+
+    def _publish_latest(self, topic, data):
+        """Запоминаем значение; доставляем сразу или один раз в конце окна"""
+        with self._lock:
+            topic.current = data
+            topic.has_current = True
+
+            if topic.flush_timer is not None:
+                # Окно уже ждёт доставки - промежуточное значение отбрасывается
+                topic.coalesced += 1
+                return
+
+            now = time.monotonic()
+            wait = topic.last_delivery + topic.min_interval - now
+            if wait > 0:
+                topic.flush_timer = threading.Timer(wait, self._flush_latest, args=(topic,))
+                topic.flush_timer.daemon = True
+                topic.flush_timer.start()
+                return
+
+            topic.last_delivery = now
+
+        self._deliver(topic, data)
+
+    def _flush_latest(self, topic):
+        """Доставка итогового значения окна"""
         with self._lock:
-            for callback in self._subscribers[event_name][:]:  # копия списка, чтобы не рушился цикл
+            topic.flush_timer = None
+            topic.last_delivery = time.monotonic()
+            data = topic.current
+        self._deliver(topic, data)
+
+    def _dispatch(self, event_name, subscriptions, data):
+        """Вызов коллбэков вне блокировки реестра"""
+        metrics = self._metrics
+        if metrics is None:
+            for sub in subscriptions:
+                callback = sub.get()
+                if callback is None:
+                    self._dead_topics.add(event_name)
+                    continue
                 try:
                     callback(data)
                 except Exception as ex:
-                    # Можно логировать ошибку, если нужно
-                    from app.logger import app_logger as logger
                     logger.warning(f"EventBus callback error in '{event_name}': {ex}")
+            return
+
+        for sub in subscriptions:
+            callback = sub.get()
+            if callback is None:
+                self._dead_topics.add(event_name)
+                continue
+            failed = False
+            start = time.perf_counter()
+            try:
+                callback(data)
+            except Exception as ex:
+                failed = True
+                logger.warning(f"EventBus callback error in '{event_name}': {ex}")
+            metrics.record_call(event_name, callback, (time.perf_counter() - start) * 1000.0, failed)
+
+    # ========================================
+    # ДОСТАВКА В ГЛАВНЫЙ ПОТОК
+    # ========================================
+
+    def _enqueue_main(self, event_name, data):
+        with self._main_lock:
+            self._main_queue.append((event_name, data))
+            if self._main_scheduled:
+                return
+            self._main_scheduled = True
+
+        try:
+            from kivy.clock import Clock
+            Clock.schedule_once(self._drain_main, 0)
+        except ImportError:
+            # Без Kivy главного цикла нет - доставляем сразу
+            self._drain_main(0)
+
+    def _drain_main(self, dt):
+        """Один Clock-коллбэк на кадр: доставка всех накопленных событий"""
+        with self._main_lock:
+            batch = self._main_queue
+            self._main_queue = deque()
+            self._main_scheduled = False
+
+        for event_name, data in batch:
+            topic = self._topics.get(event_name)
+            if topic and topic.main_thread:
+                self._dispatch(event_name, topic.main_thread, data)
+
+    # ========================================
+    # ОСТАНОВКА И ДИАГНОСТИКА
+    # ========================================
+
+    def shutdown(self):
+        """Остановка фоновых потоков топиков"""
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+            for topic in self._topics.values():
+                if topic.flush_timer is not None:
+                    topic.flush_timer.cancel()
+                    topic.flush_timer = None
+        for worker in workers:
+            worker.stop()
+
+    def diagnose_state(self):
+        """Диагностика состояния event bus"""
+        self._prune_dead()
+        with self._lock:
+            topics = {
+                name: dict(
+                    {mode: len(getattr(topic, mode)) for mode in DELIVERY_MODES},
+                    live=sum(1 for sub in topic.all() if sub.is_alive()),
+                    latest_only=topic.latest_only,
+                    max_rate=(1.0 / topic.min_interval) if topic.min_interval else None,
+                    coalesced=topic.coalesced,
+                )
+                for name, topic in self._topics.items()
+            }
+            workers = {name: {"queued": len(w._queue), "dropped": w.dropped}
+                       for name, w in self._workers.items()}
+        return {
+            "topics": topics,
+            "workers": workers,
+            "main_queue": len(self._main_queue),
+        }
 
 # Глобальный singleton для использования во всём проекте
 event_bus = EventBus()
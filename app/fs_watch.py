@@ -0,0 +1,124 @@
+# app/fs_watch.py
+# НОВОЕ: Наблюдение за папками со склейкой событий
+#
+# Общий помощник для индекса тем и библиотеки рингтонов. Наблюдатель
+# watchdog (если пакет установлен) собирает изменённые пути; после паузы
+# RESCAN_DEBOUNCE без новых событий вызывается callback(paths) в потоке
+# таймера - копирование папки даёт десятки событий, а пересборка одна.
+
+import os
+import threading
+
+from app.logger import app_logger as logger
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+# Пауза для склейки пачки событий
+RESCAN_DEBOUNCE = 0.5
+
+
+class _DirHandler(FileSystemEventHandler):
+    """Передаёт изменённые пути в наблюдатель"""
+
+    def __init__(self, watcher):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        paths = [event.src_path]
+        dest = getattr(event, "dest_path", None)
+        if dest:
+            paths.append(dest)
+        self._watcher._on_fs_change(paths)
+
+
+class DebouncedWatcher:
+    """
+    НОВОЕ: Наблюдатель за набором папок.
+    callback(paths) получает множество нормализованных путей из пачки событий.
+    """
+
+    def __init__(self, dirs, callback, recursive=False, debounce=RESCAN_DEBOUNCE, label="files"):
+        self.dirs = tuple(dirs)
+        self.recursive = recursive
+        self.debounce = debounce
+        self.label = label
+        self._callback = callback
+
+        self._observer = None
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._timer = None
+        self.events = 0
+
+    def start(self):
+        """Запуск watchdog. False - пакет не установлен или нечего наблюдать"""
+        if self._observer is not None:
+            return True
+        if not WATCHDOG_AVAILABLE:
+            logger.info(f"watchdog not installed - {self.label} are not watched")
+            return False
+        try:
+            observer = Observer()
+            observer.daemon = True
+            watched = 0
+            for path in self.dirs:
+                if os.path.isdir(path):
+                    observer.schedule(_DirHandler(self), path, recursive=self.recursive)
+                    watched += 1
+            if not watched:
+                return False
+            observer.start()
+            self._observer = observer
+            logger.info(f"👀 Watching {watched} folder(s) for {self.label}")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not watch folders for {self.label}: {e}")
+            return False
+
+    def stop(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = set()
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            try:
+                observer.stop()
+                observer.join(timeout=2.0)
+            except Exception as e:
+                logger.warning(f"Error stopping watcher for {self.label}: {e}")
+
+    @property
+    def watching(self):
+        return self._observer is not None
+
+    def _on_fs_change(self, paths):
+        """Поток watchdog: копим пути и откладываем callback до конца пачки"""
+        with self._lock:
+            self.events += 1
+            self._pending.update(os.path.normpath(p) for p in paths if isinstance(p, str))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._timer = None
+        try:
+            self._callback(pending)
+        except Exception as e:
+            logger.error(f"Error handling changes in {self.label}: {e}")
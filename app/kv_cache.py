@@ -0,0 +1,198 @@
+# app/kv_cache.py
+# НОВОЕ: Дисковый кэш разобранных и скомпилированных KV-правил
+#
+# Builder.load_file на каждом старте заново разбирает KV и компилирует все
+# выражения свойств. Кэш сохраняет готовый kivy.lang.Parser (правила,
+# скомпилированные code-объекты, директивы) в cache/kv/ с ключом по хэшу
+# содержимого файла, версии Kivy и версии байткода Python. При изменении
+# файла ключ меняется и выполняется полный разбор.
+#
+# Отключение: BEDROCK_KV_CACHE=0
+
+import copyreg
+import hashlib
+import importlib.util
+import io
+import marshal
+import os
+import pickle
+import types
+from functools import partial
+
+import kivy
+from kivy.factory import Factory
+from kivy.lang import Builder
+from kivy.lang.parser import Parser
+from kivy.resources import resource_find
+from app.logger import app_logger as logger
+from app.startup_tracer import startup_tracer
+
+KV_CACHE_DIR = os.path.join("cache", "kv")
+KV_CACHE_ENV_VAR = "BEDROCK_KV_CACHE"
+KV_CACHE_FORMAT = 1
+
+
+def _reduce_code(code):
+    """Code-объекты не сериализуются pickle - передаём через marshal"""
+    return marshal.loads, (marshal.dumps(code),)
+
+
+class KVCache:
+    """
+    НОВОЕ: Загрузка KV-файлов через дисковый кэш.
+    Применение разобранных правил повторяет Builder.load_string, поэтому
+    версия Kivy входит в ключ кэша.
+    """
+
+    def __init__(self, cache_dir=KV_CACHE_DIR, enabled=True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+
+        # Статистика
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        self._key_salt = f"{KV_CACHE_FORMAT}|{kivy.__version__}|{importlib.util.MAGIC_NUMBER.hex()}"
+
+    # ========================================
+    # КЛЮЧ И ПУТИ
+    # ========================================
+
+    def _cache_key(self, data):
+        digest = hashlib.sha1(self._key_salt.encode("utf-8"))
+        digest.update(data.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _cache_base(self, filename):
+        rel = os.path.relpath(os.path.abspath(filename))
+        return rel.replace(os.sep, "_").replace(":", "_")
+
+    def _cache_path(self, filename, key):
+        return os.path.join(self.cache_dir, f"{self._cache_base(filename)}.{key[:16]}.kvc")
+
+    def _remove_stale(self, filename, keep_path):
+        """Удаление кэшей старых версий того же файла"""
+        prefix = self._cache_base(filename) + "."
+        try:
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if name.startswith(prefix) and name.endswith(".kvc") and path != keep_path:
+                    os.remove(path)
+        except Exception as e:
+            logger.debug(f"Could not clean KV cache for {filename}: {e}")
+
+    # ========================================
+    # СЕРИАЛИЗАЦИЯ
+    # ========================================
+
+    def _dump(self, parser, path):
+        buffer = io.BytesIO()
+        pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler.dispatch_table = copyreg.dispatch_table.copy()
+        pickler.dispatch_table[types.CodeType] = _reduce_code
+        pickler.dump(parser)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            parser = pickle.load(f)
+        if not isinstance(parser, Parser):
+            raise TypeError(f"Unexpected cache payload: {type(parser).__name__}")
+        return parser
+
+    # ========================================
+    # ЗАГРУЗКА
+    # ========================================
+
+    def load_file(self, filename, encoding="utf8"):
+        """Аналог Builder.load_file для файлов, содержащих только правила"""
+        if not self.enabled:
+            return Builder.load_file(filename, encoding=encoding)
+
+        filename = resource_find(filename) or filename
+        with open(filename, "r", encoding=encoding) as f:
+            data = f.read()
+
+        key = self._cache_key(data)
+        path = self._cache_path(filename, key)
+
+        parser = None
+        if os.path.exists(path):
+            try:
+                with startup_tracer.span(f"kv cache hit {filename}", cat="kv"):
+                    parser = self._load(path)
+                    # #:import / #:set выполняются при разборе - повторяем их
+                    parser.execute_directives()
+                self.hits += 1
+            except Exception as e:
+                self.errors += 1
+                parser = None
+                logger.warning(f"⚠️ KV cache unreadable for {filename}, reparsing: {e}")
+
+        if parser is None:
+            with startup_tracer.span(f"kv parse {filename}", cat="kv"):
+                parser = Parser(content=data, filename=filename)
+            self.misses += 1
+
+            if parser.root:
+                # Файлы с корневым виджетом создают его при загрузке - не кэшируем
+                logger.debug(f"KV file has root widget, not cached: {filename}")
+                return Builder.load_string(data, filename=filename)
+
+            try:
+                self._dump(parser, path)
+                self._remove_stale(filename, path)
+                logger.debug(f"KV cache stored: {path}")
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ Could not store KV cache for {filename}: {e}")
+
+        self._apply(parser, filename)
+        return None
+
+    def _apply(self, parser, filename):
+        """Регистрация правил в Builder - как в Builder.load_string"""
+        if filename in Builder.files:
+            logger.warning(f"KV file loaded multiple times: {filename}")
+
+        Builder._current_filename = filename
+        try:
+            Builder.rules.extend(parser.rules)
+            Builder._clear_matchcache()
+
+            for name, cls, template in parser.templates:
+                Builder.templates[name] = (cls, template, filename)
+                Factory.register(name, cls=partial(Builder.template, name),
+                                 is_template=True, warn=True)
+
+            for name, baseclasses in parser.dynamic_classes.items():
+                Factory.register(name, baseclasses=baseclasses, filename=filename,
+                                 warn=True)
+
+            if parser.templates or parser.dynamic_classes or parser.rules:
+                Builder.files.append(filename)
+        finally:
+            Builder._current_filename = None
+
+    def diagnose_state(self):
+        """Диагностика состояния KV-кэша"""
+        return {
+            "enabled": self.enabled,
+            "cache_dir": self.cache_dir,
+            "kivy_version": kivy.__version__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+# Глобальный экземпляр
+kv_cache = KVCache(
+    enabled=os.environ.get(KV_CACHE_ENV_VAR, "1").strip().lower() not in ("0", "false", "no", "off")
+)
@@ -0,0 +1,213 @@
+# app/screen_factory.py
+# НОВОЕ: Ленивое создание экранов с LRU-вытеснением
+
+import importlib
+import time
+from collections import OrderedDict
+from kivy.uix.screenmanager import NoTransition
+from app.event_bus import event_bus
+from app.kv_cache import kv_cache
+from app.logger import app_logger as logger
+from app.startup_tracer import startup_tracer
+
+
+# Описание страниц: имя экрана -> (модуль, класс, KV файл)
+SCREEN_DEFINITIONS = {
+    "home": ("pages.home", "HomeScreen", "pages/home.kv"),
+    "alarm": ("pages.alarm", "AlarmScreen", "pages/alarm.kv"),
+    "schedule": ("pages.schedule", "ScheduleScreen", "pages/schedule.kv"),
+    "weather": ("pages.weather", "WeatherScreen", "pages/weather.kv"),
+    "pigs": ("pages.pigs", "PigsScreen", "pages/pigs.kv"),
+    "settings": ("pages.settings", "SettingsScreen", "pages/settings.kv"),
+}
+
+DEFAULT_CACHE_SIZE = 3
+
+
+class ScreenFactory:
+    """
+    НОВОЕ: Фабрика экранов для ScreenManager.
+    KV-правила страницы загружаются и Screen создаётся только при первом показе.
+    Живыми остаются max_alive последних использованных экранов (плюс закреплённые),
+    остальные выгружаются из ScreenManager и отписываются от event_bus.
+    """
+
+    def __init__(self, screen_manager, max_alive=DEFAULT_CACHE_SIZE, pinned=("home",),
+                 definitions=None):
+        self.screen_manager = screen_manager
+        self.max_alive = max(1, int(max_alive))
+        self.pinned = set(pinned)
+        self.definitions = dict(definitions or SCREEN_DEFINITIONS)
+
+        # LRU: имя -> экземпляр Screen, последний использованный в конце
+        self._alive = OrderedDict()
+        self._loaded_kv = set()
+        self._classes = {}
+
+        # Статистика
+        self._created_count = 0
+        self._evicted_count = 0
+        self._build_times = {}
+
+        logger.info(f"ScreenFactory created (max_alive={self.max_alive}, pinned={sorted(self.pinned)})")
+
+    # ========================================
+    # ЗАГРУЗКА И СОЗДАНИЕ
+    # ========================================
+
+    def has_screen(self, name):
+        return name in self.definitions
+
+    def _get_screen_class(self, name):
+        """Импорт класса экрана и однократная загрузка его KV-правил"""
+        if name in self._classes:
+            return self._classes[name]
+
+        module_name, class_name, kv_file = self.definitions[name]
+        screen_class = getattr(importlib.import_module(module_name), class_name)
+
+        if kv_file and kv_file not in self._loaded_kv:
+            with startup_tracer.span(f"kv load {kv_file}", cat="kv"):
+                kv_cache.load_file(kv_file)
+            self._loaded_kv.add(kv_file)
+            logger.debug(f"KV rules loaded: {kv_file}")
+
+        self._classes[name] = screen_class
+        return screen_class
+
+    def _build_screen(self, name):
+        """Создание нового экземпляра экрана"""
+        start = time.perf_counter()
+        with startup_tracer.span(f"screen {name}", cat="screen"):
+            screen = self._get_screen_class(name)(name=name)
+        elapsed = time.perf_counter() - start
+
+        self._created_count += 1
+        self._build_times[name] = elapsed
+        logger.info(f"✅ Screen built: {name} ({elapsed:.3f}s)")
+        return screen
+
+    def get_screen(self, name):
+        """Вернуть живой экран, создав его при необходимости"""
+        if name not in self.definitions:
+            logger.error(f"Unknown screen: {name}")
+            return None
+
+        screen = self._alive.get(name)
+        if screen is None:
+            screen = self._build_screen(name)
+            self.screen_manager.add_widget(screen)
+            self._alive[name] = screen
+
+        self._alive.move_to_end(name)
+        return screen
+
+    def show(self, name):
+        """Создание (если нужно) и переключение на экран с последующим вытеснением"""
+        screen = self.get_screen(name)
+        if screen is None:
+            return False
+
+        self.screen_manager.current = name
+        self._evict()
+        return True
+
+    # ========================================
+    # ВЫТЕСНЕНИЕ
+    # ========================================
+
+    def _evict(self):
+        """Выгрузка давно не использованных экранов сверх лимита"""
+        current = self.screen_manager.current
+        while self._unpinned_count() > self.max_alive:
+            victim = next(
+                (n for n in self._alive if n not in self.pinned and n != current),
+                None
+            )
+            if victim is None:
+                break
+            self._release(victim)
+
+    def _unpinned_count(self):
+        return sum(1 for n in self._alive if n not in self.pinned)
+
+    def _release(self, name):
+        """Удаление экрана из ScreenManager и отписка от событий"""
+        screen = self._alive.pop(name, None)
+        if screen is None:
+            return
+
+        try:
+            if hasattr(screen, 'stop_updates'):
+                screen.stop_updates()
+        except Exception as e:
+            logger.warning(f"Error stopping updates for {name}: {e}")
+
+        removed = event_bus.unsubscribe_owner(screen)
+        self.screen_manager.remove_widget(screen)
+        self._evicted_count += 1
+        logger.debug(f"🗑️ Screen evicted: {name} ({removed} subscriptions removed)")
+
+    def set_max_alive(self, max_alive):
+        self.max_alive = max(1, int(max_alive))
+        self._evict()
+
+    # ========================================
+    # ПЕРЕСОЗДАНИЕ
+    # ========================================
+
+    def rebuild_current(self):
+        """
+        Пересоздание только видимого экрана (например при смене темы).
+        Остальные экраны выгружаются и будут созданы заново при показе.
+        """
+        current = self.screen_manager.current
+        if not current or current not in self.definitions:
+            return None
+
+        for name in [n for n in self._alive if n != current]:
+            self._release(name)
+
+        new_screen = self._build_screen(current)
+        old_screen = self._alive.pop(current, None)
+
+        if old_screen is not None:
+            # Освобождаем имя, чтобы добавить новый экран без конфликта
+            old_screen.name = f"{current}__old"
+
+        previous_transition = self.screen_manager.transition
+        self.screen_manager.transition = NoTransition()
+        try:
+            self.screen_manager.add_widget(new_screen)
+            self.screen_manager.current = current
+        finally:
+            self.screen_manager.transition = previous_transition
+
+        if old_screen is not None:
+            try:
+                if hasattr(old_screen, 'stop_updates'):
+                    old_screen.stop_updates()
+            except Exception as e:
+                logger.warning(f"Error stopping updates for old {current}: {e}")
+            event_bus.unsubscribe_owner(old_screen)
+            self.screen_manager.remove_widget(old_screen)
+
+        self._alive[current] = new_screen
+        logger.info(f"🔄 Screen rebuilt: {current}")
+        return new_screen
+
+    # ========================================
+    # ДИАГНОСТИКА
+    # ========================================
+
+    def diagnose_state(self):
+        """Диагностика состояния фабрики экранов"""
+        return {
+            "max_alive": self.max_alive,
+            "pinned": sorted(self.pinned),
+            "alive": list(self._alive.keys()),
+            "loaded_kv": sorted(self._loaded_kv),
+            "created_count": self._created_count,
+            "evicted_count": self._evicted_count,
+            "build_times": {k: round(v, 4) for k, v in self._build_times.items()},
+        }
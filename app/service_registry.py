@@ -0,0 +1,343 @@
+# app/service_registry.py
+# НОВОЕ: Декларативный реестр сервисов с зависимостями и параллельной инициализацией
+
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from app.logger import app_logger as logger
+from app.startup_tracer import startup_tracer
+
+
+# Состояния сервиса в реестре
+STATE_PENDING = "pending"
+STATE_STARTING = "starting"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+STATE_SKIPPED = "skipped"
+
+
+class ServiceSpec:
+    """
+    НОВОЕ: Описание сервиса для реестра.
+    factory вызывается с готовыми зависимостями в виде именованных аргументов:
+    factory(**{dep_name: dep_instance})
+    """
+
+    def __init__(self, name, factory, requires=(), start=True, critical=False):
+        self.name = name
+        self.factory = factory
+        self.requires = tuple(requires)
+        self.start = start
+        self.critical = critical
+
+        # Состояние инициализации
+        self.state = STATE_PENDING
+        self.instance = None
+        self.error = None
+        self.init_time = None
+        self.started_at = None
+        self.finished_at = None
+        self.ready_event = threading.Event()
+
+    def to_dict(self):
+        """Снимок состояния сервиса для диагностики"""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "requires": list(self.requires),
+            "critical": self.critical,
+            "init_time": round(self.init_time, 4) if self.init_time is not None else None,
+            "error": self.error,
+        }
+
+
+class ServiceRegistry:
+    """
+    НОВОЕ: Реестр сервисов приложения.
+    Сервисы без взаимных зависимостей стартуют параллельно в пуле потоков,
+    зависимые - сразу после готовности всех своих зависимостей.
+    Для каждого сервиса фиксируется время инициализации и ошибка.
+    """
+
+    def __init__(self, max_workers=4, on_ready=None):
+        self._lock = threading.RLock()
+        self._specs = {}
+        self._order = []
+        self._max_workers = max_workers
+        self._executor = None
+        self._on_ready = on_ready
+        self._done_callbacks = []
+        self._all_done = threading.Event()
+        self._started = False
+        self._start_time = None
+        self._total_time = None
+
+        logger.info("ServiceRegistry created")
+
+    # ========================================
+    # РЕГИСТРАЦИЯ
+    # ========================================
+
+    def register(self, name, factory, requires=(), start=True, critical=False):
+        """Регистрация сервиса. Должна выполняться до start_all()"""
+        with self._lock:
+            if self._started:
+                raise RuntimeError(f"Cannot register '{name}' after registry start")
+            if name in self._specs:
+                raise ValueError(f"Service '{name}' already registered")
+            spec = ServiceSpec(name, factory, requires, start, critical)
+            self._specs[name] = spec
+            self._order.append(name)
+            return spec
+
+    def provide(self, name, instance):
+        """Регистрация уже созданного объекта (например ThemeManager) как готовой зависимости"""
+        with self._lock:
+            spec = ServiceSpec(name, None, start=False)
+            spec.instance = instance
+            spec.state = STATE_READY
+            spec.init_time = 0.0
+            spec.ready_event.set()
+            self._specs[name] = spec
+            self._order.append(name)
+            return spec
+
+    def _validate_graph(self):
+        """Проверка неизвестных зависимостей и циклов"""
+        for spec in self._specs.values():
+            for dep in spec.requires:
+                if dep not in self._specs:
+                    raise ValueError(f"Service '{spec.name}' requires unknown service '{dep}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name, path):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self._specs[name].requires:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._order:
+            visit(name, [])
+
+    # ========================================
+    # ЗАПУСК
+    # ========================================
+
+    def start_all(self):
+        """Неблокирующий запуск всех зарегистрированных сервисов"""
+        with self._lock:
+            if self._started:
+                logger.warning("ServiceRegistry already started")
+                return
+            self._validate_graph()
+            self._started = True
+            self._start_time = time.perf_counter()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="ServiceInit"
+            )
+            logger.info(f"🔧 Starting {len(self._order)} services (workers: {self._max_workers})")
+
+        self._schedule_runnable()
+
+    def _schedule_runnable(self):
+        """Постановка в пул всех сервисов, у которых завершились зависимости"""
+        while True:
+            to_submit, to_skip = [], []
+            with self._lock:
+                for name in self._order:
+                    spec = self._specs[name]
+                    if spec.state != STATE_PENDING:
+                        continue
+
+                    deps = [self._specs[d] for d in spec.requires]
+                    if any(not d.ready_event.is_set() for d in deps):
+                        continue
+
+                    # Захватываем сервис, чтобы его не поставили в пул дважды
+                    spec.state = STATE_STARTING
+                    failed = [d.name for d in deps if d.state != STATE_READY]
+                    if failed:
+                        to_skip.append((spec, f"dependencies unavailable: {', '.join(failed)}"))
+                    else:
+                        to_submit.append(spec)
+
+            # Колбэки и публикация событий - вне блокировки
+            for spec, error in to_skip:
+                self._finish(spec, STATE_SKIPPED, error=error)
+            for spec in to_submit:
+                self._executor.submit(self._init_service, spec)
+
+            # Пропуск сервиса может разблокировать его зависимых
+            if not to_skip:
+                break
+
+        self._check_all_done()
+
+    def _init_service(self, spec):
+        """Создание и запуск одного сервиса в рабочем потоке"""
+        spec.started_at = time.perf_counter()
+        try:
+            logger.info(f"Initializing {spec.name}...")
+            kwargs = {dep: self._specs[dep].instance for dep in spec.requires}
+            with startup_tracer.span(f"{spec.name}.__init__", cat="service"):
+                instance = spec.factory(**kwargs)
+
+            if spec.start and hasattr(instance, 'start'):
+                with startup_tracer.span(f"{spec.name}.start", cat="service"):
+                    instance.start()
+                logger.debug(f"✅ {spec.name} started")
+
+            spec.instance = instance
+            self._finish(spec, STATE_READY)
+            logger.info(f"✅ Service initialized: {spec.name} ({spec.init_time:.3f}s)")
+
+        except Exception as ex:
+            self._finish(spec, STATE_FAILED, error=str(ex))
+            logger.error(f"❌ Failed to initialize {spec.name}: {ex}")
+            logger.error(f"{spec.name} traceback: {traceback.format_exc()}")
+
+        self._schedule_runnable()
+
+    def _finish(self, spec, state, error=None):
+        """Фиксация результата инициализации сервиса"""
+        now = time.perf_counter()
+        if spec.started_at is None:
+            spec.started_at = now
+        spec.finished_at = now
+        spec.init_time = now - spec.started_at
+        spec.state = state
+        spec.error = error
+
+        if state == STATE_SKIPPED:
+            logger.warning(f"❌ {spec.name} skipped: {error}")
+
+        if self._on_ready:
+            try:
+                self._on_ready(spec.name, spec.instance if state == STATE_READY else None)
+            except Exception as e:
+                logger.error(f"Error in service ready callback for {spec.name}: {e}")
+
+        spec.ready_event.set()
+
+        try:
+            from app.event_bus import event_bus
+            event_bus.publish("service_ready", {
+                "name": spec.name,
+                "state": state,
+                "ok": state == STATE_READY,
+                "init_time": spec.init_time,
+            })
+        except Exception as e:
+            logger.debug(f"Could not publish service_ready for {spec.name}: {e}")
+
+    def _check_all_done(self):
+        """Завершение запуска, когда все сервисы получили итоговое состояние"""
+        with self._lock:
+            if self._all_done.is_set():
+                return
+            if not all(s.ready_event.is_set() for s in self._specs.values()):
+                return
+
+            self._total_time = time.perf_counter() - self._start_time
+            self._all_done.set()
+            callbacks, self._done_callbacks = self._done_callbacks, []
+
+        logger.info(f"✅ All services settled in {self._total_time:.3f}s")
+        self._executor.shutdown(wait=False)
+
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Error in registry done callback: {e}")
+
+    def add_done_callback(self, callback):
+        """
+        Вызов callback(registry) после завершения инициализации всех сервисов.
+        Если всё уже завершено - вызывается сразу. Callback выполняется в рабочем потоке.
+        """
+        with self._lock:
+            if not self._all_done.is_set():
+                self._done_callbacks.append(callback)
+                return
+        callback(self)
+
+    # ========================================
+    # ГОТОВНОСТЬ
+    # ========================================
+
+    def get(self, name):
+        """Экземпляр сервиса или None, если он ещё не готов или упал"""
+        spec = self._specs.get(name)
+        if spec and spec.state == STATE_READY:
+            return spec.instance
+        return None
+
+    def is_ready(self, name):
+        """Сервис успешно инициализирован"""
+        spec = self._specs.get(name)
+        return bool(spec and spec.state == STATE_READY)
+
+    def is_settled(self, name):
+        """Сервис получил итоговое состояние (готов, упал или пропущен)"""
+        spec = self._specs.get(name)
+        return bool(spec and spec.ready_event.is_set())
+
+    def wait_ready(self, name, timeout=None):
+        """Блокирующее ожидание сервиса. Не вызывать из главного потока Kivy без таймаута"""
+        spec = self._specs.get(name)
+        if not spec:
+            return None
+        spec.ready_event.wait(timeout)
+        return self.get(name)
+
+    def wait_all(self, timeout=None):
+        """Ожидание завершения инициализации всех сервисов"""
+        return self._all_done.wait(timeout)
+
+    def all_done(self):
+        return self._all_done.is_set()
+
+    def get_state(self, name):
+        spec = self._specs.get(name)
+        return spec.state if spec else None
+
+    # ========================================
+    # ДИАГНОСТИКА
+    # ========================================
+
+    def diagnose_state(self):
+        """Диагностика состояния реестра и всех сервисов"""
+        with self._lock:
+            services = {name: self._specs[name].to_dict() for name in self._order}
+        return {
+            "started": self._started,
+            "all_done": self._all_done.is_set(),
+            "total_time": round(self._total_time, 4) if self._total_time is not None else None,
+            "max_workers": self._max_workers,
+            "services": services,
+        }
+
+    def log_summary(self):
+        """Вывод таблицы времени инициализации в лог"""
+        logger.info("🔧 === SERVICE REGISTRY ===")
+        for name in self._order:
+            spec = self._specs[name]
+            init_time = f"{spec.init_time:.3f}s" if spec.init_time is not None else "-"
+            line = f"[{name:20}] {spec.state:8} {init_time:>8}"
+            if spec.error:
+                line += f" | {spec.error}"
+            if spec.state == STATE_READY:
+                logger.info(line)
+            elif spec.critical:
+                logger.error(line)
+            else:
+                logger.warning(line)
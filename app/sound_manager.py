@@ -55,6 +55,9 @@ class SoundManager:
                 
             sound_file = app.theme_manager.get_sound(sound_name)
             if sound_file:
+                # НОВОЕ: Предзагруженный канал SFX - поверх музыки, без задержек
+                if hasattr(app.audio_service, 'play_sfx'):
+                    return app.audio_service.play_sfx(sound_file)
                 app.audio_service.play(sound_file)
                 return True
                 
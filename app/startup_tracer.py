@@ -0,0 +1,217 @@
+# app/startup_tracer.py
+# НОВОЕ: Трассировка старта приложения в формате Chrome trace-event
+#
+# Включение:
+#   BEDROCK_TRACE_STARTUP=1 python main.py
+#   python main.py --trace-startup
+#
+# Результат: logs/startup_trace_<дата>_<время>.json
+# Открывается в chrome://tracing или https://ui.perfetto.dev
+#
+# ВАЖНО: модуль не импортирует Kivy и должен импортироваться в main.py
+# ДО kivy, чтобы флаг --trace-startup был убран из sys.argv до разбора
+# аргументов Kivy.
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+TRACE_ENV_VAR = "BEDROCK_TRACE_STARTUP"
+TRACE_CLI_FLAG = "--trace-startup"
+
+
+def _trace_requested():
+    """Проверка env-переменной и CLI-флага (флаг удаляется из sys.argv)"""
+    requested = os.environ.get(TRACE_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+    if TRACE_CLI_FLAG in sys.argv:
+        sys.argv.remove(TRACE_CLI_FLAG)
+        requested = True
+    return requested
+
+
+def get_trace_dir():
+    # Та же папка logs, что и у app.logger
+    return os.path.join(os.path.dirname(__file__), '..', 'logs')
+
+
+class _NullSpan:
+    """Пустой контекст для выключенного трейсера"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class StartupTracer:
+    """
+    НОВОЕ: Запись вложенных интервалов старта с монотонными метками времени
+    и id потоков. Пишет Chrome trace-event JSON (события "X" / "i" / "M").
+    При выключенной трассировке span() почти ничего не стоит.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._events = []
+        self._thread_names = {}
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._t0 = time.perf_counter_ns()
+        self._written_path = None
+
+    def _now_us(self):
+        return (time.perf_counter_ns() - self._t0) / 1000.0
+
+    def _register_thread(self):
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        return tid
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # ========================================
+    # ЗАПИСЬ СОБЫТИЙ
+    # ========================================
+
+    def span(self, name, cat="startup", **args):
+        """Контекстный менеджер интервала: with startup_tracer.span("build"): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, cat, args)
+
+    @contextmanager
+    def _span(self, name, cat, args):
+        stack = self._stack()
+        if stack:
+            args = dict(args, parent=stack[-1])
+        stack.append(name)
+        tid = self._register_thread()
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            end = self._now_us()
+            stack.pop()
+            event = {
+                "name": name, "cat": cat, "ph": "X",
+                "ts": start, "dur": end - start,
+                "pid": self._pid, "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self._events.append(event)
+
+    def instant(self, name, cat="startup", **args):
+        """Мгновенное событие (например первый отрисованный кадр)"""
+        if not self.enabled:
+            return
+        event = {
+            "name": name, "cat": cat, "ph": "i", "s": "p",
+            "ts": self._now_us(), "pid": self._pid, "tid": self._register_thread(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+
+    def traced(self, name=None, cat="startup"):
+        """Декоратор: @startup_tracer.traced("BedrockApp.build")"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, cat):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ========================================
+    # ВЫГРУЗКА
+    # ========================================
+
+    def _metadata(self):
+        return {
+            "app": "bedrock",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "node": platform.node(),
+            "argv": sys.argv,
+        }
+
+    def write(self, path=None):
+        """Запись trace-файла. Повторные вызовы не перезаписывают результат"""
+        if not self.enabled or self._written_path:
+            return self._written_path
+
+        from app.logger import app_logger as logger
+
+        try:
+            if path is None:
+                trace_dir = get_trace_dir()
+                os.makedirs(trace_dir, exist_ok=True)
+                stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                path = os.path.join(trace_dir, f"startup_trace_{stamp}.json")
+
+            with self._lock:
+                events = list(self._events)
+                thread_names = dict(self._thread_names)
+
+            meta_events = [
+                {"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+                 "args": {"name": "bedrock"}}
+            ] + [
+                {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid,
+                 "args": {"name": thread_name}}
+                for tid, thread_name in thread_names.items()
+            ]
+
+            trace = {
+                "traceEvents": meta_events + sorted(events, key=lambda e: e["ts"]),
+                "displayTimeUnit": "ms",
+                "otherData": self._metadata(),
+            }
+
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(trace, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+            self._written_path = path
+            logger.info(f"✅ Startup trace written: {path} ({len(events)} events)")
+            return path
+
+        except Exception as e:
+            logger.error(f"Error writing startup trace: {e}")
+            return None
+
+    def diagnose_state(self):
+        return {
+            "enabled": self.enabled,
+            "events": len(self._events),
+            "threads": len(self._thread_names),
+            "written_path": self._written_path,
+        }
+
+
+# Глобальный трейсер - создаётся при первом импорте (начало отсчёта времени)
+startup_tracer = StartupTracer(enabled=_trace_requested())
@@ -0,0 +1,174 @@
+# app/theme_assets.py
+# НОВОЕ: Индекс файлов тем в памяти
+#
+# Один проход по themes/ при загрузке темы: themes/<тема>/<вариант>/,
+# themes/<тема>/fonts/ и themes/<тема>/sounds/. ThemeManager проверяет
+# существование файлов по индексу, поэтому поиск картинок, шрифтов,
+# звуков и оверлеев (включая цепочки фолбэков) не делает stat-вызовов.
+#
+# Индекс обновляется наблюдателем watchdog (если пакет установлен):
+# изменения в themes/ собираются в пачку, индекс пересобирается в потоке
+# наблюдателя, а слушатели вызываются в главном потоке Kivy.
+
+import os
+import time
+
+from kivy.clock import Clock
+from app.fs_watch import DebouncedWatcher, WATCHDOG_AVAILABLE
+from app.logger import app_logger as logger
+
+class ThemeAssetIndex:
+    """
+    НОВОЕ: Индекс файлов папки тем.
+    Хранит множество нормализованных путей всех файлов и список тем.
+    Пересобирается целиком - папка тем маленькая, проход занимает миллисекунды.
+    """
+
+    def __init__(self, themes_dir="themes"):
+        self.themes_dir = os.path.normpath(themes_dir)
+
+        self._files = frozenset()
+        self._themes = ()
+        self._scanned = False
+        self._listeners = []
+
+        # Наблюдатель (склейка событий - в DebouncedWatcher)
+        self._watcher = DebouncedWatcher(
+            (self.themes_dir,), self._rescan_pending, recursive=True, label="theme assets"
+        )
+
+        # Статистика
+        self._scan_count = 0
+        self._scan_ms = 0.0
+        self._last_scan = None
+
+    # ========================================
+    # СКАНИРОВАНИЕ
+    # ========================================
+
+    def scan(self):
+        """Полная пересборка индекса. Возвращает множество изменившихся путей"""
+        start = time.perf_counter()
+        files = set()
+        themes = []
+        try:
+            with os.scandir(self.themes_dir) as entries:
+                theme_dirs = sorted(e.name for e in entries if e.is_dir())
+        except OSError as e:
+            logger.warning(f"Themes directory not readable: {e}")
+            theme_dirs = []
+
+        for theme in theme_dirs:
+            themes.append(theme)
+            for root, _, names in os.walk(os.path.join(self.themes_dir, theme)):
+                for name in names:
+                    files.add(os.path.normpath(os.path.join(root, name)))
+
+        files = frozenset(files)
+        changed = files ^ self._files
+        self._files = files
+        self._themes = tuple(themes)
+        self._scanned = True
+        self._scan_count += 1
+        self._scan_ms = (time.perf_counter() - start) * 1000
+        self._last_scan = time.time()
+        logger.debug(f"Theme assets indexed: {len(files)} files in {len(themes)} theme(s), {self._scan_ms:.1f}ms")
+        return changed
+
+    def ensure_scanned(self):
+        if not self._scanned:
+            self.scan()
+
+    # ========================================
+    # ПОИСК (без обращений к диску)
+    # ========================================
+
+    def _inside(self, path):
+        return path == self.themes_dir or path.startswith(self.themes_dir + os.sep)
+
+    def exists(self, path):
+        """Есть ли файл. Пути внутри папки тем проверяются только по индексу"""
+        if not path:
+            return False
+        path = os.path.normpath(path)
+        if self._inside(path):
+            return path in self._files
+        # Путь вне папки тем (абсолютный путь в theme.json) - не горячий путь
+        return os.path.isfile(path)
+
+    def first_existing(self, *paths):
+        """Первый существующий путь из цепочки фолбэков или пустая строка"""
+        for path in paths:
+            if path and self.exists(path):
+                return os.path.normpath(path)
+        return ""
+
+    def themes(self):
+        """Имена тем (папки в themes/)"""
+        self.ensure_scanned()
+        return list(self._themes)
+
+    def files_in(self, *parts):
+        """Имена файлов в подпапке themes/<parts...>/ (без вложенных папок)"""
+        folder = os.path.normpath(os.path.join(self.themes_dir, *parts))
+        return sorted(
+            os.path.basename(path) for path in self._files
+            if os.path.dirname(path) == folder
+        )
+
+    # ========================================
+    # НАБЛЮДЕНИЕ ЗА ПАПКОЙ ТЕМ
+    # ========================================
+
+    def add_listener(self, callback):
+        """callback(changed_paths) вызывается в главном потоке после пересборки индекса"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start_watching(self):
+        """Запуск наблюдателя watchdog (без watchdog индекс строится только при загрузке)"""
+        return self._watcher.start()
+
+    @property
+    def watching(self):
+        return self._watcher.watching
+
+    def stop_watching(self):
+        self._watcher.stop()
+
+    def _rescan_pending(self, pending):
+        """Поток таймера наблюдателя: пересборка индекса после пачки событий"""
+        try:
+            # Изменённое содержимое (тот же набор файлов) тоже считается изменением
+            changed = self.scan() | {p for p in pending if p in self._files}
+        except Exception as e:
+            logger.error(f"Error rescanning theme assets: {e}")
+            return
+        if changed:
+            logger.info(f"🔄 Theme assets changed ({len(changed)} file(s))")
+            Clock.schedule_once(lambda dt: self._notify(changed), 0)
+
+    def _notify(self, changed):
+        for callback in list(self._listeners):
+            try:
+                callback(changed)
+            except Exception as e:
+                logger.error(f"Error in theme asset listener: {e}")
+
+    def diagnose_state(self):
+        """Диагностика индекса файлов тем"""
+        return {
+            "themes_dir": self.themes_dir,
+            "themes": list(self._themes),
+            "files": len(self._files),
+            "scan_count": self._scan_count,
+            "scan_ms": round(self._scan_ms, 2),
+            "last_scan": self._last_scan,
+            "watching": self._watcher.watching,
+            "watchdog_available": WATCHDOG_AVAILABLE,
+            "fs_events": self._watcher.events,
+        }
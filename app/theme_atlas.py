@@ -0,0 +1,258 @@
+# app/theme_atlas.py
+# НОВОЕ: Упаковка изображений темы в Kivy Atlas и предзагрузка в GPU
+#
+# Каждый вариант темы (themes/<тема>/<вариант>/*.png) упаковывается в
+# cache/atlas/<тема>-<вариант>.atlas. Упаковка выполняется при первом
+# запуске (или вручную: python -m app.theme_atlas) и повторяется только
+# если PNG варианта изменились. При старте атласы всех вариантов темы
+# загружаются в кэш текстур Kivy, а ThemeManager отдаёт вместо путей
+# к файлам адреса atlas://..., поэтому смена страницы или light/dark
+# не читает диск и не декодирует PNG.
+#
+# Для упаковки нужен Pillow; без него картинки грузятся из файлов как раньше.
+# Отключение: BEDROCK_THEME_ATLAS=0
+
+import importlib.util
+import json
+import os
+import time
+
+from kivy.atlas import Atlas
+from kivy.cache import Cache
+from app.logger import app_logger as logger
+from app.startup_tracer import startup_tracer
+
+ATLAS_DIR = os.path.join("cache", "atlas")
+ATLAS_ENV_VAR = "BEDROCK_THEME_ATLAS"
+# 3 полноэкранных картинки 1024x600 в ряд, 3 ряда - весь вариант на одной странице
+ATLAS_SIZE = (4096, 2048)
+ATLAS_PADDING = 2
+IMAGE_EXTENSIONS = (".png",)
+
+
+def _max_texture_size():
+    """Максимальный размер текстуры GPU (None если GL-контекст недоступен)"""
+    try:
+        from kivy.graphics.opengl import glGetIntegerv, GL_MAX_TEXTURE_SIZE
+        return int(glGetIntegerv(GL_MAX_TEXTURE_SIZE)[0])
+    except Exception:
+        return None
+
+
+class ThemeAtlas:
+    """
+    НОВОЕ: Атласы вариантов темы.
+    Хранит индекс "путь к PNG -> atlas://адрес" для уже загруженных атласов
+    и держит сами атласы в кэше Kivy, чтобы текстуры не выгружались.
+    """
+
+    def __init__(self, themes_dir="themes", atlas_dir=ATLAS_DIR, enabled=True):
+        self.themes_dir = themes_dir
+        self.atlas_dir = atlas_dir
+        self.enabled = enabled
+
+        # Нормализованный путь к PNG -> atlas://адрес
+        self._index = {}
+        # Ключ атласа (путь без .atlas) -> Atlas
+        self._loaded = {}
+
+        # Статистика
+        self._built = 0
+        self._build_ms = 0.0
+        self._preload_ms = 0.0
+        self._errors = 0
+
+    # ========================================
+    # ПУТИ
+    # ========================================
+
+    def _variant_dir(self, theme, variant):
+        return os.path.join(self.themes_dir, theme, variant)
+
+    def _atlas_base(self, theme, variant):
+        """Путь атласа без расширения - он же ключ в кэше kv.atlas"""
+        return os.path.join(self.atlas_dir, f"{theme}-{variant}").replace(os.sep, "/")
+
+    def _sources(self, theme, variant):
+        variant_dir = self._variant_dir(theme, variant)
+        try:
+            names = sorted(os.listdir(variant_dir))
+        except OSError:
+            return []
+        return [
+            os.path.join(variant_dir, name) for name in names
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+
+    def variants(self, theme):
+        """Варианты темы - подпапки с theme.json"""
+        theme_dir = os.path.join(self.themes_dir, theme)
+        try:
+            return sorted(
+                name for name in os.listdir(theme_dir)
+                if os.path.isfile(os.path.join(theme_dir, name, "theme.json"))
+            )
+        except OSError:
+            return []
+
+    # ========================================
+    # УПАКОВКА
+    # ========================================
+
+    def _read_ids(self, atlas_file):
+        """Все id атласа по всем страницам"""
+        with open(atlas_file, encoding="utf-8") as f:
+            meta = json.load(f)
+        return {uid for page in meta.values() for uid in page}
+
+    def is_fresh(self, theme, variant):
+        """Атлас есть, содержит все PNG варианта и новее каждого из них"""
+        atlas_file = self._atlas_base(theme, variant) + ".atlas"
+        sources = self._sources(theme, variant)
+        if not sources or not os.path.isfile(atlas_file):
+            return False
+        try:
+            atlas_mtime = os.path.getmtime(atlas_file)
+            if any(os.path.getmtime(path) > atlas_mtime for path in sources):
+                return False
+            expected = {os.path.splitext(os.path.basename(path))[0] for path in sources}
+            return self._read_ids(atlas_file) == expected
+        except Exception as e:
+            logger.debug(f"Atlas {atlas_file} unreadable, will rebuild: {e}")
+            return False
+
+    def build(self, theme, variant, force=False):
+        """Упаковка варианта в атлас (если он устарел). Возвращает True, если атлас готов"""
+        if not force and self.is_fresh(theme, variant):
+            return True
+
+        sources = self._sources(theme, variant)
+        if not sources:
+            return False
+
+        if importlib.util.find_spec("PIL") is None:
+            logger.info(f"Pillow not installed, atlas for {theme}/{variant} not built")
+            return False
+
+        size = ATLAS_SIZE
+        max_size = _max_texture_size()
+        if max_size:
+            size = (min(size[0], max_size), min(size[1], max_size))
+
+        base = self._atlas_base(theme, variant)
+        start = time.perf_counter()
+        try:
+            os.makedirs(self.atlas_dir, exist_ok=True)
+            result = Atlas.create(base, sources, size, padding=ATLAS_PADDING)
+            if not result:
+                # Atlas.create пишет причину в лог Kivy (картинка больше страницы)
+                logger.warning(f"⚠️ Atlas not built for {theme}/{variant}, using separate images")
+                self._errors += 1
+                return False
+        except Exception as e:
+            logger.warning(f"⚠️ Atlas build failed for {theme}/{variant}: {e}")
+            self._errors += 1
+            return False
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self._build_ms += elapsed
+        self._built += 1
+        _, pages = result
+        logger.info(f"🧩 Atlas built: {theme}/{variant} ({len(sources)} images, {len(pages)} page(s), {elapsed:.0f}ms)")
+        return True
+
+    # ========================================
+    # ПРЕДЗАГРУЗКА
+    # ========================================
+
+    def preload(self, theme, variant):
+        """
+        Загрузка атласа в GPU и регистрация в кэшах Kivy.
+        Ключи совпадают с теми, что использует ImageLoader для atlas://,
+        поэтому Image(source="atlas://...") берёт готовую текстуру.
+        """
+        base = self._atlas_base(theme, variant)
+        if base in self._loaded:
+            return True
+
+        try:
+            atlas = Atlas(base + ".atlas")
+        except Exception as e:
+            logger.warning(f"⚠️ Atlas preload failed for {theme}/{variant}: {e}")
+            self._errors += 1
+            return False
+
+        Cache.append("kv.atlas", base, atlas)
+        for uid, texture in atlas.textures.items():
+            Cache.append("kv.texture", f"atlas://{base}/{uid}|0|0", texture)
+        self._loaded[base] = atlas
+
+        for path in self._sources(theme, variant):
+            uid = os.path.splitext(os.path.basename(path))[0]
+            if uid in atlas.textures:
+                self._index[os.path.normpath(path)] = f"atlas://{base}/{uid}"
+        return True
+
+    def prepare(self, theme):
+        """Упаковка (при необходимости) и предзагрузка всех вариантов темы"""
+        if not self.enabled:
+            return False
+
+        start = time.perf_counter()
+        ready = []
+        for variant in self.variants(theme):
+            with startup_tracer.span(f"atlas {theme}/{variant}", cat="theme"):
+                if self.build(theme, variant) and self.preload(theme, variant):
+                    ready.append(variant)
+        self._preload_ms = (time.perf_counter() - start) * 1000
+
+        if ready:
+            logger.info(f"🧩 Theme atlases ready: {theme} [{', '.join(ready)}] in {self._preload_ms:.0f}ms")
+        return bool(ready)
+
+    # ========================================
+    # ПОИСК
+    # ========================================
+
+    def lookup(self, path):
+        """atlas://адрес для PNG из предзагруженного атласа или None"""
+        if not self._index or not path:
+            return None
+        return self._index.get(os.path.normpath(path))
+
+    def forget(self, paths):
+        """Изменённые на диске PNG снова грузятся из файлов (атлас пересоберётся при старте)"""
+        removed = 0
+        for path in paths:
+            if self._index.pop(os.path.normpath(path), None) is not None:
+                removed += 1
+        if removed:
+            logger.info(f"🧩 {removed} image(s) changed on disk, served from files until atlas rebuild")
+        return removed
+
+    def diagnose_state(self):
+        """Диагностика атласов темы"""
+        return {
+            "enabled": self.enabled,
+            "atlas_dir": self.atlas_dir,
+            "loaded": sorted(self._loaded),
+            "indexed_images": len(self._index),
+            "built": self._built,
+            "build_ms": round(self._build_ms, 1),
+            "prepare_ms": round(self._preload_ms, 1),
+            "errors": self._errors,
+        }
+
+
+# Глобальный экземпляр
+theme_atlas = ThemeAtlas(
+    enabled=os.environ.get(ATLAS_ENV_VAR, "1").strip().lower() not in ("0", "false", "no", "off")
+)
+
+
+if __name__ == "__main__":
+    # Шаг сборки: упаковать все варианты всех тем заранее
+    for theme_name in sorted(os.listdir(theme_atlas.themes_dir)):
+        for variant_name in theme_atlas.variants(theme_name):
+            ok = theme_atlas.build(theme_name, variant_name, force=True)
+            print(f"{'✅' if ok else '❌'} {theme_name}/{variant_name}")
@@ -3,15 +3,110 @@
 
 import os
 import json
+import time
+from kivy.event import EventDispatcher
+from kivy.properties import ObjectProperty, NumericProperty
+from kivy.utils import get_color_from_hex
 from app.logger import app_logger as logger
+from app.theme_atlas import theme_atlas
+from app.theme_assets import ThemeAssetIndex
+from app.event_bus import event_bus
 
-class ThemeManager:
+
+# НОВОЕ: Цвет по умолчанию, если ни цвет, ни fallback не разобрать
+DEFAULT_RGBA = (1.0, 1.0, 1.0, 1.0)
+
+
+def _parse_rgba(hex_color):
+    """НОВОЕ: Разбор hex-цвета в неизменяемый RGBA-кортеж (None если формат неверный)"""
+    if not isinstance(hex_color, str) or not hex_color.startswith('#'):
+        return None
+    try:
+        return tuple(get_color_from_hex(hex_color))
+    except Exception:
+        return None
+
+
+def _parse_param(value):
+    """НОВОЕ: Числовые строки из theme.json ("64", "0.5") превращаем в числа"""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return value
+
+
+class _ThemeMap(dict):
+    """
+    НОВОЕ: Скомпилированная секция темы для KV-привязок.
+    Сравнение по идентичности: каждая загрузка темы даёт новый объект,
+    и ObjectProperty всегда оповещает KV-правила о смене.
+    """
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = object.__hash__
+
+
+class ThemePalette(_ThemeMap):
+    """Цвета: имя -> RGBA-кортеж, неизвестное имя -> белый (как get_rgba)"""
+    def __missing__(self, name):
+        return DEFAULT_RGBA
+
+
+class ThemeFonts(_ThemeMap):
+    """Шрифты: имя -> путь, неизвестное имя -> дефолтный шрифт Kivy"""
+    def __missing__(self, name):
+        return ""
+
+
+class ThemeParams(_ThemeMap):
+    """Параметры: имя -> типизированное значение или None"""
+    def __missing__(self, name):
+        return None
+
+
+class ThemeImages(_ThemeMap):
+    """Изображения: путь вычисляется при первом обращении и кэшируется до смены темы"""
+    def __init__(self, resolver):
+        super().__init__()
+        self._resolver = resolver
+
+    def __missing__(self, name):
+        path = self._resolver(name)
+        self[name] = path
+        return path
+
+
+class ThemeManager(EventDispatcher):
     """
     ИСПРАВЛЕНО: Менеджер тем с правильными методами загрузки
     Отвечает за загрузку, хранение и отдачу ресурсов темы:
     цвета, изображения, шрифты, иконки, оверлеи, звуки и т.д.
+
+    НОВОЕ: Скомпилированная тема доступна как наблюдаемые свойства
+    (palette / fonts / images / params). KV-правила привязываются к ним:
+        color: app.theme_manager.palette["primary"]
+    поэтому load() перекрашивает существующее дерево виджетов на месте,
+    без пересоздания экранов.
     """
-    def __init__(self, themes_dir="themes"):
+
+    palette = ObjectProperty(ThemePalette())
+    fonts = ObjectProperty(ThemeFonts())
+    params = ObjectProperty(ThemeParams())
+    images = ObjectProperty(None)
+    # Счётчик загрузок - для привязок, которым нужна любая смена темы
+    revision = NumericProperty(0)
+
+    def __init__(self, themes_dir="themes", **kwargs):
+        super().__init__(**kwargs)
         self.themes_dir = themes_dir
         self.theme_name = None
         self.variant = None
@@ -19,6 +114,18 @@ class ThemeManager:
         self.current_theme = None  # ДОБАВЛЕНО для совместимости
         self.current_variant = None  # ДОБАВЛЕНО для совместимости
         
+        # НОВОЕ: Индекс файлов тем - поиск ресурсов без обращений к диску
+        self.assets = ThemeAssetIndex(themes_dir)
+        self.assets.add_listener(self._on_assets_changed)
+        
+        # НОВОЕ: Скомпилированная тема - аксессоры сводятся к поиску в словаре
+        self.images = ThemeImages(self._resolve_image)
+        self._sounds = {}
+        self._overlays = {}
+        self._fallback_rgba = {}
+        self._compile_ms = 0.0
+        self._apply_ms = 0.0
+        
         self.default_theme = {
             "colors": {
                 "primary": "#40916c",
@@ -71,24 +178,34 @@ class ThemeManager:
             self.themes_dir, theme_name, variant, "theme.json"
         )
         
+        # НОВОЕ: Без watchdog индекс файлов пересобирается при каждой загрузке
+        if not self.assets.watching:
+            self.assets.scan()
+        
         try:
             with open(theme_path, encoding="utf-8") as f:
                 loaded_data = json.load(f)
                 
             # Мерджим с дефолтными значениями для предотвращения ошибок
             self.theme_data = self._merge_with_defaults(loaded_data)
+            self._compile()
             logger.info(f"Theme loaded: {theme_name}/{variant}")
             return True
             
         except Exception as ex:
             logger.warning(f"Failed to load theme {theme_name}/{variant}: {ex}")
             logger.info("Using default theme")
-            self.theme_data = self.default_theme.copy()
+            self.theme_data = self._merge_with_defaults({})
+            self._compile()
             return False
 
     def _merge_with_defaults(self, loaded_data):
         """НОВОЕ: Мерджим загруженные данные с дефолтными для предотвращения ошибок"""
-        merged = self.default_theme.copy()
+        # ИСПРАВЛЕНО: Копируем и секции, иначе update() портил default_theme
+        merged = {
+            section: dict(values) if isinstance(values, dict) else values
+            for section, values in self.default_theme.items()
+        }
         
         for section, values in loaded_data.items():
             if section in merged and isinstance(values, dict):
@@ -98,6 +215,95 @@ class ThemeManager:
                 
         return merged
 
+    def _compile(self):
+        """
+        НОВОЕ: Однократная компиляция темы при загрузке.
+        Цвета -> RGBA-кортежи, шрифты -> проверенные пути, параметры -> типизированные
+        значения. Предупреждения о битых цветах и шрифтах пишутся здесь один раз,
+        а не при каждом обращении.
+        """
+        start = time.perf_counter()
+
+        palette = ThemePalette()
+        for name, hex_color in (self.theme_data.get("colors") or {}).items():
+            rgba = _parse_rgba(hex_color)
+            if rgba is None:
+                logger.warning(f"Color {name} invalid format: {hex_color}, using fallback")
+                continue
+            palette[name] = rgba
+
+        fonts = ThemeFonts()
+        for name, font_file in (self.theme_data.get("fonts") or {}).items():
+            fonts[name] = self._resolve_font(font_file)
+
+        # Первая секция с таким ключом выигрывает (как раньше в get_param)
+        params = ThemeParams()
+        for section_data in self.theme_data.values():
+            if isinstance(section_data, dict):
+                for name, value in section_data.items():
+                    params.setdefault(name, _parse_param(value))
+
+        # Цепочки фолбэков для всех известных картинок и звуков - заранее
+        images = ThemeImages(self._resolve_image)
+        if self.theme_name and self.variant:
+            names = set(self.theme_data.get("images") or {})
+            names.update(
+                os.path.splitext(f)[0] for f in self.assets.files_in(self.theme_name, self.variant)
+                if f.lower().endswith(".png")
+            )
+            for name in names:
+                images[name]
+        self._overlays = {}
+        self._sounds = {}
+        if self.theme_name:
+            names = set(self.theme_data.get("sounds") or {})
+            names.update(os.path.splitext(f)[0] for f in self.assets.files_in(self.theme_name, "sounds"))
+            for name in names:
+                self.get_sound(name)
+
+        self._compile_ms = (time.perf_counter() - start) * 1000
+
+        # Присваивание свойств обновляет все привязанные KV-правила на месте
+        start = time.perf_counter()
+        self.palette = palette
+        self.fonts = fonts
+        self.params = params
+        self.images = images
+        self.revision += 1
+        self._apply_ms = (time.perf_counter() - start) * 1000
+        logger.debug(
+            f"Theme compiled: {len(palette)} colors, {len(fonts)} fonts, "
+            f"{len(params)} params in {self._compile_ms:.2f}ms, "
+            f"widgets updated in {self._apply_ms:.2f}ms"
+        )
+
+    def _resolve_font(self, font_file):
+        """Путь к файлу шрифта или пустая строка для дефолтного шрифта Kivy"""
+        # ИСПРАВЛЕНИЕ: Если шрифт не задан или пустой, возвращаем пустую строку
+        if not font_file:
+            return ""
+        
+        if not self.theme_name:
+            logger.warning("Theme not loaded, using default font")
+            return ""
+        
+        # Проверяем, не является ли font_file уже полным путем
+        if os.path.sep in font_file or '/' in font_file:
+            path = font_file
+        else:
+            # ИСПРАВЛЕНО: Шрифты лежат в папке темы, а НЕ в папке варианта!
+            path = os.path.join(
+                self.themes_dir, self.theme_name, "fonts", font_file
+            )
+        
+        path = os.path.normpath(path)
+            
+        if not self.assets.exists(path):
+            logger.warning(f"Font not found: {path}, using default")
+            return ""  # Пустая строка = дефолтный шрифт Kivy
+            
+        return path
+
     def get_color(self, name, fallback="#ffffff"):
         """Вернуть hex-цвет по имени (например, 'primary')."""
         try:
@@ -109,72 +315,41 @@ class ThemeManager:
             return fallback
 
     def get_rgba(self, name, fallback="#ffffff"):
-        """ИСПРАВЛЕНО: Вернуть цвет в формате RGBA для Kivy (tuple 0..1)."""
+        """
+        ИСПРАВЛЕНО: Вернуть цвет в формате RGBA для Kivy (tuple 0..1).
+        Цвета разобраны заранее в _compile(), здесь только поиск в словаре.
+        """
+        rgba = self.palette.get(name)
+        if rgba is not None:
+            return rgba
+        return self._get_fallback_rgba(fallback)
+
+    def _get_fallback_rgba(self, fallback):
+        """Разобранный fallback-цвет (тоже кэшируется)"""
         try:
-            from kivy.utils import get_color_from_hex
-            hex_color = self.get_color(name, fallback)
-            
-            # ИСПРАВЛЕНИЕ: Проверяем что hex_color это строка
-            if not isinstance(hex_color, str):
-                logger.warning(f"Color {name} is not a string: {hex_color}, using fallback")
-                hex_color = fallback
-                
-            # Проверяем формат hex
-            if not hex_color.startswith('#'):
-                logger.warning(f"Color {name} invalid format: {hex_color}, using fallback")
-                hex_color = fallback
-                
-            return get_color_from_hex(hex_color)
-        except Exception as e:
-            logger.error(f"Error getting RGBA color {name}: {e}")
-            return [1, 1, 1, 1]
+            return self._fallback_rgba[fallback]
+        except KeyError:
+            rgba = _parse_rgba(fallback) or DEFAULT_RGBA
+            self._fallback_rgba[fallback] = rgba
+            return rgba
+        except TypeError:
+            # Нехешируемый fallback
+            return DEFAULT_RGBA
 
     def get_param(self, name, fallback=None):
         """Получить параметр темы (например, menu_height, button_width)."""
-        try:
-            # Ищем в разных секциях
-            for section_name, section_data in self.theme_data.items():
-                if isinstance(section_data, dict) and name in section_data:
-                    return section_data[name]
-            return fallback
-        except Exception:
-            return fallback
+        return self.params.get(name, fallback)
 
     def get_font(self, name, fallback=""):
         """ИСПРАВЛЕНО: Вернуть путь к шрифту или пустую строку для дефолта."""
-        try:
-            font_file = self.theme_data.get("fonts", {}).get(name)
-            
-            # ИСПРАВЛЕНИЕ: Если шрифт не задан или пустой, возвращаем пустую строку
-            if not font_file:
-                return ""
-            
-            if not self.theme_name:
-                logger.warning("Theme not loaded, using default font")
-                return ""
-            
-            # Проверяем, не является ли font_file уже полным путем
-            if os.path.sep in font_file or '/' in font_file:
-                path = font_file
-            else:
-                # ИСПРАВЛЕНО: Шрифты лежат в папке темы, а НЕ в папке варианта!
-                path = os.path.join(
-                    self.themes_dir, self.theme_name, "fonts", font_file
-                )
-            
-            path = os.path.normpath(path)
-                
-            if not os.path.isfile(path):
-                logger.warning(f"Font not found: {path}, using default")
-                return ""  # Пустая строка = дефолтный шрифт Kivy
-                
-            return path
-        except Exception as e:
-            logger.error(f"Error getting font {name}: {e}")
-            return ""
+        return self.fonts[name]
 
     def get_image(self, name):
         """ИСПРАВЛЕНО: Вернуть путь к изображению или пустую строку."""
+        return self.images[name]
+
+    def _resolve_image(self, name):
+        """Поиск изображения варианта (с фолбэком на фон): atlas://адрес или путь к файлу"""
         try:
             img_file = self.theme_data.get("images", {}).get(name)
             if not img_file:
@@ -185,32 +360,25 @@ class ThemeManager:
                 logger.warning("Theme not loaded, using fallback")
                 return ""
             
+            variant_dir = os.path.join(self.themes_dir, self.theme_name, self.variant)
+            
             # ИСПРАВЛЕНИЕ: Проверяем, не является ли img_file уже полным путем
             if os.path.sep in img_file or '/' in img_file:
                 # Если в img_file уже есть путь, используем его как есть
                 path = img_file
             else:
                 # Если это просто имя файла, формируем полный путь
-                path = os.path.join(
-                    self.themes_dir, self.theme_name, self.variant, img_file
-                )
+                path = os.path.join(variant_dir, img_file)
             
-            # Нормализуем путь
-            path = os.path.normpath(path)
-                
-            if not os.path.isfile(path):
-                logger.warning(f"Image not found: {path}, trying fallback")
-                # Фолбэк на дефолтный фон
-                fallback_path = os.path.join(
-                    self.themes_dir, self.theme_name, self.variant, "background.png"
-                )
-                fallback_path = os.path.normpath(fallback_path)
-                if os.path.isfile(fallback_path):
-                    return fallback_path
-                else:
-                    logger.warning(f"Fallback image also not found: {fallback_path}")
-                    return ""
-            return path
+            # ИСПРАВЛЕНО: Проверка по индексу файлов, фолбэк на дефолтный фон
+            found = self.assets.first_existing(path, os.path.join(variant_dir, "background.png"))
+            if not found:
+                logger.warning(f"Image not found: {os.path.normpath(path)}, fallback also missing")
+                return ""
+            if found != os.path.normpath(path):
+                logger.warning(f"Image not found: {os.path.normpath(path)}, using fallback")
+            # НОВОЕ: Текстура из предзагруженного атласа, если вариант упакован
+            return theme_atlas.lookup(found) or found
         except Exception as e:
             logger.error(f"Error getting image {name}: {e}")
             return ""
@@ -218,31 +386,32 @@ class ThemeManager:
     def get_overlay(self, page_name):
         """Вернуть путь к overlay-файлу для страницы."""
         try:
-            overlay_name = f"overlay_{page_name}.png"
+            return self._overlays[page_name]
+        except KeyError:
+            pass
+        try:
             if not self.theme_name or not self.variant:
                 return ""
-                
-            path = os.path.join(
-                self.themes_dir, self.theme_name, self.variant, overlay_name
-            )
-            path = os.path.normpath(path)
             
-            if os.path.isfile(path):
-                return path
+            variant_dir = os.path.join(self.themes_dir, self.theme_name, self.variant)
             # fallback: overlay_default.png
-            fallback = os.path.join(
-                self.themes_dir, self.theme_name, self.variant, "overlay_default.png"
+            path = self.assets.first_existing(
+                os.path.join(variant_dir, f"overlay_{page_name}.png"),
+                os.path.join(variant_dir, "overlay_default.png"),
             )
-            fallback = os.path.normpath(fallback)
-            if os.path.isfile(fallback):
-                return fallback
-            return ""
+            path = theme_atlas.lookup(path) or path
+            self._overlays[page_name] = path
+            return path
         except Exception as e:
             logger.error(f"Error getting overlay {page_name}: {e}")
             return ""
 
     def get_sound(self, name):
         """ИСПРАВЛЕНО: Вернуть путь к звуковому файлу по имени (например, 'click')."""
+        try:
+            return self._sounds[name]
+        except KeyError:
+            pass
         try:
             sound_file = self.theme_data.get("sounds", {}).get(name)
             if not sound_file:
@@ -261,21 +430,53 @@ class ThemeManager:
                     self.themes_dir, self.theme_name, "sounds", sound_file
                 )
             
-            # Нормализуем путь
-            path = os.path.normpath(path)
-                
-            if not os.path.isfile(path):
-                logger.warning(f"Sound not found: {path}")
-                return ""
+            path = self.assets.first_existing(path)
+            if not path:
+                logger.warning(f"Sound not found: {sound_file}")
+            self._sounds[name] = path
             return path
         except Exception as e:
             logger.error(f"Error getting sound {name}: {e}")
             return ""
 
+    def get_sounds(self):
+        """НОВОЕ: Все найденные звуки темы {имя: путь} (для предзагрузки SFX)"""
+        return {name: path for name, path in self._sounds.items() if path}
+
+    def _on_assets_changed(self, changed):
+        """
+        НОВОЕ: Файлы тем изменились на диске (watchdog, главный поток).
+        Изменённые картинки больше не берутся из атласа; если затронута
+        текущая тема - она перезагружается и экраны перекрашиваются на месте.
+        """
+        theme_atlas.forget(changed)
+        if not self.is_loaded():
+            return
+        
+        theme_dir = os.path.normpath(os.path.join(self.themes_dir, self.theme_name)) + os.sep
+        if not any(path.startswith(theme_dir) for path in changed):
+            return
+        
+        logger.info(f"🔄 Reloading theme {self.theme_name}/{self.variant} after file changes")
+        self.load(self.theme_name, self.variant)
+        event_bus.publish("theme_changed", {
+            "theme": self.theme_name,
+            "variant": self.variant,
+            "source": "assets_changed"
+        })
+
     def is_loaded(self):
         """Проверить, загружена ли тема."""
         return self.theme_name is not None and self.variant is not None
 
+    def style_key(self):
+        """
+        НОВОЕ: Ключ для кэшей стилей на экранах - (тема, вариант, revision).
+        revision меняется при каждом load(), в том числе при перезагрузке
+        той же темы после правки её файлов
+        """
+        return (self.current_theme, self.current_variant, self.revision)
+
     def diagnose_state(self):
         """НОВОЕ: Диагностика состояния ThemeManager"""
         return {
@@ -289,7 +490,15 @@ class ThemeManager:
             "colors_count": len(self.theme_data.get("colors", {})),
             "fonts_count": len(self.theme_data.get("fonts", {})),
             "images_count": len(self.theme_data.get("images", {})),
-            "sounds_count": len(self.theme_data.get("sounds", {}))
+            "sounds_count": len(self.theme_data.get("sounds", {})),
+            "assets": self.assets.diagnose_state(),
+            "compiled_colors": len(self.palette),
+            "compiled_fonts": len(self.fonts),
+            "compiled_params": len(self.params),
+            "resolved_images": len(self.images),
+            "revision": self.revision,
+            "compile_ms": round(self._compile_ms, 3),
+            "apply_ms": round(self._apply_ms, 3)
         }
 
 # ИСПРАВЛЕНО: Создаем глобальный экземпляр с правильной инициализацией
@@ -314,6 +523,35 @@ def validate_theme_manager_module():
         print(f"❌ ThemeManager module validation failed: {e}")
         return False
 
+def benchmark_theme_lookups(theme_name="minecraft", variant="light", iterations=100000):
+    """
+    НОВОЕ: Микро-бенчмарк стоимости одного обращения к цвету.
+    "before" - прежний путь (разбор hex при каждом вызове),
+    "after" - поиск в скомпилированной палитре.
+    """
+    tm = ThemeManager()
+    tm.load(theme_name, variant)
+    names = list(tm.palette) or ["primary"]
+
+    def per_lookup_ns(lookup):
+        start = time.perf_counter()
+        for i in range(iterations):
+            lookup(names[i % len(names)])
+        return (time.perf_counter() - start) * 1e9 / iterations
+
+    before = per_lookup_ns(lambda name: get_color_from_hex(tm.get_color(name)))
+    after = per_lookup_ns(tm.get_rgba)
+    result = {
+        "iterations": iterations,
+        "colors": len(names),
+        "before_ns": round(before, 1),
+        "after_ns": round(after, 1),
+        "speedup": round(before / after, 1) if after else None,
+    }
+    print(f"⏱️ get_rgba: {result['before_ns']}ns -> {result['after_ns']}ns per lookup (x{result['speedup']})")
+    return result
+
 # Только в режиме разработки
 if __name__ == "__main__":
-    validate_theme_manager_module()
\ No newline at end of file
+    validate_theme_manager_module()
+    benchmark_theme_lookups()
\ No newline at end of file
@@ -0,0 +1,254 @@
+# app/ui_ticker.py
+# НОВОЕ: Общий тикер UI вместо Clock.schedule_interval на каждом экране
+#
+# Экраны подписываются на именованные интервалы ("5s", "minute", ...),
+# срабатывания выровнены по границам настенного времени (минута начинается
+# в :00, 30-секундный интервал - в :00 и :30 и т.д.). Все интервалы,
+# которые наступают одновременно, обслуживаются одним пробуждением Clock.
+#
+# Подписки живут, пока экран виден: start_updates() подписывает,
+# stop_updates() вызывает ui_ticker.unsubscribe_owner(self).
+#
+# Использовать только из главного потока Kivy.
+
+import itertools
+import time
+from collections import deque
+from kivy.clock import Clock
+from app.logger import app_logger as logger
+
+
+# Именованные интервалы (секунды)
+CADENCES = {
+    "second": 1,
+    "2s": 2,
+    "5s": 5,
+    "30s": 30,
+    "minute": 60,
+    "5min": 300,
+    "10min": 600,
+    "hour": 3600,
+}
+
+# Запас после границы, чтобы не проснуться за миг до неё
+BOUNDARY_SLACK = 0.02
+
+# Окно для статистики пробуждений
+STATS_WINDOW = 60.0
+
+
+def _local_now():
+    """Текущее время в секундах с учётом часового пояса (для выравнивания по часам)"""
+    now = time.time()
+    return now, now + time.localtime(now).tm_gmtoff
+
+
+class UITicker:
+    """
+    НОВОЕ: Единый планировщик периодических обновлений UI.
+    Держит не больше одного Clock-события: на ближайшую границу среди
+    активных интервалов. Может быть приостановлен при погашенном экране.
+    """
+
+    def __init__(self, cadences=None):
+        self.cadences = dict(cadences or CADENCES)
+
+        # интервал -> {token: (callback, owner)}
+        self._subscriptions = {name: {} for name in self.cadences}
+        self._next_due = {}
+        self._tokens = itertools.count(1)
+        self._event = None
+        self._suspended = False
+
+        # Статистика
+        self._wakeups = deque()
+        self._callbacks = deque()
+        self._total_wakeups = 0
+        self._total_callbacks = 0
+        self._errors = 0
+        self._suspended_since = None
+
+        logger.info(f"UITicker created (cadences: {', '.join(self.cadences)})")
+
+    # ========================================
+    # ПОДПИСКИ
+    # ========================================
+
+    def subscribe(self, cadence, callback, owner=None):
+        """
+        Подписка callback() на интервал. Возвращает токен для unsubscribe.
+        owner - объект (обычно экран) для массовой отписки через unsubscribe_owner
+        """
+        if cadence not in self.cadences:
+            raise ValueError(f"Unknown ticker cadence: {cadence}")
+
+        token = next(self._tokens)
+        subscribers = self._subscriptions[cadence]
+        subscribers[token] = (callback, owner)
+
+        if len(subscribers) == 1:
+            self._next_due[cadence] = self._next_boundary(cadence)
+            self._reschedule()
+        return token
+
+    def unsubscribe(self, token):
+        for cadence, subscribers in self._subscriptions.items():
+            if subscribers.pop(token, None) is not None:
+                self._cadence_changed(cadence)
+                return True
+        return False
+
+    def unsubscribe_owner(self, owner):
+        """Отписка всех подписок объекта. Возвращает число удалённых"""
+        removed = 0
+        for cadence, subscribers in self._subscriptions.items():
+            tokens = [t for t, (_, o) in subscribers.items() if o is owner]
+            for token in tokens:
+                del subscribers[token]
+            if tokens:
+                removed += len(tokens)
+                self._cadence_changed(cadence)
+        return removed
+
+    def _cadence_changed(self, cadence):
+        if not self._subscriptions[cadence]:
+            self._next_due.pop(cadence, None)
+            self._reschedule()
+
+    def subscriber_count(self, cadence=None):
+        if cadence is not None:
+            return len(self._subscriptions.get(cadence, {}))
+        return sum(len(s) for s in self._subscriptions.values())
+
+    # ========================================
+    # ПЛАНИРОВАНИЕ
+    # ========================================
+
+    def _next_boundary(self, cadence, now=None):
+        """Следующая граница интервала по местному времени (в секундах time.time())"""
+        period = self.cadences[cadence]
+        if now is None:
+            now, local = _local_now()
+        else:
+            local = now + time.localtime(now).tm_gmtoff
+        return now + (period - local % period)
+
+    def _reschedule(self):
+        """Одно Clock-событие на ближайшую границу среди активных интервалов"""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+        if self._suspended or not self._next_due:
+            return
+
+        delay = max(0.0, min(self._next_due.values()) - time.time()) + BOUNDARY_SLACK
+        self._event = Clock.schedule_once(self._on_tick, delay)
+
+    def _on_tick(self, *args):
+        self._event = None
+        now = time.time()
+        self._record(self._wakeups, now)
+        self._total_wakeups += 1
+
+        due = [c for c, t in self._next_due.items() if t <= now + BOUNDARY_SLACK]
+        for cadence in due:
+            # Колбэк предыдущего интервала мог отписать последнего подписчика
+            if not self._subscriptions[cadence]:
+                self._next_due.pop(cadence, None)
+                continue
+            self._fire(cadence, now)
+            if self._subscriptions[cadence]:
+                # Пропущенные границы не навёрстываем - сразу следующая
+                self._next_due[cadence] = self._next_boundary(cadence, now + BOUNDARY_SLACK)
+            else:
+                self._next_due.pop(cadence, None)
+
+        self._reschedule()
+
+    def _fire(self, cadence, now):
+        # Копия: колбэк может отписаться (например при смене экрана)
+        for callback, _ in list(self._subscriptions[cadence].values()):
+            try:
+                callback()
+            except Exception as e:
+                self._errors += 1
+                logger.error(f"Error in ticker callback ({cadence}): {e}")
+            self._record(self._callbacks, now)
+            self._total_callbacks += 1
+
+    def _record(self, samples, now):
+        samples.append(now)
+        self._prune(samples, now)
+
+    def _prune(self, samples, now):
+        while samples and samples[0] < now - STATS_WINDOW:
+            samples.popleft()
+
+    # ========================================
+    # ПРИОСТАНОВКА (ПОГАШЕННЫЙ ЭКРАН)
+    # ========================================
+
+    def suspend(self):
+        """Остановка всех интервалов, подписки сохраняются"""
+        if self._suspended:
+            return
+        self._suspended = True
+        self._suspended_since = time.time()
+        self._reschedule()
+        logger.info("⏸️ UI ticker suspended")
+
+    def resume(self, refresh=True):
+        """
+        Возобновление после suspend().
+        refresh=True - один раз вызвать все активные интервалы, чтобы
+        экран сразу показал актуальные данные
+        """
+        if not self._suspended:
+            return
+        self._suspended = False
+        self._suspended_since = None
+        now = time.time()
+        for cadence in list(self._next_due):
+            self._next_due[cadence] = self._next_boundary(cadence, now)
+        if refresh:
+            for cadence in list(self._next_due):
+                self._fire(cadence, now)
+        self._reschedule()
+        logger.info("▶️ UI ticker resumed")
+
+    @property
+    def suspended(self):
+        return self._suspended
+
+    # ========================================
+    # ДИАГНОСТИКА
+    # ========================================
+
+    def snapshot(self):
+        """Статистика пробуждений за последнюю минуту"""
+        now = time.time()
+        self._prune(self._wakeups, now)
+        self._prune(self._callbacks, now)
+        return {
+            "wakeups_per_minute": len(self._wakeups),
+            "callbacks_per_minute": len(self._callbacks),
+            "total_wakeups": self._total_wakeups,
+            "total_callbacks": self._total_callbacks,
+            "errors": self._errors,
+        }
+
+    def diagnose_state(self):
+        """Диагностика состояния тикера"""
+        now = time.time()
+        return {
+            "suspended": self._suspended,
+            "suspended_for": round(now - self._suspended_since, 1) if self._suspended_since else None,
+            "subscribers": {c: len(s) for c, s in self._subscriptions.items() if s},
+            "next_due_in": {c: round(t - now, 2) for c, t in self._next_due.items()},
+            **self.snapshot(),
+        }
+
+
+# Глобальный экземпляр
+ui_ticker = UITicker()
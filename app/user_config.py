@@ -17,8 +17,11 @@ class UserConfig:
         "variant": "light",
         "language": "en",
         "location": {"latitude": None, "longitude": None},
+        # НОВОЕ: Именованные точки для погоды [{"name", "latitude", "longitude"}]
+        "locations": [],
         "auto_theme_enabled": False,
-        "light_sensor_threshold": 3
+        "light_sensor_threshold": 3,
+        "screen_cache_size": 3
     }
 
     def __init__(self, config_path="config/user_config.json"):
@@ -1,10 +1,15 @@
 # main.py — полная версия с автотемой по датчику освещенности и управлением громкости
 # ИСПРАВЛЕНО: Только методы ThemeManager, остальная функциональность сохранена
 
-from kivy.config import Config
+# НОВОЕ: Трейсер старта импортируется первым - до Kivy (убирает --trace-startup из argv)
+from app.startup_tracer import startup_tracer
+
 import sys
 import platform
 
+with startup_tracer.span("import kivy.config"):
+    from kivy.config import Config
+
 # Настройки Kivy для разных платформ
 Config.set('graphics', 'width', '1024')
 Config.set('graphics', 'height', '600')
@@ -17,61 +22,69 @@ else:
     Config.set('graphics', 'borderless', '0')
     Config.set('graphics', 'show_cursor', '1')
 
-from kivy.app import App
-from kivy.lang import Builder
-from kivy.clock import Clock
+with startup_tracer.span("import kivy"):
+    from kivy.app import App
+    from kivy.clock import Clock
 
-# Импорты страниц
-from pages.home import HomeScreen
-from pages.alarm import AlarmScreen
-from pages.schedule import ScheduleScreen
-from pages.weather import WeatherScreen
-from pages.pigs import PigsScreen
-from pages.settings import SettingsScreen
+# Страницы (pages/*) импортируются лениво через app.screen_factory
 
 # Импорты архитектуры приложения
-from app.localizer import localizer
-from app.user_config import user_config
-from app.logger import app_logger as logger
+with startup_tracer.span("import app"):
+    from app.localizer import localizer
+    from app.user_config import user_config
+    from app.logger import app_logger as logger
 
 # Импорты виджетов
-from widgets.root_widget import RootWidget
-from widgets.top_menu import TopMenu
+with startup_tracer.span("import widgets"):
+    from widgets.root_widget import RootWidget
+    from widgets.top_menu import TopMenu
 
 # Импортируем классы сервисов, а не экземпляры
-from services.audio_service import AudioService
-from services.alarm_service import AlarmService
-from services.notifications_service import NotificationService
-from services.weather_service import WeatherService
-from services.sensor_service import SensorService
-from services.pigs_service import PigsService
-from services.schedule_service import ScheduleService
-from services.auto_theme_service import AutoThemeService
-from services.volume_service import VolumeControlService
-
-# AlarmClock импорт с защитой и диагностикой
-try:
-    from services.alarm_clock import AlarmClock
-    ALARM_CLOCK_AVAILABLE = True
-    logger.info("✅ AlarmClock class imported successfully")
-except ImportError as e:
-    logger.warning(f"❌ AlarmClock unavailable: {e}")
-    AlarmClock = None
-    ALARM_CLOCK_AVAILABLE = False
+with startup_tracer.span("import services"):
+    with startup_tracer.span("import services.audio_service"):
+        from services.audio_service import AudioService
+    with startup_tracer.span("import services.alarm_service"):
+        from services.alarm_service import AlarmService
+    with startup_tracer.span("import services.notifications_service"):
+        from services.notifications_service import NotificationService
+    with startup_tracer.span("import services.weather_service"):
+        from services.weather_service import WeatherService
+    with startup_tracer.span("import services.sensor_service"):
+        from services.sensor_service import SensorService
+    with startup_tracer.span("import services.pigs_service"):
+        from services.pigs_service import PigsService
+    with startup_tracer.span("import services.schedule_service"):
+        from services.schedule_service import ScheduleService
+    with startup_tracer.span("import services.auto_theme_service"):
+        from services.auto_theme_service import AutoThemeService
+    with startup_tracer.span("import services.volume_service"):
+        from services.volume_service import VolumeControlService
+    with startup_tracer.span("import services.ringtone_library"):
+        from services.ringtone_library import RingtoneLibrary
+    from app.service_registry import ServiceRegistry
+
+    # AlarmClock импорт с защитой и диагностикой
+    try:
+        with startup_tracer.span("import services.alarm_clock"):
+            from services.alarm_clock import AlarmClock
+        ALARM_CLOCK_AVAILABLE = True
+        logger.info("✅ AlarmClock class imported successfully")
+    except ImportError as e:
+        logger.warning(f"❌ AlarmClock unavailable: {e}")
+        AlarmClock = None
+        ALARM_CLOCK_AVAILABLE = False
 
 # Импортируем theme_manager отдельно ПОСЛЕ настройки Kivy
 from app.theme_manager import ThemeManager
+from app.theme_atlas import theme_atlas
 
-# Загружаем KV файлы
-Builder.load_file('widgets/root_widget.kv')
-Builder.load_file('widgets/top_menu.kv')
-Builder.load_file('widgets/overlay_card.kv')
-Builder.load_file('pages/home.kv')
-Builder.load_file('pages/alarm.kv')
-Builder.load_file('pages/schedule.kv')
-Builder.load_file('pages/weather.kv')
-Builder.load_file('pages/pigs.kv')
-Builder.load_file('pages/settings.kv')
+# Загружаем KV файлы (через дисковый кэш скомпилированных правил)
+from app.kv_cache import kv_cache
+
+for kv_file in ('widgets/root_widget.kv', 'widgets/top_menu.kv', 'widgets/overlay_card.kv'):
+    with startup_tracer.span(f"kv load {kv_file}", cat="kv"):
+        kv_cache.load_file(kv_file)
+# KV страниц загружаются при первом показе экрана (app/screen_factory.py)
 
 logger.info("=== Bedrock 2.1 Started ===")
 
@@ -98,10 +111,12 @@ class BedrockApp(App):
         self.alarm_clock = None
         self.auto_theme_service = None
         self.volume_service = None
+        self.service_registry = None
         
         # Переменные состояния
         self._running = False
         self._setup_complete = False
+        self._first_frame_drawn = False
         
         logger.info("BedrockApp instance created")
 
@@ -109,17 +124,21 @@ class BedrockApp(App):
         """Основной билдер приложения"""
         logger.info("Building application...")
         
-        # Загружаем конфигурацию пользователя
-        self._load_user_settings()
-        
-        # Инициализируем все сервисы
-        self._initialize_services()
-        
-        # Создаем корневой виджет
-        root = RootWidget()
-        
-        # Настраиваем события
-        self._setup_events()
+        with startup_tracer.span("BedrockApp.build"):
+            # Загружаем конфигурацию пользователя
+            with startup_tracer.span("_load_user_settings"):
+                self._load_user_settings()
+            
+            # Инициализируем все сервисы
+            with startup_tracer.span("_initialize_services"):
+                self._initialize_services()
+            
+            # Создаем корневой виджет
+            with startup_tracer.span("RootWidget"):
+                root = RootWidget()
+            
+            # Настраиваем события
+            self._setup_events()
         
         # Отложенная финализация после построения UI
         Clock.schedule_once(lambda dt: self._finalize_initialization(), 1.0)
@@ -135,11 +154,19 @@ class BedrockApp(App):
             variant = self.user_config.get("variant", "light")
             language = self.user_config.get("language", "en")
             
+            # НОВОЕ: Атласы всех вариантов темы - в GPU до первого кадра,
+            # чтобы смена страниц и light/dark не читали PNG с диска
+            with startup_tracer.span("theme_atlas.prepare"):
+                theme_atlas.prepare(theme)
+            
             # ИСПРАВЛЕНО: Используем только load() метод
             if not self.theme_manager.load(theme, variant):
                 logger.warning(f"Failed to load theme {theme}/{variant}, using default")
                 self.theme_manager.load("minecraft", "light")
             
+            # НОВОЕ: Индекс файлов тем обновляется по событиям файловой системы
+            self.theme_manager.assets.start_watching()
+            
             # Применяем язык
             self.localizer.load(language)
             
@@ -157,137 +184,113 @@ class BedrockApp(App):
  
 
     def _initialize_services(self):
-        """ИСПРАВЛЕНО: Инициализация всех сервисов с правильным AudioService"""
+        """
+        ИСПРАВЛЕНО: Декларативная инициализация сервисов через ServiceRegistry.
+        Независимые сервисы стартуют параллельно, build() не ждёт медленных
+        сервисов (ALSA, I2C, mixer) - экраны проверяют готовность сами.
+        """
         try:
             logger.info("Initializing services...")
-            
-            # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: Правильная инициализация AudioService
-            try:
-                logger.info("Initializing AudioService...")
-                self.audio_service = AudioService()
-                
-                # ИСПРАВЛЕНО: AudioService НЕ имеет метода start()! 
-                # Он инициализируется в конструкторе
-                
-                # Проверяем что сервис корректно инициализирован
-                if hasattr(self.audio_service, 'diagnose_state'):
-                    logger.info("✅ AudioService initialized with diagnose_state method")
-                    # Выполняем диагностику для проверки
-                    diagnosis = self.audio_service.diagnose_state()
-                    logger.debug(f"AudioService diagnosis: {diagnosis}")
-                else:
-                    logger.error("❌ AudioService missing diagnose_state method")
-                    
-            except Exception as e:
-                logger.error(f"CRITICAL: AudioService initialization failed: {e}")
-                import traceback
-                logger.error(f"AudioService traceback: {traceback.format_exc()}")
-                self.audio_service = None
-            
-            # Конфигурация остальных сервисов (порядок КРИТИЧЕСКИ ВАЖЕН!)
-            services_config = [
-                ('alarm_service', AlarmService, {}),
-                ('notification_service', NotificationService, {}),
-                ('weather_service', WeatherService, {
-                    'lat': self.user_config.get('location', {}).get('latitude', 51.5566),
-                    'lon': self.user_config.get('location', {}).get('longitude', -0.178)
-                }),
-                ('sensor_service', SensorService, {}),
-                ('pigs_service', PigsService, {}),
-                ('schedule_service', ScheduleService, {}),
-                ('volume_service', VolumeControlService, {}),
-            ]
-            
-            # Инициализируем сервисы последовательно
-            for service_name, service_class, kwargs in services_config:
-                try:
-                    logger.info(f"Initializing {service_name}...")
-                    service_instance = service_class(**kwargs)
-                    setattr(self, service_name, service_instance)
-                    
-                    # ИСПРАВЛЕНО: Запускаем сервис если у него есть метод start
-                    if hasattr(service_instance, 'start'):
-                        service_instance.start()
-                        logger.debug(f"✅ {service_name} started")
-                    else:
-                        logger.debug(f"✅ {service_name} initialized (no start method)")
-                    
-                    logger.info(f"✅ Service initialized: {service_name}")
-                    
-                except Exception as ex:
-                    logger.error(f"❌ Failed to initialize {service_name}: {ex}")
-                    import traceback
-                    logger.error(f"{service_name} traceback: {traceback.format_exc()}")
-                    setattr(self, service_name, None)
-
-            # ЕДИНАЯ инициализация AlarmClock
-            try:
-                if ALARM_CLOCK_AVAILABLE and self.alarm_service:
-                    logger.info("Initializing AlarmClock service...")
-                    self.alarm_clock = AlarmClock()
-                    
-                    # Запускаем alarm_clock
-                    if hasattr(self.alarm_clock, 'start'):
-                        self.alarm_clock.start()
-                        logger.info("✅ AlarmClock initialized and started successfully")
-                    else:
-                        logger.warning("⚠️ AlarmClock has no start method")
-                    
-                    # Дополнительная диагностика
-                    if hasattr(self.alarm_clock, '_version'):
-                        logger.info(f"AlarmClock version: {self.alarm_clock._version}")
-                else:
-                    logger.warning("❌ AlarmClock not available or AlarmService missing")
-                    self.alarm_clock = None
-                    
-            except Exception as ex:
-                logger.error(f"❌ Failed to initialize AlarmClock: {ex}")
-                import traceback
-                logger.error(f"AlarmClock traceback: {traceback.format_exc()}")
-                self.alarm_clock = None
-
-            # Инициализация AutoThemeService
-            try:
-                if self.sensor_service and self.theme_manager:
-                    logger.info("Initializing AutoThemeService...")
-                    self.auto_theme_service = AutoThemeService(self.sensor_service, self.theme_manager)
-                    
-                    # AutoThemeService ИМЕЕТ метод start()
-                    if hasattr(self.auto_theme_service, 'start'):
-                        self.auto_theme_service.start()
-                        logger.info("✅ AutoThemeService initialized and started")
-                    else:
-                        logger.warning("⚠️ AutoThemeService has no start method")
-                else:
-                    logger.warning("❌ AutoThemeService dependencies missing")
-                    self.auto_theme_service = None
-                    
-            except Exception as ex:
-                logger.error(f"❌ Failed to initialize auto_theme_service: {ex}")
-                import traceback
-                logger.error(f"AutoThemeService traceback: {traceback.format_exc()}")
-                self.auto_theme_service = None
 
-            # Дополнительная настройка сервисов
+            location = self.user_config.get('location', {})
+            registry = ServiceRegistry(max_workers=4, on_ready=self._on_service_ready)
+            self.service_registry = registry
+
+            # Уже созданные объекты как готовые зависимости
+            registry.provide('theme_manager', self.theme_manager)
+
+            # AudioService НЕ имеет метода start() - инициализируется в конструкторе
+            registry.register('audio_service', self._create_audio_service, start=False, critical=True)
+            registry.register('alarm_service', AlarmService, critical=True)
+            registry.register('notification_service', NotificationService)
+            registry.register('weather_service', lambda: WeatherService(
+                lat=location.get('latitude', 51.5566),
+                lon=location.get('longitude', -0.178),
+                # НОВОЕ: Дополнительные точки (дом, школа, бабушка) - один запрос на все
+                locations=self.user_config.get('locations')
+            ))
+            registry.register('sensor_service', SensorService)
+            registry.register('pigs_service', PigsService)
+            registry.register('schedule_service', ScheduleService)
+            registry.register('volume_service', VolumeControlService)
+            # НОВОЕ: Индекс рингтонов - сканирование папок в start()
+            registry.register('ringtone_library', RingtoneLibrary)
+
+            # Зависимые сервисы
+            if ALARM_CLOCK_AVAILABLE:
+                registry.register('alarm_clock', lambda alarm_service: AlarmClock(),
+                                  requires=('alarm_service',))
+            else:
+                logger.warning("❌ AlarmClock not available")
+
+            registry.register('auto_theme_service', AutoThemeService,
+                              requires=('sensor_service', 'theme_manager'))
+
+            # Финальная настройка - в главном потоке после завершения всех сервисов
+            registry.add_done_callback(
+                lambda reg: Clock.schedule_once(lambda dt: self._on_services_settled(), 0)
+            )
+            registry.start_all()
+
+        except Exception as e:
+            logger.error(f"Critical error initializing services: {e}")
+            import traceback
+            logger.error(f"Services initialization traceback: {traceback.format_exc()}")
+
+    def _create_audio_service(self):
+        """Создание AudioService с проверкой диагностики"""
+        audio_service = AudioService()
+
+        # НОВОЕ: Звуки интерфейса декодируются один раз, до первого клика
+        if self.theme_manager:
+            audio_service.preload_sfx(self.theme_manager.get_sounds())
+
+        if hasattr(audio_service, 'diagnose_state'):
+            logger.info("✅ AudioService initialized with diagnose_state method")
+            diagnosis = audio_service.diagnose_state()
+            logger.debug(f"AudioService diagnosis: {diagnosis}")
+        else:
+            logger.error("❌ AudioService missing diagnose_state method")
+
+        return audio_service
+
+    def _on_service_ready(self, service_name, instance):
+        """Вызывается реестром (в рабочем потоке) до публикации service_ready"""
+        if service_name == 'theme_manager':
+            return
+        setattr(self, service_name, instance)
+
+    def _on_services_settled(self):
+        """Дополнительная настройка сервисов после завершения инициализации"""
+        try:
+            if hasattr(self.alarm_clock, '_version'):
+                logger.info(f"AlarmClock version: {self.alarm_clock._version}")
+
             self._setup_auto_theme()
             self._setup_volume_service()
-            
+
+            # НОВОЕ: Длительность рингтонов из индекса - аудио-поток ждёт конца трека без опроса
+            audio_service = getattr(self, 'audio_service', None)
+            ringtone_library = getattr(self, 'ringtone_library', None)
+            if audio_service and ringtone_library:
+                audio_service.duration_provider = ringtone_library.duration
+
             # Диагностика финального состояния сервисов
             self._diagnose_services_state()
-            
+            self.service_registry.log_summary()
+
             logger.info("✅ All services initialized")
-            
         except Exception as e:
-            logger.error(f"Critical error initializing services: {e}")
-            import traceback
-            logger.error(f"Services initialization traceback: {traceback.format_exc()}")
+            logger.error(f"Error finishing services setup: {e}")
+
     def _diagnose_services_state(self):
         """Диагностика состояния всех сервисов после инициализации"""
         logger.info("🔧 === SERVICES DIAGNOSTIC ===")
         
         services_to_check = [
             'audio_service', 'alarm_service', 'alarm_clock', 'notification_service',
-            'weather_service', 'sensor_service', 'auto_theme_service', 'volume_service'
+            'weather_service', 'sensor_service', 'auto_theme_service', 'volume_service',
+            'ringtone_library'
         ]
         
         for service_name in services_to_check:
@@ -327,15 +330,15 @@ class BedrockApp(App):
             from app.event_bus import event_bus
             
             # Подписываемся на события темы
-            event_bus.subscribe("theme_changed", self._on_theme_changed)
-            event_bus.subscribe("variant_changed", self._on_variant_changed)
-            event_bus.subscribe("language_changed", self._on_language_changed)
+            event_bus.subscribe("theme_changed", self._on_theme_changed, mode="main_thread")
+            event_bus.subscribe("variant_changed", self._on_variant_changed, mode="main_thread")
+            event_bus.subscribe("language_changed", self._on_language_changed, mode="main_thread")
             
             # ИСПРАВЛЕНО: Убираем конфликтующую подписку на auto_theme_triggered
             # event_bus.subscribe("auto_theme_triggered", self._on_auto_theme_triggered)
             
-            # Подписываемся на события громкости
-            event_bus.subscribe("volume_changed", self._on_volume_changed)
+            # Подписываемся на события громкости (сохранение конфига - вне GPIO-потока)
+            event_bus.subscribe("volume_changed", self._on_volume_changed, mode="worker")
             
             logger.info("Event handlers setup completed")
             
@@ -345,15 +348,27 @@ class BedrockApp(App):
     def _finalize_initialization(self):
         """Финальная инициализация после построения UI"""
         try:
+            # Ждём завершения инициализации сервисов, не блокируя UI
+            if self.service_registry and not self.service_registry.all_done():
+                logger.info("Finalization deferred until services are ready")
+                self.service_registry.add_done_callback(
+                    lambda reg: Clock.schedule_once(lambda dt: self._finalize_initialization(), 0)
+                )
+                return
+
             self._running = True
             
-            # Проверяем состояние всех сервисов
-            self._verify_services()
+            with startup_tracer.span("_finalize_initialization"):
+                # Проверяем состояние всех сервисов
+                self._verify_services()
 
-            self._apply_auto_theme_settings()
+                self._apply_auto_theme_settings()
+                
+                # Выполняем начальную диагностику
+                self._perform_initial_diagnostics()
             
-            # Выполняем начальную диагностику
-            self._perform_initial_diagnostics()
+            self._setup_complete = True
+            self._maybe_write_startup_trace()
             
             logger.info("Application initialization completed successfully")
             
@@ -441,6 +456,11 @@ class BedrockApp(App):
                 self.user_config.set("theme", theme)
                 self.user_config.set("variant", variant)
                 logger.debug(f"Theme saved to config: {theme}/{variant}")
+
+            # НОВОЕ: Звуки новой темы (уже загруженные повторно не декодируются)
+            audio_service = getattr(self, 'audio_service', None)
+            if audio_service and hasattr(audio_service, 'preload_sfx'):
+                audio_service.preload_sfx(self.theme_manager.get_sounds())
         except Exception as e:
             logger.error(f"Error handling theme change: {e}")
 
@@ -490,12 +510,40 @@ class BedrockApp(App):
     def on_start(self):
         """Вызывается при старте приложения"""
         logger.info("Application started")
+        
+        # НОВОЕ: Окно скрыто/свёрнуто (экран погашен) - тикер UI спит
+        from kivy.core.window import Window
+        from app.ui_ticker import ui_ticker
+        Window.bind(on_hide=lambda *a: ui_ticker.suspend(),
+                    on_minimize=lambda *a: ui_ticker.suspend(),
+                    on_show=lambda *a: ui_ticker.resume(),
+                    on_restore=lambda *a: ui_ticker.resume())
+        
+        if startup_tracer.enabled:
+            startup_tracer.instant("on_start")
+            Window.bind(on_flip=self._on_first_frame)
+
+    def _on_first_frame(self, window, *args):
+        """НОВОЕ: Отметка первого отрисованного кадра для трейсера старта"""
+        window.unbind(on_flip=self._on_first_frame)
+        startup_tracer.instant("first_frame")
+        self._first_frame_drawn = True
+        self._maybe_write_startup_trace()
+
+    def _maybe_write_startup_trace(self):
+        """НОВОЕ: Запись trace-файла, когда есть и первый кадр, и финализация"""
+        if startup_tracer.enabled and self._first_frame_drawn and self._setup_complete:
+            startup_tracer.write()
 
     def on_stop(self):
         """Корректная остановка всех сервисов при закрытии приложения"""
         try:
             logger.info("Stopping application services...")
             
+            # Даём завершиться сервисам, которые ещё инициализируются
+            if self.service_registry and not self.service_registry.wait_all(timeout=5.0):
+                logger.warning("⚠️ Some services still initializing at shutdown")
+            
             # Останавливаем AlarmClock первым чтобы избежать popup при закрытии
             if hasattr(self, 'alarm_clock') and self.alarm_clock:
                 try:
@@ -508,7 +556,7 @@ class BedrockApp(App):
             services_to_stop = [
                 'auto_theme_service', 'volume_service', 'schedule_service',
                 'pigs_service', 'sensor_service', 'weather_service',
-                'notification_service', 'audio_service'
+                'notification_service', 'audio_service', 'ringtone_library'
             ]
             
             for service_name in services_to_stop:
@@ -521,6 +569,18 @@ class BedrockApp(App):
                         except Exception as e:
                             logger.error(f"Error stopping {service_name}: {e}")
             
+            # НОВОЕ: Рабочий поток аудио (после уже поставленной команды stop)
+            if getattr(self, 'audio_service', None) and hasattr(self.audio_service, 'shutdown'):
+                self.audio_service.shutdown()
+            
+            # НОВОЕ: Наблюдатель за папкой тем
+            if hasattr(self, 'theme_manager') and self.theme_manager:
+                self.theme_manager.assets.stop_watching()
+            
+            # Останавливаем фоновые потоки event bus
+            from app.event_bus import event_bus
+            event_bus.shutdown()
+            
             logger.info("Application shutdown completed")
             
         except Exception as e:
@@ -531,7 +591,8 @@ class BedrockApp(App):
 
 if __name__ == "__main__":
     try:
-        app = BedrockApp()
+        with startup_tracer.span("BedrockApp.__init__"):
+            app = BedrockApp()
         app.run()
     except Exception as e:
         logger.error(f"Critical application error: {e}")
@@ -34,7 +34,7 @@ class AlarmScreen(Screen):
         self._auto_save_event = None
         self._settings_changed = False
         self._sound_playing = False
-        self._sound_check_event = None
+        self._ringtone_path = None
         self._initialized = False
         
         # ИСПРАВЛЕНИЕ: Добавляем дебаунсинг для всех типов кнопок
@@ -47,8 +47,13 @@ class AlarmScreen(Screen):
         self._toggle_buttons_locked = False
         
         # Подписка на события
-        event_bus.subscribe("theme_changed", self._on_theme_changed_delayed)
-        event_bus.subscribe("language_changed", self.refresh_text)
+        event_bus.subscribe("theme_changed", self._on_theme_changed_delayed, mode="main_thread")
+        event_bus.subscribe("language_changed", self.refresh_text, mode="main_thread")
+        # НОВОЕ: Окончание превью рингтона приходит событием от AudioService
+        event_bus.subscribe("playback_finished", self._on_playback_ended, mode="main_thread")
+        event_bus.subscribe("playback_failed", self._on_playback_ended, mode="main_thread")
+        # НОВОЕ: Список мелодий обновляется по событию библиотеки рингтонов
+        event_bus.subscribe("ringtones_changed", self._on_ringtones_changed, mode="main_thread")
 
     def on_pre_enter(self, *args):
         """Вызывается при входе на экран - ИСПРАВЛЕНО"""
@@ -73,7 +78,7 @@ class AlarmScreen(Screen):
             
             # ДИАГНОСТИКА: Автоматическая проверка аудио-системы
             Clock.schedule_once(lambda dt: self.test_audio_system(), 1.0)
-            event_bus.subscribe("alarm_changed", self._on_alarm_changed)
+            event_bus.subscribe("alarm_changed", self._on_alarm_changed, mode="main_thread")
             self._initialized = True
         except Exception as e:
             logger.error(f"Error in AlarmScreen.on_pre_enter: {e}")
@@ -158,9 +163,6 @@ class AlarmScreen(Screen):
             if self._auto_save_event:
                 self._auto_save_event.cancel()
                 self._auto_save_event = None
-            if self._sound_check_event:
-                self._sound_check_event.cancel()
-                self._sound_check_event = None
         except Exception as e:
             logger.error(f"Error in AlarmScreen.on_pre_leave: {e}")
         try:
@@ -488,10 +490,9 @@ class AlarmScreen(Screen):
                 app = App.get_running_app()
                 if hasattr(app, 'audio_service') and app.audio_service:
                     sound_file = f"sounds/{sound_name}.ogg"
-                    if os.path.exists(sound_file):
-                        app.audio_service.play(sound_file)
-                    else:
-                        logger.warning(f"Sound file not found: {sound_file}")
+                    # ИСПРАВЛЕНО: Канал SFX не останавливает рингтон
+                    if not app.audio_service.play_sfx(sound_file):
+                        logger.warning(f"Sound effect not played: {sound_file}")
             except Exception as fallback_error:
                 logger.error(f"Fallback sound failed: {fallback_error}")
         except Exception as e:
@@ -505,20 +506,10 @@ class AlarmScreen(Screen):
                 self._reset_play_button()
                 return
 
-            # Проходим по возможным путям к рингтонам
-            possible_paths = [
-                f"assets/sounds/ringtones/{self.selected_ringtone}",
-                f"sounds/ringtones/{self.selected_ringtone}",
-                f"assets/ringtones/{self.selected_ringtone}",
-                f"ringtones/{self.selected_ringtone}",
-                f"media/ringtones/{self.selected_ringtone}"
-            ]
-            
-            path = None
-            for p in possible_paths:
-                if os.path.exists(p):
-                    path = p
-                    break
+            # ИСПРАВЛЕНО: Путь из индекса рингтонов (пустые файлы туда не попадают)
+            app = App.get_running_app()
+            library = getattr(app, 'ringtone_library', None)
+            path = library.path(self.selected_ringtone) if library else None
                     
             if not path:
                 logger.error(f"❌ Ringtone file not found: {self.selected_ringtone}")
@@ -526,19 +517,7 @@ class AlarmScreen(Screen):
                 self._reset_play_button()
                 return
 
-            # Проверка размера файла
-            try:
-                file_size = os.path.getsize(path)
-                logger.info(f"Ringtone file size: {file_size} bytes")
-                if file_size == 0:
-                    logger.error(f"❌ Ringtone file is empty: {path}")
-                    self._play_sound("error")
-                    self._reset_play_button()
-                    return
-            except Exception as e:
-                logger.error(f"❌ Error checking file size: {e}")
 
-            app = App.get_running_app()
             if not hasattr(app, 'audio_service') or not app.audio_service:
                 logger.error("❌ Audio service not available")
                 self._play_sound("error")
@@ -554,27 +533,17 @@ class AlarmScreen(Screen):
                 self._reset_play_button()
                 return
                 
-            logger.info(f"AudioService before play - mixer initialized: {audio_service.is_mixer_initialized()}")
-            
-            # Небольшая задержка для стабильности
-            time.sleep(0.1)
-            
             # Воспроизводим рингтон
             fadein_time = 2.0 if self.alarm_fadein else 0
             logger.info(f"🎵 Calling audio_service.play with fadein={fadein_time}")
             
             try:
-                audio_service.play(path, fadein=fadein_time)
-                logger.info(f"✅ audio_service.play() completed successfully")
-                
-                # Проверяем что воспроизведение началось
-                if audio_service.is_busy():
-                    self._sound_playing = True
-                    self._start_sound_monitoring()
-                    logger.info("🎵 Ringtone playback started successfully")
-                else:
-                    logger.warning("⚠️ Audio service reported play completed but not busy")
-                    self._reset_play_button()
+                # ИСПРАВЛЕНО: Команда уходит в аудио-поток, UI не ждёт запуска
+                self._ringtone_path = path
+                future = audio_service.play(path, fadein=fadein_time)
+                future.add_done_callback(
+                    lambda f: Clock.schedule_once(lambda dt: self._on_ringtone_play_result(f), 0)
+                )
                 
             except Exception as play_error:
                 logger.error(f"❌ Error in audio_service.play(): {play_error}")
@@ -590,6 +559,23 @@ class AlarmScreen(Screen):
             logger.error(f"Traceback: {traceback.format_exc()}")
             self._reset_play_button()
 
+    def _on_ringtone_play_result(self, future):
+        """НОВОЕ: Результат запуска рингтона (главный поток)"""
+        try:
+            started = future.result()
+        except Exception as e:
+            logger.error(f"❌ Error in audio_service.play(): {e}")
+            started = False
+
+        if started:
+            self._sound_playing = True
+            logger.info("🎵 Ringtone playback started successfully")
+        elif started is False:
+            logger.warning("⚠️ Ringtone playback did not start")
+            self._play_sound("error")
+            self._reset_play_button()
+        # None - запуск заменён более новой командой (stop/play), кнопку не трогаем
+
     def stop_ringtone(self):
         """Остановка воспроизведения рингтона"""
         try:
@@ -600,7 +586,6 @@ class AlarmScreen(Screen):
                 app.audio_service.stop()
                 
             self._sound_playing = False
-            self._stop_sound_monitoring()
             self._reset_play_button()
             
             logger.info("🔇 Ringtone stopped successfully")
@@ -609,61 +594,20 @@ class AlarmScreen(Screen):
             logger.error(f"❌ Error stopping ringtone: {e}")
             # Всегда сбрасываем состояние даже при ошибке
             self._sound_playing = False
-            self._stop_sound_monitoring()
             self._reset_play_button()
 
-    def _start_sound_monitoring(self):
-        """Запуск мониторинга воспроизведения звука"""
-        logger.info("🔄 Starting ringtone sound monitoring...")
-        if self._sound_check_event:
-            self._sound_check_event.cancel()
-        
-        self._sound_check_event = Clock.schedule_interval(self._check_sound_status, 1.0)
- 
-    def _check_sound_status(self, dt):
-        """ИСПРАВЛЕНО: Проверка статуса воспроизведения звука"""
+    def _on_playback_ended(self, event_data):
+        """НОВОЕ: Рингтон доиграл, заменён другим звуком или не запустился"""
         try:
-            app = App.get_running_app()
-            if hasattr(app, 'audio_service') and app.audio_service:
-                audio_service = app.audio_service
-                
-                # ИСПРАВЛЕНИЕ: Проверяем mixer перед вызовом is_busy
-                if not audio_service.is_mixer_initialized():
-                    logger.info("🔇 Audio mixer not initialized - stopping monitoring")
-                    self._sound_playing = False
-                    self._stop_sound_monitoring()
-                    self._reset_play_button()
-                    return
-                    
-                is_busy = audio_service.is_busy()
-                current_file = getattr(audio_service, 'current_file', None)
-                
-                logger.debug(f"🔍 Ringtone check: is_busy={is_busy}, current_file={current_file}, _sound_playing={self._sound_playing}")
-                
-                # Проверяем что это действительно наш рингтон
-                if not is_busy and self._sound_playing:
-                    if current_file and 'ringtones' in current_file:
-                        logger.info("🔇 Ringtone finished playing")
-                    else:
-                        logger.info("🔇 Audio finished but wasn't ringtone")
-                    
-                    self._sound_playing = False
-                    self._stop_sound_monitoring()
-                    self._reset_play_button()
-                    
+            if not self._sound_playing or event_data.get("file") != self._ringtone_path:
+                return
+            logger.info(f"🔇 Ringtone {event_data.get('reason', 'finished')} "
+                        f"after {event_data.get('duration')}s")
+            self._reset_play_button()
         except Exception as e:
-            logger.error(f"❌ Error checking sound status: {e}")
-            # При ошибке останавливаем мониторинг
-            self._sound_playing = False
-            self._stop_sound_monitoring()
+            logger.error(f"❌ Error handling playback end: {e}")
             self._reset_play_button()
 
-    def _stop_sound_monitoring(self):
-        """Остановка мониторинга звука"""
-        if self._sound_check_event:
-            self._sound_check_event.cancel()
-            self._sound_check_event = None
-
     def _reset_play_button(self):
         """Сброс кнопки воспроизведения"""
         if hasattr(self, 'ids') and 'play_button' in self.ids:
@@ -771,23 +715,11 @@ class AlarmScreen(Screen):
     # ========================================
 
     def load_ringtones(self):
-        """Загрузка списка мелодий будильника"""
-        try:
-            ringtones = []
-            ringtone_dirs = [
-                "assets/sounds/ringtones",
-                "sounds/ringtones", 
-                "assets/ringtones",
-                "ringtones",
-                "media/ringtones"
-            ]
-            
-            for ringtone_dir in ringtone_dirs:
-                if os.path.exists(ringtone_dir):
-                    for file in os.listdir(ringtone_dir):
-                        if file.endswith(('.mp3', '.wav', '.ogg')):
-                            ringtones.append(file)
-                    break
+        """ИСПРАВЛЕНО: Список мелодий из библиотеки рингтонов (без обхода папок)"""
+        try:
+            app = App.get_running_app()
+            library = getattr(app, 'ringtone_library', None)
+            ringtones = library.names() if library else []
             
             if not ringtones:
                 ringtones = ["Bathtime In Clerkenwell.mp3"]  # Fallback
@@ -799,6 +731,20 @@ class AlarmScreen(Screen):
             logger.error(f"Error loading ringtones: {e}")
             self.ringtone_list = ["Bathtime In Clerkenwell.mp3"]
 
+    def _on_ringtones_changed(self, event_data):
+        """НОВОЕ: Библиотека рингтонов пересканирована (старт сервиса или изменения в папке)"""
+        try:
+            names = event_data.get("names") or ["Bathtime In Clerkenwell.mp3"]
+            if names == self.ringtone_list:
+                return
+            self.ringtone_list = names
+            if hasattr(self, 'ids') and 'ringtone_button' in self.ids:
+                self.ids.ringtone_button.set_values(self.ringtone_list)
+                self.ids.ringtone_button.set_selection(self.selected_ringtone)
+            logger.info(f"Ringtone list updated: {len(names)} ringtones")
+        except Exception as e:
+            logger.error(f"Error updating ringtone list: {e}")
+
     def load_alarm_config(self):
         """Загрузка конфигурации будильника"""
         try:
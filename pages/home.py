@@ -1,13 +1,21 @@
 # pages/home.py - ПОЛНАЯ ОПТИМИЗИРОВАННАЯ ВЕРСИЯ (со всеми методами)
 from kivy.uix.screenmanager import Screen
+from kivy.animation import Animation
 from kivy.clock import Clock
 from kivy.properties import StringProperty, NumericProperty
 from kivy.app import App
 import time
 import datetime
 from app.event_bus import event_bus
+from app.ui_ticker import ui_ticker
 from app.logger import app_logger as logger
 
+# Бегущая строка: скорость (px/s, как прежние 1 px каждые 0.1 s), отступ
+# между проходами и шаг анимации - ровно 1 px за шаг, 10 обновлений в секунду
+MARQUEE_SPEED = 10
+MARQUEE_GAP = 50
+MARQUEE_STEP = 1. / MARQUEE_SPEED
+
 
 class HomeScreen(Screen):
     """ОПТИМИЗИРОВАННЫЙ главный экран с часами, датой, погодой и уведомлениями"""
@@ -43,9 +51,6 @@ class HomeScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         
-        # События для обновлений
-        self._update_events = []
-        
         # ОПТИМИЗАЦИЯ: Переменные для debouncing и кэширования
         self._last_alarm_update = 0
         self._alarm_update_delay = 0.5  # Минимум 500ms между обновлениями
@@ -62,6 +67,16 @@ class HomeScreen(Screen):
         self._last_full_update = 0
         self._full_update_interval = 30  # Полное обновление каждые 30 секунд
         
+        # ИСПРАВЛЕНО: Бегущая строка - одна Animation, которая запускается
+        # только если текст не помещается
+        self._marquee_enabled = False
+        self._marquee_trigger = Clock.create_trigger(self._restart_marquee)
+        # KV уже применён в super().__init__ - ids доступны
+        if 'notification_text_label' in self.ids and 'notification_container' in self.ids:
+            self.ids.notification_text_label.bind(texture_size=self._marquee_trigger)
+            self.ids.notification_container.bind(width=self._marquee_trigger)
+        self.bind(notification_text=self._marquee_trigger)
+        
         # Инициализируем все свойства значениями по умолчанию
         self.clock_time = "--:--"
         self.current_date = ""
@@ -83,10 +98,14 @@ class HomeScreen(Screen):
         self.notification_scroll_x = 0
         
         # Подписка на события
-        event_bus.subscribe("theme_changed", self.refresh_theme)
-        event_bus.subscribe("language_changed", self.refresh_text)
+        event_bus.subscribe("theme_changed", self.refresh_theme, mode="main_thread")
+        event_bus.subscribe("language_changed", self.refresh_text, mode="main_thread")
         # ИСПРАВЛЕНО: Подписка на события изменения настроек будильника
-        event_bus.subscribe("alarm_settings_changed", self._on_alarm_settings_changed)
+        event_bus.subscribe("alarm_settings_changed", self._on_alarm_settings_changed, mode="main_thread")
+        # НОВОЕ: Сервисы стартуют в фоне - обновляем данные по мере готовности
+        event_bus.subscribe("service_ready", self._on_service_ready, mode="main_thread")
+        # НОВОЕ: Погода обновляется в фоне сервисом - перерисовываем по событию
+        event_bus.subscribe("weather_updated", self.update_weather, mode="main_thread")
         
         logger.info("HomeScreen initialized with optimizations")
         
@@ -112,21 +131,22 @@ class HomeScreen(Screen):
 
     def start_updates(self):
         """ИСПРАВЛЕНО: Запуск периодических обновлений без конфликта времени будильника"""
-        self._update_events = [
-            Clock.schedule_interval(lambda dt: self.update_time(), 1),           # Время каждую секунду
-            Clock.schedule_interval(lambda dt: self.update_weather(), 300),      # Погода каждые 5 минут
-            # ИСПРАВЛЕНО: Убираем периодическое обновление будильника - используем только события!
-            # Clock.schedule_interval(lambda dt: self.update_alarm_status(), 60),  # ← УДАЛЕНО!
-            Clock.schedule_interval(lambda dt: self.update_notifications(), 30), # Уведомления каждые 30 сек
-            Clock.schedule_interval(lambda dt: self.scroll_notification(), 0.1), # Прокрутка уведомлений
-        ]
+        # ИСПРАВЛЕНО: Общий тикер UI, срабатывания выровнены по часам
+        # Будильник периодически не опрашиваем - используем только события
+        ui_ticker.subscribe("minute", self.update_time, owner=self)          # Время - ровно на границе минуты
+        ui_ticker.subscribe("30s", self.update_notifications, owner=self)    # Уведомления каждые 30 сек
+        ui_ticker.subscribe("5min", self.update_weather, owner=self)         # Погода каждые 5 минут
+        # ИСПРАВЛЕНО: Прокрутка уведомлений только когда текст не помещается
+        self._marquee_enabled = True
+        self._marquee_trigger()
 
     def stop_updates(self):
         """Остановка периодических обновлений"""
-        for event in self._update_events:
-            if event:
-                event.cancel()
-        self._update_events = []
+        ui_ticker.unsubscribe_owner(self)
+        
+        self._marquee_enabled = False
+        self._marquee_trigger.cancel()
+        Animation.cancel_all(self, 'notification_scroll_x')
 
     def update_all_data(self):
         """ИСПРАВЛЕНО: Полное обновление всех данных только при входе на экран"""
@@ -466,38 +486,61 @@ class HomeScreen(Screen):
         except Exception as e:
             logger.error(f"Error setting welcome notification: {e}")
 
-    def scroll_notification(self, *args):
-        """Прокрутка уведомлений (бегущая строка)"""
+    def _restart_marquee(self, *args):
+        """
+        ИСПРАВЛЕНО: Бегущая строка на одной Animation.
+        Если текст помещается - анимации нет, строка стоит на месте.
+        """
         try:
-            if not hasattr(self, 'ids') or 'notification_container' not in self.ids:
+            Animation.cancel_all(self, 'notification_scroll_x')
+            
+            if not self._marquee_enabled:
                 return
-                
-            container = self.ids.notification_container
-            if not hasattr(self, 'ids') or 'notification_text_label' not in self.ids:
+            if not hasattr(self, 'ids') or 'notification_container' not in self.ids \
+                    or 'notification_text_label' not in self.ids:
                 return
                 
+            container = self.ids.notification_container
             label = self.ids.notification_text_label
             
             # Проверяем, что label и container корректно инициализированы
-            if not container.width or not label.texture_size:
+            if not container.width or not label.texture_size[0]:
                 return
             
             # Если текст помещается в контейнер, не прокручиваем
+            self.notification_scroll_x = 0
             if label.texture_size[0] <= container.width:
-                self.notification_scroll_x = 0
                 return
             
-            # Прокрутка справа налево
-            scroll_speed = 1  # пикселей за кадр
-            max_scroll = label.texture_size[0] + 50  # добавляем отступ
-            
-            self.notification_scroll_x -= scroll_speed
-            if self.notification_scroll_x < -max_scroll:
-                self.notification_scroll_x = container.width
+            self._run_marquee_pass()
                 
         except Exception as e:
             logger.error(f"Error scrolling notification: {e}")
 
+    def _run_marquee_pass(self):
+        """Один проход текста справа налево до полного ухода за край"""
+        label = self.ids.notification_text_label
+        target = -(label.texture_size[0] + MARQUEE_GAP)
+        distance = self.notification_scroll_x - target
+        
+        anim = Animation(
+            notification_scroll_x=target,
+            duration=max(distance / MARQUEE_SPEED, MARQUEE_STEP),
+            step=MARQUEE_STEP
+        )
+        anim.bind(on_complete=self._on_marquee_pass_complete)
+        anim.start(self)
+
+    def _on_marquee_pass_complete(self, *args):
+        """Следующий проход начинается от правого края контейнера"""
+        if not self._marquee_enabled:
+            return
+        try:
+            self.notification_scroll_x = self.ids.notification_container.width
+            self._run_marquee_pass()
+        except Exception as e:
+            logger.error(f"Error scrolling notification: {e}")
+
     # ========================================
     # ЦВЕТОВЫЕ МЕТОДЫ (ВАЖНО ДЛЯ ДИЗАЙНА!)
     # ========================================
@@ -733,6 +776,24 @@ class HomeScreen(Screen):
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
 
+
+    def _on_service_ready(self, event_data):
+        """НОВОЕ: Обновление данных, когда сервис завершил фоновую инициализацию"""
+        try:
+            if not isinstance(event_data, dict) or not event_data.get("ok"):
+                return
+
+            updaters = {
+                "weather_service": self.update_weather,
+                "notification_service": self.update_notifications,
+                "alarm_service": self.force_alarm_status_refresh,
+            }
+            updater = updaters.get(event_data.get("name"))
+            if updater:
+                updater()
+        except Exception as e:
+            logger.error(f"Error handling service ready: {e}")
+
             
     def force_alarm_status_refresh(self):
         """НОВОЕ: Принудительное обновление статуса будильника"""
@@ -7,6 +7,7 @@ from kivy.clock import Clock
 from kivy.app import App
 from kivy.metrics import dp
 from app.event_bus import event_bus
+from app.ui_ticker import ui_ticker
 from app.logger import app_logger as logger
 import os
 
@@ -66,11 +67,8 @@ class PigsScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Подписка на события
-        event_bus.subscribe("theme_changed", self.refresh_theme)
-        event_bus.subscribe("language_changed", self.refresh_text)
-        
-        # События для обновлений
-        self._update_events = []
+        event_bus.subscribe("theme_changed", self.refresh_theme, mode="main_thread")
+        event_bus.subscribe("language_changed", self.refresh_text, mode="main_thread")
 
     def on_pre_enter(self, *args):
         """Вызывается при входе на экран"""
@@ -120,16 +118,12 @@ class PigsScreen(Screen):
 
     def start_updates(self):
         """Запуск периодических обновлений"""
-        self._update_events = [
-            # Обновляем состояние каждые 5 минут
-            Clock.schedule_interval(lambda dt: self.update_all_data(), 300),
-        ]
+        # Обновляем состояние каждые 5 минут
+        ui_ticker.subscribe("5min", self.update_all_data, owner=self)
 
     def stop_updates(self):
         """Остановка периодических обновлений"""
-        for event in self._update_events:
-            event.cancel()
-        self._update_events = []
+        ui_ticker.unsubscribe_owner(self)
 
     def update_all_data(self, *args):
         """Полное обновление всех данных"""
@@ -1,12 +1,9 @@
 from kivy.uix.screenmanager import Screen
 from kivy.app import App
-from kivy.properties import StringProperty, ListProperty
-from kivy.clock import Clock
-from kivy.uix.label import Label
+from kivy.properties import StringProperty, ListProperty, BooleanProperty, ColorProperty
 from kivy.uix.boxlayout import BoxLayout
-from kivy.graphics import Color, RoundedRectangle
-from kivy.metrics import dp
 from app.event_bus import event_bus
+from app.ui_ticker import ui_ticker
 from datetime import datetime, timedelta
 from app.logger import app_logger as logger
 
@@ -14,6 +11,27 @@ from app.logger import app_logger as logger
 # Дни недели на английском (сокращенно)
 DAYS_EN = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
+# НОВОЕ: Метрики сетки расписания. Высота строки фиксирована (см. schedule.kv),
+# поэтому RecycleGridLayout не замеряет ячейки и вход на экран не зависит
+# от количества уроков
+SCHEDULE_COLUMNS = 5
+DEFAULT_FONT = "Roboto"
+
+
+class ScheduleCell(BoxLayout):
+    """
+    НОВОЕ: Ячейка сетки расписания (время + предмет).
+    Создаётся RecycleView только для видимых строк и переиспользуется при
+    прокрутке: все свойства приходят из словаря данных ячейки.
+    """
+    time_text = StringProperty("")
+    subject_text = StringProperty("")
+    font_name = StringProperty(DEFAULT_FONT)
+    time_color = ColorProperty([0.7, 0.7, 0.7, 1])
+    subject_color = ColorProperty([1, 1, 1, 1])
+    bg_color = ColorProperty([0, 0, 0, 0])
+    italic = BooleanProperty(False)
+
 
 class ScheduleScreen(Screen):
     """Экран расписания занятий"""
@@ -29,11 +47,14 @@ class ScheduleScreen(Screen):
     next_weekend_text = StringProperty("Next weekend soon!")
 
     def __init__(self, **kwargs):
+        # НОВОЕ: Кэш данных сетки и стилей ячеек
+        self._grid_signature = None
+        self._cell_styles = None
+        self._cell_styles_key = None
         super().__init__(**kwargs)
         # Подписка на события
-        event_bus.subscribe("language_changed", self.refresh_text)
-        event_bus.subscribe("theme_changed", self.refresh_theme)
-        self._update_events = []
+        event_bus.subscribe("language_changed", self.refresh_text, mode="main_thread")
+        event_bus.subscribe("theme_changed", self.refresh_theme, mode="main_thread")
 
     def on_pre_enter(self, *args):
         """Вызывается при входе на экран"""
@@ -59,15 +80,11 @@ class ScheduleScreen(Screen):
     def start_updates(self):
         """Запуск периодических обновлений"""
         # Обновляем текущий день раз в час
-        self._update_events = [
-            Clock.schedule_interval(lambda dt: self.update_current_day(), 3600),
-        ]
+        ui_ticker.subscribe("hour", self.update_current_day, owner=self)
 
     def stop_updates(self):
         """Остановка периодических обновлений"""
-        for event in self._update_events:
-            event.cancel()
-        self._update_events = []
+        ui_ticker.unsubscribe_owner(self)
 
     def update_schedule_data(self):
         """Обновление данных расписания"""
@@ -191,166 +208,104 @@ class ScheduleScreen(Screen):
         self.create_schedule_widgets()
 
     def create_schedule_widgets(self):
-        """Создание виджетов расписания"""
-        if not hasattr(self, 'ids') or 'schedule_container' not in self.ids:
+        """
+        ИСПРАВЛЕНО: Заполнение виртуализированной сетки расписания.
+        Виджеты не создаются: RecycleView держит ячейки только для видимых
+        строк и переиспользует их при прокрутке, здесь готовятся лишь данные.
+        Если расписание, день, тема и язык не менялись - ничего не делаем.
+        """
+        if not hasattr(self, 'ids') or 'schedule_grid' not in self.ids:
             return
-            
-        container = self.ids.schedule_container
-        container.clear_widgets()
-        
+
         tm = self.get_theme_manager()
-        
-        # Создаем колонки для каждого дня
-        for day_data in self.schedule_data:
-            day_column = self.create_day_column(day_data, tm)
-            container.add_widget(day_column)
-        
-        # Правильно устанавливаем высоту контейнера после добавления виджетов
-        Clock.schedule_once(self._fix_container_height, 0.1)
+        style_key = tm.style_key() if tm else None
+        signature = (self._schedule_signature(), style_key, self._get_language())
+        if signature == self._grid_signature:
+            return
 
-    def _fix_container_height(self, dt):
-        """Исправление высоты контейнера расписания"""
-        try:
-            if hasattr(self, 'ids') and 'schedule_container' in self.ids:
-                container = self.ids.schedule_container
-                
-                # Вычисляем максимальную высоту среди колонок
-                max_column_height = 0
-                for child in container.children:
-                    if hasattr(child, 'height'):
-                        max_column_height = max(max_column_height, child.height)
-                
-                # Устанавливаем высоту контейнера с запасом
-                if max_column_height > 0:
-                    container.height = max_column_height + dp(0)
-                    logger.debug(f"Set schedule container height to {container.height}")
-                
-                # Принудительно сбрасываем скролл наверх
-                parent_scroll = container.parent
-                if hasattr(parent_scroll, 'scroll_y'):
-                    parent_scroll.scroll_y = 1
-                    logger.debug("Reset schedule scroll to top")
-                    
-        except Exception as e:
-            logger.error(f"Error fixing container height: {e}")
+        grid = self.ids.schedule_grid
+        grid.data = self._build_grid_data(tm)
+        grid.scroll_y = 1
+        self._grid_signature = signature
+        logger.debug(f"Schedule grid data rebuilt ({len(grid.data)} cells)")
 
-    def create_day_column(self, day_data, theme_manager):
-        """Создание колонки для одного дня"""
-        day = day_data["day"]
-        is_today = day_data["is_today"]
-        lessons = day_data["lessons"]
-        
-        # Основной контейнер колонки
-        column = BoxLayout(
-            orientation="vertical",
-            spacing=dp(2),
-            size_hint_x=0.2,  # 5 колонок
-            size_hint_y=None,
-            padding=[dp(0), dp(0)]  # Добавляем padding для фона
-        )
-        
-        # Фон для текущего дня
-        if is_today and theme_manager:
-            with column.canvas.before:
-                Color(*theme_manager.get_rgba("background_highlighted"))
-                RoundedRectangle(
-                    pos=column.pos,
-                    size=column.size,
-                    radius=[dp(8)]
-                )
-            # Привязываем обновление фона к размеру и позиции
-            def update_bg(instance, value):
-                column.canvas.before.clear()
-                with column.canvas.before:
-                    Color(*theme_manager.get_rgba("background"))
-                    RoundedRectangle(
-                        pos=instance.pos,
-                        size=instance.size,
-                        radius=[dp(8)]
-                    )
-            column.bind(pos=update_bg, size=update_bg)
-        
-        # Контейнер для уроков
-        lessons_container = BoxLayout(
-            orientation="vertical",
-            spacing=dp(5),
-            padding=[dp(0), dp(0)],  # ИСПРАВЛЕНО: уменьшили верхний отступ
-            size_hint_y=None
+    def _schedule_signature(self):
+        """Дешёвый отпечаток данных расписания для пропуска лишних пересборок"""
+        return tuple(
+            (day_data["day"], day_data["is_today"],
+             tuple((lesson.get("time", ""), lesson.get("subject", "")) for lesson in day_data["lessons"]))
+            for day_data in self.schedule_data
         )
-        
-        if not lessons:
-            # Свободный день
-            app = App.get_running_app()
-            free_text = app.localizer.tr("free_day", "Free Day") if hasattr(app, 'localizer') else "Free Day"
-            free_label = Label(
-                text=free_text,
-                font_size='14sp',
-                font_name=theme_manager.get_font("main") if theme_manager else "",
-                color=theme_manager.get_rgba("text_secondary") if theme_manager else [0.7, 0.7, 0.7, 1],
-                size_hint_y=None,
-                height=dp(32),
-                halign='center',
-                italic=True
-            )
-            lessons_container.add_widget(free_label)
-            lessons_container.height = dp(48)  # Минимальная высота
+
+    def _get_language(self):
+        app = App.get_running_app()
+        localizer = getattr(app, 'localizer', None)
+        return getattr(localizer, 'language', None)
+
+    def _get_cell_styles(self, tm):
+        """Стили ячеек, вычисленные один раз на тему"""
+        key = tm.style_key() if tm else None
+        if self._cell_styles is not None and self._cell_styles_key == key:
+            return self._cell_styles
+
+        if tm:
+            styles = {
+                "font_name": tm.get_font("main") or DEFAULT_FONT,
+                "time_color": tm.get_rgba("text_accent_2"),
+                "subject_color": tm.get_rgba("text"),
+                "free_color": tm.get_rgba("text_secondary"),
+                "today_bg": tm.get_rgba("background_highlighted"),
+            }
         else:
-            # Добавляем уроки
-            total_height = 0
-            for lesson in lessons:
-                lesson_widget = self.create_lesson_widget(lesson, theme_manager, is_today)
-                lessons_container.add_widget(lesson_widget)
-                total_height += lesson_widget.height
-            
-            # Устанавливаем правильную высоту контейнера уроков
-            lessons_container.height = total_height + (len(lessons) - 1) * dp(4) + dp(16)  # spacing + padding
-        
-        column.add_widget(lessons_container)
-        
-        # Устанавливаем общую высоту колонки
-        column.height = lessons_container.height + dp(0)  # padding
-        
-        return column
+            styles = {
+                "font_name": DEFAULT_FONT,
+                "time_color": [0.7, 0.7, 0.7, 1],
+                "subject_color": [1, 1, 1, 1],
+                "free_color": [0.7, 0.7, 0.7, 1],
+                "today_bg": [1, 1, 1, 0.1],
+            }
+        styles["no_bg"] = [0, 0, 0, 0]
 
-    def create_lesson_widget(self, lesson, theme_manager, is_today):
-        """Создание виджета урока"""
-        container = BoxLayout(
-            orientation="vertical",
-            spacing=dp(0),
-            size_hint_y=None,
-            height=dp(56),  # Уменьшили высоту так как убрали кабинет
-            padding=[dp(0), dp(2)]
-        )
-        
-        # Время - выровнено по левому краю
-        time_label = Label(
-            text=lesson.get("time", ""),
-            font_size='18sp',
-            font_name=theme_manager.get_font("main") if theme_manager else "",
-            color=theme_manager.get_rgba("text_accent_2") if (theme_manager and is_today) else (theme_manager.get_rgba("text_accent_2") if theme_manager else [0.7, 0.7, 0.7, 1]),
-            size_hint_y=None,
-            height=dp(24),
-            halign='left',
-            text_size=(dp(140), None)
-        )
-        container.add_widget(time_label)
-        
-        # Предмет - выровнен по левому краю
-        subject_label = Label(
-            text=lesson.get("subject", ""),
-            font_size='16sp',
-            font_name=theme_manager.get_font("main") if theme_manager else "",
-            color=theme_manager.get_rgba("text") if theme_manager else [1, 1, 1, 1],
-            size_hint_y=None,
-            height=dp(24),
-            halign='left',
-            text_size=(dp(140), None),
-            shorten=True,
-            shorten_from='right'
-        )
-        container.add_widget(subject_label)
-        
-        return container
+        self._cell_styles = styles
+        self._cell_styles_key = key
+        return styles
+
+    def _build_grid_data(self, tm):
+        """
+        Данные ячеек построчно: строка i - i-й урок каждого дня.
+        Каждый словарь содержит все поля ячейки, т.к. ячейки переиспользуются.
+        """
+        styles = self._get_cell_styles(tm)
+        app = App.get_running_app()
+        free_text = app.localizer.tr("free_day", "Free Day") if hasattr(app, 'localizer') else "Free Day"
+
+        days = self.schedule_data[:SCHEDULE_COLUMNS]
+        rows = max([len(day_data["lessons"]) for day_data in days] + [1])
+
+        data = []
+        for row in range(rows):
+            for day_data in days:
+                lessons = day_data["lessons"]
+                bg_color = styles["today_bg"] if day_data["is_today"] else styles["no_bg"]
+                cell = {
+                    "time_text": "",
+                    "subject_text": "",
+                    "font_name": styles["font_name"],
+                    "time_color": styles["time_color"],
+                    "subject_color": styles["subject_color"],
+                    "bg_color": bg_color,
+                    "italic": False,
+                }
+                if row < len(lessons):
+                    cell["time_text"] = lessons[row].get("time", "")
+                    cell["subject_text"] = lessons[row].get("subject", "")
+                elif not lessons and row == 0:
+                    # Свободный день
+                    cell["subject_text"] = free_text
+                    cell["subject_color"] = styles["free_color"]
+                    cell["italic"] = True
+                data.append(cell)
+        return data
 
     def refresh_theme(self, *args):
         """Обновление темы"""
@@ -377,7 +332,7 @@ class ScheduleScreen(Screen):
                 self.ids.weekend_info_label.font_name = tm.get_font("main")
                 self.ids.weekend_info_label.color = tm.get_rgba("text_secondary")
         
-        # Пересоздаем виджеты с новой темой
+        # Перекрашиваем ячейки сетки (виджеты переиспользуются)
         if hasattr(self, 'ids'):
             self.create_schedule_widgets()
 
@@ -389,5 +344,5 @@ class ScheduleScreen(Screen):
         if hasattr(self, 'ids') and 'title_label' in self.ids:
             self.ids.title_label.text = self.user_header
             
-        # Пересоздаем виджеты с новой локализацией
+        # Обновляем тексты ячеек с новой локализацией
         self.create_schedule_widgets()
\ No newline at end of file
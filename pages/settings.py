@@ -3,8 +3,9 @@ from kivy.app import App
 from kivy.properties import StringProperty, BooleanProperty, NumericProperty, ListProperty
 from kivy.clock import Clock
 from app.event_bus import event_bus
+from app.ui_ticker import ui_ticker
+from app.theme_atlas import theme_atlas
 from app.logger import app_logger as logger
-import os
 import threading
 
 
@@ -45,9 +46,8 @@ class SettingsScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Подписка на события
-        event_bus.subscribe("language_changed", self.refresh_text)
-        event_bus.subscribe("theme_changed", self._on_theme_changed_delayed)
-        self._update_events = []
+        event_bus.subscribe("language_changed", self.refresh_text, mode="main_thread")
+        event_bus.subscribe("theme_changed", self._on_theme_changed_delayed, mode="main_thread")
         self._initialized = False
 
     def on_pre_enter(self, *args):
@@ -112,18 +112,14 @@ class SettingsScreen(Screen):
 
     def start_updates(self):
         """Запуск периодических обновлений"""
-        self._update_events = [
-            # Обновляем статус датчика освещения каждые 5 секунд
-            Clock.schedule_interval(lambda dt: self.update_sensor_status(), 5),
-            # ДОБАВЛЕНО: Обновляем громкость каждые 2 секунды
-            Clock.schedule_interval(lambda dt: self.update_volume_status(), 2),
-        ]
+        # Обновляем статус датчика освещения каждые 5 секунд
+        ui_ticker.subscribe("5s", self.update_sensor_status, owner=self)
+        # ДОБАВЛЕНО: Обновляем громкость каждые 2 секунды
+        ui_ticker.subscribe("2s", self.update_volume_status, owner=self)
 
     def stop_updates(self):
         """Остановка периодических обновлений"""
-        for event in self._update_events:
-            event.cancel()
-        self._update_events = []
+        ui_ticker.unsubscribe_owner(self)
 
     def _play_sound(self, sound_name):
         """ИСПРАВЛЕНО: Использование sound_manager для UI звуков"""
@@ -149,19 +145,14 @@ class SettingsScreen(Screen):
             tm = self.get_theme_manager()
             available_themes = ["minecraft"]  # По умолчанию только minecraft
             
-            # Проверяем папки тем
-            if tm:
-                themes_dir = getattr(tm, 'themes_dir', 'themes')
-                if os.path.exists(themes_dir):
-                    try:
-                        themes_found = [
-                            name for name in os.listdir(themes_dir)
-                            if os.path.isdir(os.path.join(themes_dir, name))
-                        ]
-                        if themes_found:
-                            available_themes = themes_found
-                    except Exception as e:
-                        logger.warning(f"Error reading themes directory: {e}")
+            # ИСПРАВЛЕНО: Папки тем берём из индекса ThemeManager (без listdir)
+            if tm and hasattr(tm, 'assets'):
+                try:
+                    themes_found = tm.assets.themes()
+                    if themes_found:
+                        available_themes = themes_found
+                except Exception as e:
+                    logger.warning(f"Error reading themes index: {e}")
             
             self.theme_list = available_themes
             self.theme_selector_enabled = len(available_themes) > 1
@@ -610,8 +601,9 @@ class SettingsScreen(Screen):
             
             self.current_theme = theme_name
             
-            # Применяем тему
+            # Применяем тему (атласы новой темы упаковываются/грузятся один раз)
             if hasattr(app, 'theme_manager'):
+                theme_atlas.prepare(theme_name)
                 app.theme_manager.load(theme_name, self.current_variant)
                 event_bus.publish("theme_changed", {"theme": theme_name, "variant": self.current_variant})
             
@@ -2,99 +2,116 @@ from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.properties import StringProperty, BooleanProperty, ListProperty
-from kivy.clock import Clock
 from kivy.app import App
 from kivy.metrics import dp
 from app.event_bus import event_bus
+from app.ui_ticker import ui_ticker
 from app.logger import app_logger as logger
 
 
+# Высота строки прогноза и число дней в неделе
+FORECAST_ROW_HEIGHT = 32
+FORECAST_DAYS = 7
+
+
 class DayForecastItem(BoxLayout):
-    """Виджет для отображения прогноза на один день"""
+    """
+    ИСПРАВЛЕНО: Переиспользуемая строка прогноза на один день.
+    Виджеты создаются один раз; set_data() меняет только изменившийся текст,
+    apply_theme() - шрифты и цвета при смене темы.
+    """
     
-    def __init__(self, day_data, **kwargs):
+    def __init__(self, day_data=None, **kwargs):
         super().__init__(**kwargs)
         self.orientation = "horizontal"
         self.size_hint_y = None
-        self.height = dp(32)
+        self.height = dp(FORECAST_ROW_HEIGHT)
         self.spacing = dp(8)
         self.padding = [dp(8), dp(2)]
         
-        app = App.get_running_app()
-        tm = app.theme_manager if hasattr(app, 'theme_manager') else None
+        self._day_data = None
+        self._is_weekend = False
+        self._theme_key = None
         
-        # День недели
-        day_name = day_data.get("day", "")
-        is_weekend = day_name in ["Sat", "Sun"]
-        day_color = tm.get_rgba("primary") if (tm and is_weekend) else (tm.get_rgba("text") if tm else [1, 1, 1, 1])
+        # День недели / температура / условие с Min/Max / вероятность осадков
+        self.day_label = self._make_label("left", 0.05)
+        self.temp_label = self._make_label("center", 0.15)
+        self.condition_label = self._make_label("left", 0.55)
+        self.precip_label = self._make_label("center", 0.25)
         
-        day_label = Label(
-            text=day_name,
-            font_name=tm.get_font("main") if tm else "",
-            font_size="16sp",
-            halign="left",
-            valign="middle",
-            size_hint_x=0.05,
-            color=day_color,
-            text_size=(None, None)
-        )
-        day_label.bind(size=day_label.setter('text_size'))
+        app = App.get_running_app()
+        self.apply_theme(app.theme_manager if hasattr(app, 'theme_manager') else None)
         
-        # Температура
-        temp_max = day_data.get("temp_max", 0)
-        temp_label = Label(
-            text=f"{temp_max:.1f}°C",
-            font_name=tm.get_font("main") if tm else "",
+        if day_data is not None:
+            self.set_data(day_data)
+    
+    def _make_label(self, halign, size_hint_x):
+        label = Label(
             font_size="16sp",
-            halign="center",
+            halign=halign,
             valign="middle",
-            size_hint_x=0.15,
-            color=tm.get_rgba("primary") if tm else [1, 1, 1, 1],
+            size_hint_x=size_hint_x,
             text_size=(None, None)
         )
-        temp_label.bind(size=temp_label.setter('text_size'))
+        label.bind(size=label.setter('text_size'))
+        self.add_widget(label)
+        return label
+    
+    def apply_theme(self, tm, force=False):
+        """Применение шрифтов и цветов темы (пропускается, если тема не менялась)"""
+        key = tm.style_key() if tm else None
+        if key == self._theme_key and not force:
+            return
+        self._theme_key = key
         
-        # Условие погоды с Min/Max температурами
-        condition = day_data.get("condition", "")
+        font = tm.get_font("main") if tm else ""
+        for label in (self.day_label, self.temp_label, self.condition_label, self.precip_label):
+            label.font_name = font
+        
+        self.temp_label.color = tm.get_rgba("primary") if tm else [1, 1, 1, 1]
+        self.condition_label.color = tm.get_rgba("text") if tm else [1, 1, 1, 1]
+        self.precip_label.color = tm.get_rgba("text_secondary") if tm else [0.7, 0.7, 0.7, 1]
+        self._apply_day_color(tm)
+    
+    def _apply_day_color(self, tm):
+        if tm and self._is_weekend:
+            self.day_label.color = tm.get_rgba("primary")
+        else:
+            self.day_label.color = tm.get_rgba("text") if tm else [1, 1, 1, 1]
+    
+    def set_data(self, day_data, tm=None):
+        """
+        Обновление строки данными дня.
+        Возвращает False, если данные не изменились (виджеты не трогаются)
+        """
+        if day_data == self._day_data:
+            return False
+        self._day_data = dict(day_data)
+        
+        day_name = day_data.get("day", "")
         temp_min = day_data.get("temp_min", 0)
         temp_max = day_data.get("temp_max", 0)
+        condition = day_data.get("condition", "")
         
         # Формируем строку с Min/Max перед условием
         condition_text = f"Min: {temp_min:.1f}°, Max: {temp_max:.1f}° - {condition}"
         if len(condition_text) > 50:
             condition_text = condition_text[:45] + "..."
         
-        condition_label = Label(
-            text=condition_text,
-            font_name=tm.get_font("main") if tm else "",
-            font_size="16sp",
-            halign="left",
-            valign="middle",
-            size_hint_x=0.55,
-            color=tm.get_rgba("text") if tm else [1, 1, 1, 1],
-            text_size=(None, None)
-        )
-        condition_label.bind(size=condition_label.setter('text_size'))
-        
-        # Вероятность осадков
-        precip = day_data.get("precipitation_probability", 0)
-        precip_label = Label(
-            text=f"{precip}%",
-            font_name=tm.get_font("main") if tm else "",
-            font_size="16sp",
-            halign="center",
-            valign="middle",
-            size_hint_x=0.25,
-            color=tm.get_rgba("text_secondary") if tm else [0.7, 0.7, 0.7, 1],
-            text_size=(None, None)
-        )
-        precip_label.bind(size=precip_label.setter('text_size'))
+        # Label перерисовывает текстуру только при реальной смене текста
+        self.day_label.text = day_name
+        self.temp_label.text = f"{temp_max:.1f}°C"
+        self.condition_label.text = condition_text
+        self.precip_label.text = f"{day_data.get('precipitation_probability', 0)}%"
         
-        # Добавляем все виджеты
-        self.add_widget(day_label)
-        self.add_widget(temp_label)
-        self.add_widget(condition_label)
-        self.add_widget(precip_label)
+        is_weekend = day_name in ["Sat", "Sun"]
+        if is_weekend != self._is_weekend:
+            self._is_weekend = is_weekend
+            if tm is None:
+                app = App.get_running_app()
+                tm = app.theme_manager if hasattr(app, 'theme_manager') else None
+            self._apply_day_color(tm)
+        return True
 
 
 class WeatherScreen(Screen):
@@ -116,15 +133,24 @@ class WeatherScreen(Screen):
     
     # Недельный прогноз
     weekly_forecast = ListProperty([])
+    
+    # НОВОЕ: Выбранная точка прогноза (данные всех точек уже в кэше сервиса)
+    location_name = StringProperty("")
+    has_multiple_locations = BooleanProperty(False)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Подписка на события
-        event_bus.subscribe("theme_changed", self.refresh_theme)
-        event_bus.subscribe("language_changed", self.refresh_text)
+        event_bus.subscribe("theme_changed", self.refresh_theme, mode="main_thread")
+        event_bus.subscribe("language_changed", self.refresh_text, mode="main_thread")
+        # НОВОЕ: Новые данные погоды приходят из фонового потока сервиса
+        event_bus.subscribe("weather_updated", self.update_display, mode="main_thread")
         
-        # События для обновлений
-        self._update_events = []
+        # ИСПРАВЛЕНО: Пул строк недельного прогноза
+        self._forecast_rows = []
+        self._forecast_no_data = None
+        self._forecast_padding = None
+        self._forecast_row_count = None
 
     def on_pre_enter(self, *args):
         """Вызывается при входе на экран"""
@@ -148,17 +174,13 @@ class WeatherScreen(Screen):
 
     def start_updates(self):
         """Запуск периодических обновлений"""
-        self._update_events = [
-            Clock.schedule_interval(lambda dt: self.update_weather(), 600),   # Погода каждые 10 минут
-            Clock.schedule_interval(lambda dt: self.update_sensors(), 30),    # Датчики каждые 30 секунд
-            Clock.schedule_interval(lambda dt: self.update_display(), 5),     # Отображение каждые 5 секунд
-        ]
+        ui_ticker.subscribe("10min", self.update_weather, owner=self)   # Погода каждые 10 минут
+        ui_ticker.subscribe("30s", self.update_sensors, owner=self)     # Датчики каждые 30 секунд
+        ui_ticker.subscribe("5s", self.update_display, owner=self)      # Отображение каждые 5 секунд
 
     def stop_updates(self):
         """Остановка периодических обновлений"""
-        for event in self._update_events:
-            event.cancel()
-        self._update_events = []
+        ui_ticker.unsubscribe_owner(self)
 
     def update_all(self):
         """Полное обновление всех данных"""
@@ -171,9 +193,10 @@ class WeatherScreen(Screen):
         app = App.get_running_app()
         if hasattr(app, 'weather_service') and app.weather_service:
             try:
-                # Принудительное обновление с API
-                app.weather_service.fetch_weather()
-                logger.debug("Weather data updated from API")
+                # ИСПРАВЛЕНО: Запрос обновления в фоне - без сетевых запросов в UI-потоке.
+                # Результат придёт событием weather_updated
+                app.weather_service.request_refresh(force=True)
+                logger.debug("Weather refresh requested")
             except Exception as e:
                 logger.error(f"Error updating weather: {e}")
 
@@ -194,6 +217,31 @@ class WeatherScreen(Screen):
             self.sensor_available = False
             self.using_mock_sensors = True
 
+    def _sync_locations(self, weather_service):
+        """Проверка выбранной точки по списку точек сервиса"""
+        locations = weather_service.get_locations()
+        self.has_multiple_locations = len(locations) > 1
+        if self.location_name not in locations:
+            self.location_name = locations[0] if locations else ""
+
+    def next_location(self, *args):
+        """НОВОЕ: Переключение на следующую точку - только из кэша, без сети"""
+        app = App.get_running_app()
+        if not (hasattr(app, 'weather_service') and app.weather_service):
+            return
+        
+        locations = app.weather_service.get_locations()
+        if len(locations) < 2:
+            return
+        
+        try:
+            index = locations.index(self.location_name)
+        except ValueError:
+            index = -1
+        self.location_name = locations[(index + 1) % len(locations)]
+        logger.debug(f"Weather location switched to {self.location_name}")
+        self.update_display()
+
     def update_display(self, *args):
         """Обновление отображения данных"""
         app = App.get_running_app()
@@ -201,7 +249,8 @@ class WeatherScreen(Screen):
         # Обновляем погоду
         if hasattr(app, 'weather_service') and app.weather_service:
             try:
-                weather = app.weather_service.get_weather()
+                self._sync_locations(app.weather_service)
+                weather = app.weather_service.get_weather(self.location_name or None)
                 
                 # Текущая погода
                 current = weather.get("current", {})
@@ -254,50 +303,73 @@ class WeatherScreen(Screen):
         self.sensor_air_quality = "Air Quality: Unknown"
 
     def update_weekly_forecast(self):
-        """Обновление виджета недельного прогноза"""
+        """
+        ИСПРАВЛЕНО: Обновление недельного прогноза через пул строк.
+        Строки создаются один раз и переиспользуются; при том же числе дней
+        обновляются только строки, данные которых изменились.
+        """
         if not hasattr(self, 'ids') or 'weekly_forecast_container' not in self.ids:
             return
             
         container = self.ids.weekly_forecast_container
         
         try:
-            # Очищаем предыдущие виджеты
-            container.clear_widgets()
+            tm = self.get_theme_manager()
+            days = list(self.weekly_forecast or [])
             
-            if self.weekly_forecast:
-                # Добавляем дни недели
-                for day_data in self.weekly_forecast:
-                    day_item = DayForecastItem(day_data)
-                    container.add_widget(day_item)
-                
-                # Добавляем отступ для прокрутки если нужно
-                if len(self.weekly_forecast) < 7:
-                    padding_height = (7 - len(self.weekly_forecast)) * dp(32)
-                    padding = BoxLayout(size_hint_y=None, height=padding_height)
-                    container.add_widget(padding)
-            else:
-                # Нет данных прогноза
-                tm = self.get_theme_manager()
-                
-                no_data_label = Label(
-                    text="No weekly forecast available",
-                    font_name=tm.get_font("main") if tm else "",
-                    font_size="18sp",
-                    halign="center",
-                    valign="center",
-                    color=tm.get_rgba("text_secondary") if tm else [0.7, 0.7, 0.7, 1],
-                    size_hint_y=None,
-                    height=dp(80)
-                )
-                container.add_widget(no_data_label)
-                
-                # Добавляем отступ
-                padding = BoxLayout(size_hint_y=None, height=dp(200))
-                container.add_widget(padding)
+            # Пул растёт до нужного размера
+            while len(self._forecast_rows) < len(days):
+                self._forecast_rows.append(DayForecastItem())
+            
+            # Перестановка виджетов - только при смене числа дней
+            if self._forecast_row_count != len(days):
+                self._layout_forecast(container, len(days), tm)
+            
+            changed = 0
+            for row, day_data in zip(self._forecast_rows, days):
+                row.apply_theme(tm)
+                if row.set_data(day_data, tm):
+                    changed += 1
+            
+            if changed:
+                logger.debug(f"Weekly forecast: {changed} of {len(days)} rows updated")
             
         except Exception as e:
             logger.error(f"Error updating weekly forecast: {e}")
 
+    def _layout_forecast(self, container, day_count, tm):
+        """Размещение строк из пула, надписи 'нет данных' и отступа прокрутки"""
+        if self._forecast_no_data is None:
+            self._forecast_no_data = Label(
+                text="No weekly forecast available",
+                font_size="18sp",
+                halign="center",
+                valign="center",
+                size_hint_y=None,
+                height=dp(80)
+            )
+            self._forecast_padding = BoxLayout(size_hint_y=None)
+        
+        container.clear_widgets()
+        
+        if day_count:
+            for row in self._forecast_rows[:day_count]:
+                container.add_widget(row)
+            # Добавляем отступ для прокрутки если нужно
+            padding_height = max(0, FORECAST_DAYS - day_count) * dp(FORECAST_ROW_HEIGHT)
+        else:
+            # Нет данных прогноза
+            self._forecast_no_data.font_name = tm.get_font("main") if tm else ""
+            self._forecast_no_data.color = tm.get_rgba("text_secondary") if tm else [0.7, 0.7, 0.7, 1]
+            container.add_widget(self._forecast_no_data)
+            padding_height = dp(200)
+        
+        if padding_height:
+            self._forecast_padding.height = padding_height
+            container.add_widget(self._forecast_padding)
+        
+        self._forecast_row_count = day_count
+
     def get_temperature_color(self, temp_value):
         """Получить цвет для температуры в зависимости от значения"""
         tm = self.get_theme_manager()
@@ -378,8 +450,12 @@ class WeatherScreen(Screen):
                     else:
                         widget.color = tm.get_rgba("text")
         
-        # Обновляем прогноз
-        Clock.schedule_once(lambda dt: self.update_weekly_forecast(), 0.1)
+        # ИСПРАВЛЕНО: Строки прогноза только перекрашиваются, не пересоздаются
+        for row in self._forecast_rows:
+            row.apply_theme(tm, force=True)
+        if self._forecast_no_data is not None:
+            self._forecast_no_data.font_name = tm.get_font("main")
+            self._forecast_no_data.color = tm.get_rgba("text_secondary")
 
     def refresh_text(self, *args):
         """Обновление локализованного текста"""
@@ -230,11 +230,13 @@ class AlarmClock:
             try:
                 logger.info("🔊 Attempting fallback audio playback")
                 app = App.get_running_app()
-                if hasattr(app, 'audio_service') and app.audio_service:
-                    app.audio_service.play(f"ringtones/{ringtone}")
+                library = getattr(app, 'ringtone_library', None)
+                path = library.path(ringtone) if library else None
+                if hasattr(app, 'audio_service') and app.audio_service and path:
+                    app.audio_service.play(path)
                     logger.info("✅ Fallback audio started")
                 else:
-                    logger.error("❌ No audio_service available for fallback")
+                    logger.error("❌ No audio_service or ringtone available for fallback")
             except Exception as audio_error:
                 logger.error(f"❌ Fallback audio failed: {audio_error}")
     
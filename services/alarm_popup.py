@@ -3,7 +3,6 @@
 ПОЛНОСТЬЮ ПЕРЕДЕЛАННЫЙ AlarmPopup с темизацией и правильным аудио воспроизведением
 """
 import os
-import time
 from kivy.uix.modalview import ModalView
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
@@ -11,7 +10,9 @@ from kivy.uix.label import Label
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.metrics import dp
+from app.event_bus import event_bus
 from app.logger import app_logger as logger
+from services.ringtone_library import BASE_DIR
 
 
 class AlarmPopup(ModalView):
@@ -25,7 +26,10 @@ class AlarmPopup(ModalView):
         # Состояние аудио
         self._audio_playing = False
         self._audio_path = None
-        self._audio_monitor_event = None
+        
+        # НОВОЕ: Окончание/сбой трека приходит событием от AudioService
+        event_bus.subscribe("playback_finished", self._on_playback_finished, mode="main_thread")
+        event_bus.subscribe("playback_failed", self._on_playback_failed, mode="main_thread")
         
         logger.info(f"🚨 AlarmPopup created: {alarm_time}, ringtone: {ringtone}")
         
@@ -217,104 +221,50 @@ class AlarmPopup(ModalView):
         logger.debug("Themed UI built successfully")
 
     # ========================================
-    # ИСПРАВЛЕНИЕ services/alarm_popup.py - метод _find_ringtone_path
+    # РИНГТОН БУДИЛЬНИКА
     # ========================================
 
     def _find_ringtone_path(self, ringtone_filename):
-        """ИСПРАВЛЕНО: Правильные пути с media/ringtones"""
+        """ИСПРАВЛЕНО: Путь из индекса рингтонов - без обхода папок при срабатывании"""
         if not ringtone_filename:
             logger.error("No ringtone filename provided")
             return None
             
-        # ИСПРАВЛЕНО: Правильные пути с media/ringtones первым!
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        possible_paths = [
-            # ИСПРАВЛЕНО: media/ringtones первым!
-            os.path.join(base_dir, "media", "ringtones", ringtone_filename),
-            os.path.join(base_dir, "assets", "sounds", "ringtones", ringtone_filename),
-            os.path.join(base_dir, "sounds", "ringtones", ringtone_filename),
-            os.path.join(base_dir, "assets", "ringtones", ringtone_filename),
-            os.path.join(base_dir, "ringtones", ringtone_filename),
-            # Также относительные пути
-            f"media/ringtones/{ringtone_filename}",
-            f"assets/sounds/ringtones/{ringtone_filename}",
-            f"sounds/ringtones/{ringtone_filename}",
-            f"assets/ringtones/{ringtone_filename}",
-            f"ringtones/{ringtone_filename}"
-        ]
-        
-        logger.debug(f"🔍 Searching for ringtone: {ringtone_filename}")
-        
-        for path in possible_paths:
-            try:
-                abs_path = os.path.abspath(path)
-                logger.debug(f"  Checking: {abs_path}")
-                
-                if os.path.exists(abs_path):
-                    file_size = os.path.getsize(abs_path)
-                    if file_size > 0:
-                        logger.info(f"✅ Found ringtone: {abs_path} ({file_size} bytes)")
-                        return abs_path
-                    else:
-                        logger.warning(f"⚠️ Ringtone file is empty: {abs_path}")
-                else:
-                    logger.debug(f"  ❌ Not found: {abs_path}")
-            except Exception as e:
-                logger.debug(f"  ⚠️ Error checking path {path}: {e}")
+        app = App.get_running_app()
+        library = getattr(app, 'ringtone_library', None)
+        if library is None:
+            # Библиотека ещё не готова - основная папка, файл проверит аудио-поток
+            logger.warning("ringtone_library not available, using media/ringtones")
+            return os.path.join(BASE_DIR, "media", "ringtones", ringtone_filename)
         
-        logger.error(f"❌ Ringtone not found in any location: {ringtone_filename}")
-        return None
-
-    # ========================================
-    # ИСПРАВЛЕНИЕ services/alarm_clock.py - метод _attempt_fallback_audio
-    # ========================================
+        path = library.path(ringtone_filename)
+        if path:
+            logger.info(f"✅ Found ringtone: {path}")
+        else:
+            logger.error(f"❌ Ringtone not found in any location: {ringtone_filename}")
+        return path
 
     def _attempt_fallback_audio(self, ringtone):
-        """ИСПРАВЛЕНО: Fallback аудио с правильными путями"""
+        """ИСПРАВЛЕНО: Fallback - заданный рингтон, иначе первый из библиотеки"""
         try:
             logger.info("🔊 Attempting fallback audio playback")
             app = App.get_running_app()
-            if hasattr(app, 'audio_service') and app.audio_service:
-                # ИСПРАВЛЕНО: Правильные пути с media/ringtones!
-                base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                
-                possible_paths = [
-                    # ИСПРАВЛЕНО: media/ringtones первым!
-                    os.path.join(base_dir, "media", "ringtones", ringtone),
-                    os.path.join(base_dir, "assets", "sounds", "ringtones", ringtone),
-                    os.path.join(base_dir, "sounds", "ringtones", ringtone),
-                    os.path.join(base_dir, "assets", "ringtones", ringtone),
-                    os.path.join(base_dir, "ringtones", ringtone),
-                    # Относительные пути
-                    f"media/ringtones/{ringtone}",
-                    f"assets/sounds/ringtones/{ringtone}",
-                    f"sounds/ringtones/{ringtone}",
-                    f"assets/ringtones/{ringtone}",
-                    f"ringtones/{ringtone}"
-                ]
-                
-                for path in possible_paths:
-                    try:
-                        if os.path.exists(path):
-                            file_size = os.path.getsize(path)
-                            if file_size > 0:
-                                logger.info(f"🎵 Trying fallback path: {path}")
-                                
-                                if hasattr(app.audio_service, 'play_loop'):
-                                    app.audio_service.play_loop(path)
-                                else:
-                                    app.audio_service.play(path)
-                                    
-                                logger.info("✅ Fallback audio started")
-                                return
-                    except Exception as play_error:
-                        logger.error(f"❌ Fallback audio failed for {path}: {play_error}")
-                        continue
-                
-                logger.error("❌ All fallback audio attempts failed")
-            else:
+            if not hasattr(app, 'audio_service') or not app.audio_service:
                 logger.error("❌ No audio_service available for fallback")
+                return
+            
+            path = self._find_ringtone_path(ringtone)
+            library = getattr(app, 'ringtone_library', None)
+            if not path and library:
+                names = library.names()
+                path = library.path(names[0]) if names else None
+            if not path:
+                logger.error("❌ All fallback audio attempts failed")
+                return
+            
+            logger.info(f"🎵 Trying fallback path: {path}")
+            app.audio_service.play_loop(path)
+            logger.info("✅ Fallback audio requested")
                 
         except Exception as e:
             logger.error(f"❌ Error in fallback audio: {e}")
@@ -351,25 +301,16 @@ class AlarmPopup(ModalView):
             logger.info(f"🎵 Starting audio playback: {ringtone_path}")
             
             try:
-                # ИСПРАВЛЕНО: Простой вызов без loop
-                audio_service.play(ringtone_path, fadein=0)
-                
-                # ИСПРАВЛЕНО: Простая проверка через is_busy
-                time.sleep(0.2)  # Короткая пауза для запуска
+                # ИСПРАВЛЕНО: play() ставит команду в очередь аудио-потока и не
+                # блокирует UI; результат запуска приходит через Future
+                future = audio_service.play(ringtone_path, fadein=0)
+                if hasattr(future, 'add_done_callback'):
+                    future.add_done_callback(self._on_audio_play_result)
                 
-                if hasattr(audio_service, 'is_busy') and audio_service.is_busy():
-                    self._audio_playing = True
-                    self._audio_path = ringtone_path
-                    self._start_audio_monitoring()
-                    logger.info("🔊 Alarm audio playback started successfully")
-                    return True
-                else:
-                    logger.warning("⚠️ Audio may not have started properly")
-                    # Все равно помечаем как играющее
-                    self._audio_playing = True
-                    self._audio_path = ringtone_path
-                    self._start_audio_monitoring()
-                    return True
+                self._audio_playing = True
+                self._audio_path = ringtone_path
+                logger.info("🔊 Alarm audio playback requested")
+                return True
                 
             except Exception as play_error:
                 logger.error(f"❌ Error in audio playback: {play_error}")
@@ -379,26 +320,19 @@ class AlarmPopup(ModalView):
             logger.error(f"❌ Error starting audio playbook: {e}")
             return False
 
-    # ТАКЖЕ ДОБАВЬТЕ НЕДОСТАЮЩИЙ МЕТОД (если нужен):
-    def _verify_playback_started(self, audio_service):
-        """Проверка что воспроизведение началось"""
+    def _on_audio_play_result(self, future):
+        """НОВОЕ: Результат запуска из аудио-потока (None - запуск заменён новой командой)"""
         try:
-            for attempt in range(10):  # Ждем до 1 секунды
-                if hasattr(audio_service, 'is_busy') and audio_service.is_busy():
-                    return True
-                elif hasattr(audio_service, 'is_playing') and audio_service.is_playing:
-                    return True
-                time.sleep(0.1)
-            return False
+            if future.result() is False:
+                logger.warning("⚠️ Alarm audio did not start")
         except Exception as e:
-            logger.error(f"Error verifying playback: {e}")
-            return False
+            logger.error(f"❌ Error in audio playback: {e}")
 
     # ИСПРАВЛЕНИЕ: Замените метод _restart_audio_playback:
     def _restart_audio_playback(self):
         """ИСПРАВЛЕНО: Перезапуск без loop параметра"""
         try:
-            if self._audio_path and os.path.exists(self._audio_path):
+            if self._audio_path:
                 app = App.get_running_app()
                 if hasattr(app, 'audio_service') and app.audio_service:
                     audio_service = app.audio_service
@@ -418,46 +352,36 @@ class AlarmPopup(ModalView):
             logger.error(f"Error restarting audio: {e}")
 
 
-    def _start_audio_monitoring(self):
-        """Запуск мониторинга состояния аудио"""
-        if self._audio_monitor_event:
-            self._audio_monitor_event.cancel()
-        
-        self._audio_monitor_event = Clock.schedule_interval(self._check_audio_status, 2.0)
-        logger.debug("🔄 Audio monitoring started")
-
-    def _check_audio_status(self, dt):
-        """Проверка состояния воспроизведения"""
+    def _on_playback_finished(self, event_data):
+        """НОВОЕ: Трек доиграл - будильник звучит, пока его не остановят"""
         try:
             if not self._audio_playing:
-                return False  # Останавливаем мониторинг
-            
-            app = App.get_running_app()
-            if not hasattr(app, 'audio_service') or not app.audio_service:
-                logger.warning("Audio service disappeared during monitoring")
-                return False
-            
-            audio_service = app.audio_service
-            
-            # Проверяем статус воспроизведения
-            is_playing = False
-            if hasattr(audio_service, 'is_busy'):
-                is_playing = audio_service.is_busy()
-            elif hasattr(audio_service, 'is_playing'):
-                is_playing = audio_service.is_playing()
-            
-            if not is_playing:
-                logger.info("🔇 Audio playback stopped, attempting restart...")
-                # Пытаемся перезапустить воспроизведение
-                self._restart_audio_playback()
-            
-            return True  # Продолжаем мониторинг
-            
+                return
+            reason = event_data.get("reason")
+            if reason == "replaced":
+                # Сейчас играет другой звук; перезапуск - когда он закончится
+                return
+            if event_data.get("file") != self._audio_path:
+                app = App.get_running_app()
+                audio_service = getattr(app, 'audio_service', None)
+                if audio_service and audio_service.is_busy():
+                    return
+            logger.info(f"🔇 Audio playback {reason}, restarting...")
+            self._restart_audio_playback()
         except Exception as e:
-            logger.error(f"Error in audio monitoring: {e}")
-            return False
+            logger.error(f"Error handling playback finish: {e}")
+
+    def _on_playback_failed(self, event_data):
+        """НОВОЕ: Сбой воспроизведения рингтона будильника"""
+        try:
+            if not self._audio_playing or event_data.get("file") != self._audio_path:
+                return
+            logger.error(f"❌ Alarm audio failed: {event_data.get('error')}")
+            self._audio_playing = False
+            self._show_audio_error()
+        except Exception as e:
+            logger.error(f"Error handling playback failure: {e}")
 
- 
     def _stop_audio_playback(self):
         """Остановка воспроизведения аудио"""
         try:
@@ -466,11 +390,6 @@ class AlarmPopup(ModalView):
                 
             logger.info("🛑 Stopping alarm audio...")
             
-            # Останавливаем мониторинг
-            if self._audio_monitor_event:
-                self._audio_monitor_event.cancel()
-                self._audio_monitor_event = None
-            
             # Останавливаем аудио
             app = App.get_running_app()
             if hasattr(app, 'audio_service') and app.audio_service:
@@ -611,13 +530,12 @@ class AlarmPopup(ModalView):
                 self._auto_dismiss_event.cancel()
                 self._auto_dismiss_event = None
                 
-            if self._audio_monitor_event:
-                self._audio_monitor_event.cancel()
-                self._audio_monitor_event = None
-            
             # Останавливаем аудио
             self._stop_audio_playback()
             
+            event_bus.unsubscribe("playback_finished", self._on_playback_finished)
+            event_bus.unsubscribe("playback_failed", self._on_playback_failed)
+            
             # Закрываем popup
             super().dismiss(*args)
             logger.info("❌ Alarm popup dismissed and cleaned up")
@@ -3,10 +3,14 @@
 
 import os
 import time
+import queue
 import threading
 import inspect  # 🚨 КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: Добавлен отсутствующий импорт
+from concurrent.futures import Future
 from pygame import mixer
+from app.event_bus import event_bus
 from app.logger import app_logger as logger
+from services.ringtone_library import probe_duration
 
 # Попытка импорта ALSA для прямого управления
 try:
@@ -16,6 +20,34 @@ except ImportError:
     ALSA_AVAILABLE = False
     logger.warning("alsaaudio not available - using default pygame mixer")
 
+# НОВОЕ: Каналы mixer, зарезервированные под звуки интерфейса (клик, ошибка...).
+# Звуки декодируются один раз в mixer.Sound и играют поверх музыки
+# (mixer.music - будильник, превью рингтона), не прерывая её.
+SFX_CHANNELS = 2
+SFX_DEFAULT_VOLUME = 1.0
+
+# НОВОЕ: Все операции с mixer выполняет один рабочий поток "AudioWorker".
+# Команды из одной пачки очереди склеиваются: из play/play_loop/stop
+# выполняется только последняя (быстрые play -> stop -> play дают один
+# запуск), из set_volume - тоже последняя. Заменённые команды получают
+# результат None.
+COALESCED_COMMANDS = ("music", "volume")
+WORKER_JOIN_TIMEOUT = 2.0
+
+# НОВОЕ: Окончание трека определяет рабочий поток и публикует
+# playback_started / playback_finished / playback_failed.
+# mixer.music.set_endevent не используется: очередь событий pygame требует
+# pygame.display.init(), а окном владеет Kivy. Поток спит до ожидаемого
+# конца трека (длительность из библиотеки рингтонов или по заголовку файла)
+# и подтверждает окончание одним mixer.music.get_busy(). Если трек ещё
+# играет, повторная проверка через END_RECHECK_INTERVAL (с удвоением до
+# END_POLL_INTERVAL); трек неизвестной длины проверяется раз в END_POLL_INTERVAL.
+# Бесконечный цикл (play_loop) поток не будит вовсе.
+END_RECHECK_INTERVAL = 0.25
+END_POLL_INTERVAL = 1.0
+# mixer.Sound декодирует файл целиком - только для коротких звуков
+SOUND_LENGTH_MAX_SIZE = 1024 * 1024
+
 
 class AudioService:
     """
@@ -33,14 +65,41 @@ class AudioService:
         self._mixer_initialized = False
         self._init_lock = threading.Lock()
         
+        # НОВОЕ: Очередь команд и рабочий поток
+        self._commands = queue.Queue()
+        self._worker = None
+        self._commands_done = 0
+        self._commands_coalesced = 0
+        
+        # НОВОЕ: Отслеживание окончания воспроизведения
+        self._loops = 0
+        self._playback_finished = 0
+        self._track_length = None
+        self._end_deadline = None    # time.monotonic() ожидаемого конца
+        self._end_recheck = END_RECHECK_INTERVAL
+        self._end_checks = 0
+        self._durations = {}         # (путь, размер, mtime) -> длительность (или None)
+        self.duration_provider = None  # callable(путь) -> секунды или None
+        
+        # НОВОЕ: Канал звуков интерфейса
+        self._sfx_sounds = {}      # путь -> mixer.Sound
+        self._sfx_failed = set()   # пути, которые не удалось декодировать
+        self._sfx_loading = set()  # пути в очереди на декодирование (промах в play_sfx)
+        self._sfx_channels = []
+        self._sfx_next = 0
+        self._sfx_volume = SFX_DEFAULT_VOLUME
+        self._sfx_played = 0
+        self._sfx_last_latency_ms = None
+        
         # ДОБАВЛЕНО: Версионирование и отслеживание экземпляров
         self._service_version = "2.1.0"
         self._instance_id = id(self)
         
         logger.info(f"AudioService v{self._service_version} initializing (ID: {self._instance_id})")
         
-        # Инициализируем аудиосистему с проверкой
-        self._safe_init_audio()
+        # Инициализируем аудиосистему уже в рабочем потоке
+        self._start_worker()
+        self._submit("init", self._safe_init_audio).result()
         
         logger.info(f"AudioService initialization complete. Mixer initialized: {self._mixer_initialized}")
 
@@ -58,6 +117,7 @@ class AudioService:
                     if success:
                         logger.info(f"AudioService initialized with USB device: {usb_device}")
                         self._mixer_initialized = True
+                        self._setup_sfx_channels()
                         return
                 
                 # Fallback к системному аудио
@@ -65,6 +125,7 @@ class AudioService:
                 if success:
                     logger.info("AudioService initialized with system default audio")
                     self._mixer_initialized = True
+                    self._setup_sfx_channels()
                 else:
                     logger.error("Failed to initialize any audio system")
                     self._mixer_initialized = False
@@ -154,6 +215,283 @@ class AudioService:
         except Exception as e:
             logger.debug(f"Error quitting mixer (expected during startup): {e}")
 
+    # ========================================
+    # НОВОЕ: РАБОЧИЙ ПОТОК АУДИО
+    # ========================================
+
+    def _start_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._worker_loop, name="AudioWorker", daemon=True)
+        self._worker.start()
+
+    def _submit(self, kind, func, *args, **kwargs):
+        """Постановка команды в очередь. Возвращает Future с результатом func"""
+        future = Future()
+        self._commands.put((kind, func, args, kwargs, future))
+        return future
+
+    def _worker_loop(self):
+        while True:
+            try:
+                command = self._commands.get(timeout=self._end_wait_timeout())
+            except queue.Empty:
+                self._check_playback_end()
+                continue
+            if command is None:
+                return
+
+            # Забираем всё, что накопилось, и склеиваем устаревшие команды
+            batch = [command]
+            while True:
+                try:
+                    command = self._commands.get_nowait()
+                except queue.Empty:
+                    break
+                if command is None:
+                    self._run_batch(batch)
+                    return
+                batch.append(command)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        last = {}
+        for index, (kind, *_rest) in enumerate(batch):
+            last[kind] = index
+
+        for index, (kind, func, args, kwargs, future) in enumerate(batch):
+            if kind in COALESCED_COMMANDS and last[kind] != index:
+                self._commands_coalesced += 1
+                future.set_result(None)
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                logger.error(f"❌ AudioService {kind} command error: {e}")
+                future.set_exception(e)
+            self._commands_done += 1
+
+    def _get_track_length(self, filepath):
+        """Длительность трека: библиотека рингтонов, заголовок файла, mixer.Sound (короткие)"""
+        # ИСПРАВЛЕНО: библиотека отвечает за O(1) и сама следит за заменой
+        # файлов, поэтому её ответы не кэшируются
+        if self.duration_provider is not None:
+            try:
+                length = self.duration_provider(filepath)
+                if length is not None:
+                    return length
+            except Exception as e:
+                logger.debug(f"duration_provider failed for {filepath}: {e}")
+
+        # ИСПРАВЛЕНО: кэш по (путь, размер, mtime) - заменённый файл перечитывается
+        try:
+            st = os.stat(filepath)
+            key = (filepath, st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+        if key in self._durations:
+            return self._durations[key]
+
+        length = probe_duration(filepath)
+        if length is None and not self.is_long_audio and st.st_size <= SOUND_LENGTH_MAX_SIZE:
+            try:
+                length = mixer.Sound(filepath).get_length()
+            except Exception as e:
+                logger.debug(f"Could not get length of {filepath}: {e}")
+        self._durations[key] = length
+        return length
+
+    def _arm_end_check(self, loops):
+        """Рабочий поток: когда проверять окончание только что запущенного трека"""
+        self._end_recheck = END_RECHECK_INTERVAL
+        if loops < 0:
+            self._end_deadline = None
+        elif self._track_length:
+            self._end_deadline = time.monotonic() + self._track_length * (loops + 1)
+        else:
+            self._end_deadline = time.monotonic() + END_POLL_INTERVAL
+
+    def _end_wait_timeout(self):
+        """Сколько ждать команду до проверки окончания (None - без ограничения)"""
+        if not self.is_playing or self._end_deadline is None:
+            return None
+        return max(0.0, self._end_deadline - time.monotonic())
+
+    def _check_playback_end(self):
+        """Рабочий поток: наступило ожидаемое время конца - подтверждаем по get_busy"""
+        if not self.is_playing or self._end_deadline is None:
+            return
+        if time.monotonic() < self._end_deadline:
+            return
+        self._end_checks += 1
+        try:
+            busy = mixer.music.get_busy()
+        except Exception as e:
+            logger.error(f"❌ AudioService playback check error: {e}")
+            self._finish_playback("error", failed=True, error=str(e))
+            return
+        if busy:
+            interval = self._end_recheck if self._track_length else END_POLL_INTERVAL
+            self._end_deadline = time.monotonic() + interval
+            self._end_recheck = min(self._end_recheck * 2, END_POLL_INTERVAL)
+            return
+        self._finish_playback("completed")
+
+    def _playback_payload(self, filepath=None, **extra):
+        filepath = filepath or self.current_file
+        duration = time.time() - self.last_play_time if self.last_play_time else None
+        return {
+            "file": filepath,
+            "name": os.path.basename(filepath) if filepath else None,
+            "duration": round(duration, 2) if duration is not None else None,
+            **extra,
+        }
+
+    def _finish_playback(self, reason, failed=False, error=None):
+        """Публикация playback_finished (или playback_failed) и сброс состояния"""
+        if not self.is_playing:
+            return
+        if failed:
+            payload = self._playback_payload(reason=reason, error=error)
+            event_bus.publish("playback_failed", payload)
+        else:
+            payload = self._playback_payload(reason=reason, loops=self._loops)
+            event_bus.publish("playback_finished", payload)
+        self._playback_finished += 1
+        self._end_deadline = None
+        logger.debug(f"🔚 Playback {reason}: {payload['name']} ({payload['duration']}s)")
+        self._reset_state()
+
+    def shutdown(self):
+        """Остановка рабочего потока (после уже поставленных команд)"""
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        self._commands.put(None)
+        if worker is not threading.current_thread():
+            worker.join(timeout=WORKER_JOIN_TIMEOUT)
+        self._worker = None
+
+    # ========================================
+    # НОВОЕ: ЗВУКИ ИНТЕРФЕЙСА (SFX)
+    # ========================================
+
+    def _setup_sfx_channels(self):
+        """
+        Резервирование каналов под SFX после (пере)инициализации mixer.
+        Старые mixer.Sound принадлежат прежнему mixer - декодируем заново.
+        """
+        try:
+            if mixer.get_num_channels() < SFX_CHANNELS + 1:
+                mixer.set_num_channels(SFX_CHANNELS + 1)
+            mixer.set_reserved(SFX_CHANNELS)
+            self._sfx_channels = [mixer.Channel(i) for i in range(SFX_CHANNELS)]
+            for channel in self._sfx_channels:
+                channel.set_volume(self._sfx_volume)
+            self._sfx_next = 0
+
+            paths = list(self._sfx_sounds)
+            self._sfx_sounds = {}
+            self._sfx_failed = set()
+            for path in paths:
+                self._load_sfx(path)
+            logger.debug(f"SFX channels reserved: {SFX_CHANNELS}")
+        except Exception as e:
+            logger.error(f"Error setting up SFX channels: {e}")
+            self._sfx_channels = []
+
+    def _load_sfx(self, path):
+        """Однократное декодирование звука в память"""
+        sound = self._sfx_sounds.get(path)
+        if sound is not None or path in self._sfx_failed:
+            return sound
+        try:
+            sound = mixer.Sound(path)
+        except Exception as e:
+            logger.warning(f"Cannot decode sound effect {path}: {e}")
+            self._sfx_failed.add(path)
+            return None
+        self._sfx_sounds[path] = sound
+        return sound
+
+    def preload_sfx(self, paths):
+        """
+        Декодирование звуков интерфейса заранее (при старте и смене темы).
+        paths - итерируемое путей или словарь {имя: путь}.
+        Выполняется в рабочем потоке, возвращает Future с числом звуков
+        """
+        if isinstance(paths, dict):
+            paths = paths.values()
+        return self._submit("sfx", self._do_preload_sfx, [path for path in paths if path])
+
+    def _do_preload_sfx(self, paths):
+        if not self.is_mixer_initialized():
+            self._sfx_loading.difference_update(paths)
+            logger.warning("Cannot preload sound effects - mixer not initialized")
+            return 0
+
+        start = time.perf_counter()
+        loaded = 0
+        for path in paths:
+            if self._load_sfx(path) is not None:
+                loaded += 1
+            self._sfx_loading.discard(path)
+        logger.info(f"🔊 Sound effects preloaded: {loaded} in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return loaded
+
+    def play_sfx(self, filepath, volume=None):
+        """
+        Звук интерфейса на зарезервированном канале.
+        Не останавливает mixer.music (будильник, превью), не спит и не
+        обращается к диску, если звук уже предзагружен.
+        Единственная операция mixer вне рабочего потока: Channel.play не
+        блокирует, а клик не должен ждать загрузки рингтона в очереди.
+        ИСПРАВЛЕНО: незагруженный звук не декодируется в главном потоке -
+        он ставится в очередь рабочего потока, а этот вызов возвращает False
+        """
+        if not filepath or not self._sfx_channels:
+            return False
+        start = time.perf_counter()
+        try:
+            sound = self._sfx_sounds.get(filepath)
+            if sound is None:
+                if filepath not in self._sfx_failed and filepath not in self._sfx_loading:
+                    self._sfx_loading.add(filepath)
+                    self.preload_sfx([filepath])
+                return False
+
+            # Свободный канал, иначе перезапускаем самый давний
+            channel = None
+            for offset in range(len(self._sfx_channels)):
+                candidate = self._sfx_channels[(self._sfx_next + offset) % len(self._sfx_channels)]
+                if not candidate.get_busy():
+                    channel = candidate
+                    break
+            if channel is None:
+                channel = self._sfx_channels[self._sfx_next % len(self._sfx_channels)]
+            self._sfx_next = (self._sfx_channels.index(channel) + 1) % len(self._sfx_channels)
+
+            channel.set_volume(self._sfx_volume if volume is None else max(0.0, min(1.0, volume)))
+            channel.play(sound)
+
+            self._sfx_played += 1
+            self._sfx_last_latency_ms = (time.perf_counter() - start) * 1000
+            return True
+        except Exception as e:
+            logger.error(f"❌ AudioService play_sfx error: {e}")
+            return False
+
+    def set_sfx_volume(self, value):
+        """Громкость каналов SFX (независимо от громкости музыки)"""
+        self._sfx_volume = max(0.0, min(1.0, value))
+        for channel in self._sfx_channels:
+            try:
+                channel.set_volume(self._sfx_volume)
+            except Exception as e:
+                logger.error(f"AudioService set_sfx_volume error: {e}")
+
     def is_mixer_initialized(self):
         """Проверка инициализации mixer"""
         try:
@@ -194,7 +532,20 @@ class AudioService:
                 "pygame_busy": pygame_busy,
                 "pygame_init": pygame_init,
                 "audio_device": self.audio_device,
-                "alsa_available": ALSA_AVAILABLE
+                "alsa_available": ALSA_AVAILABLE,
+                "sfx_channels": len(self._sfx_channels),
+                "sfx_loaded": len(self._sfx_sounds),
+                "sfx_loading": len(self._sfx_loading),
+                "sfx_volume": self._sfx_volume,
+                "sfx_played": self._sfx_played,
+                "sfx_last_latency_ms": round(self._sfx_last_latency_ms, 2) if self._sfx_last_latency_ms is not None else None,
+                "worker_alive": self._worker is not None and self._worker.is_alive(),
+                "queued_commands": self._commands.qsize(),
+                "commands_done": self._commands_done,
+                "commands_coalesced": self._commands_coalesced,
+                "track_length": self._track_length,
+                "end_checks": self._end_checks,
+                "playback_finished": self._playback_finished
             }
         except Exception as e:
             logger.error(f"Error in diagnose_state: {e}")
@@ -214,24 +565,52 @@ class AudioService:
         }
 
     def set_volume(self, value):
-        """ИСПРАВЛЕНО: Установка громкости с проверкой mixer"""
+        """ИСПРАВЛЕНО: Установка громкости музыки (в рабочем потоке)"""
+        return self._submit("volume", self._do_set_volume, value)
+
+    def _do_set_volume(self, value):
         if not self.is_mixer_initialized():
             logger.warning("Cannot set volume - mixer not initialized")
-            return
+            return False
             
         try:
             volume = max(0.0, min(1.0, value))
             mixer.music.set_volume(volume)
             logger.debug(f"Set pygame volume to {volume} on device {self.audio_device}")
+            return True
                     
         except Exception as e:
             logger.error(f"AudioService set_volume error: {e}")
+            return False
 
     def play(self, filepath, fadein=0):
-        """ИСПРАВЛЕНО: Воспроизведение файла с проверкой mixer"""
+        """
+        ИСПРАВЛЕНО: Воспроизведение файла.
+        Не блокирует вызывающий поток: возвращает Future с True/False
+        (None - команду заменила более новая play/play_loop/stop)
+        """
+        return self._submit("music", self._do_play, filepath, fadein, 0)
+
+    def play_async(self, filepath, fadein=0):
+        """ИСПРАВЛЕНО: Оставлено для совместимости - play() уже асинхронный"""
+        return self.play(filepath, fadein=fadein)
+        
+    def play_loop(self, filepath, fadein=0):
+        """НОВОЕ: Воспроизведение в цикле для будильников (Future, как play)"""
+        return self._submit("music", self._do_play, filepath, fadein, -1)
+
+    def _do_play(self, filepath, fadein, loops):
+        """Рабочий поток: загрузка и запуск mixer.music"""
+        # Текущий трек заменяется новым
+        self._finish_playback("replaced")
+
         if not filepath or not os.path.isfile(filepath):
             logger.warning(f"Audio file not found: {filepath}")
-            return
+            event_bus.publish("playback_failed", {
+                "file": filepath, "name": os.path.basename(filepath) if filepath else None,
+                "duration": None, "reason": "not_found", "error": "file not found",
+            })
+            return False
             
         # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: Проверяем mixer перед использованием
         if not self.is_mixer_initialized():
@@ -242,138 +621,87 @@ class AudioService:
             
             if not self.is_mixer_initialized():
                 logger.error("❌ AudioService: Failed to reinitialize mixer")
-                return
+                event_bus.publish("playback_failed", {
+                    "file": filepath, "name": os.path.basename(filepath),
+                    "duration": None, "reason": "mixer", "error": "mixer not initialized",
+                })
+                return False
             
         try:
-            with self._init_lock:  # Защищаем от concurrent access
-                is_ringtone = 'ringtones' in filepath
-                is_theme_sound = any(sound_type in filepath for sound_type in ['ui', 'click', 'error', 'success'])
-                
-                # Определяем тип аудио для правильной обработки
-                file_size = os.path.getsize(filepath)
-                self.is_long_audio = file_size > 1024 * 1024  # Больше 1MB считаем длинным
-                
-                logger.debug(f"Playing audio: {os.path.basename(filepath)}, "
-                           f"fadein={fadein}, long_audio={self.is_long_audio}")
-                
-                # Останавливаем предыдущее воспроизведение
-                if mixer.music.get_busy():
-                    mixer.music.stop()
-                    time.sleep(0.05)
-                
-                # Загружаем и воспроизводим файл
-                mixer.music.load(filepath)
-                
-                # Применяем fadein если нужно
-                if fadein > 0:
-                    mixer.music.play(loops=0, fade_ms=int(fadein * 1000))
-                else:
-                    mixer.music.play(loops=0)
-                
-                # Обновляем состояние
-                self.is_playing = True
-                self.current_file = filepath
-                self.last_play_time = time.time()
-                
-                logger.info(f"✅ Started playing: {os.path.basename(filepath)}")
-                
-        except Exception as e:
-            logger.error(f"❌ AudioService play error: {e}")
-            self._reset_state()
-
-    def play_async(self, filepath, fadein=0):
-        """ИСПРАВЛЕНО: Асинхронное воспроизведение через поток"""
-        threading.Thread(
-            target=self.play,
-            args=(filepath,),
-            kwargs={"fadein": fadein},
-            daemon=True,
-        ).start()
-        
-    def play_loop(self, filepath, fadein=0):
-        """НОВОЕ: Воспроизведение в цикле для будильников"""
-        if not filepath or not os.path.isfile(filepath):
-            logger.warning(f"Audio file not found: {filepath}")
-            return
+            # Определяем тип аудио для правильной обработки
+            file_size = os.path.getsize(filepath)
+            self.is_long_audio = file_size > 1024 * 1024  # Больше 1MB считаем длинным
             
-        if not self.is_mixer_initialized():
-            logger.error("❌ AudioService play_loop error: mixer not initialized")
-            self._safe_init_audio()
+            logger.debug(f"Playing audio: {os.path.basename(filepath)}, "
+                       f"fadein={fadein}, loops={loops}, long_audio={self.is_long_audio}")
             
-            if not self.is_mixer_initialized():
-                logger.error("❌ AudioService: Failed to reinitialize mixer")
-                return
+            # ИСПРАВЛЕНО: music.load сам заменяет текущий трек - пауза не нужна
+            if mixer.music.get_busy():
+                mixer.music.stop()
             
-        try:
-            with self._init_lock:
-                file_size = os.path.getsize(filepath)
-                self.is_long_audio = file_size > 1024 * 1024
-                
-                logger.debug(f"Playing audio in loop: {os.path.basename(filepath)}, fadein={fadein}")
-                
-                # Останавливаем предыдущее воспроизведение
-                if mixer.music.get_busy():
-                    mixer.music.stop()
-                    time.sleep(0.05)
-                
-                # Загружаем и воспроизводим в цикле
-                mixer.music.load(filepath)
-                
-                # ИСПРАВЛЕНО: loops=-1 для бесконечного цикла
-                if fadein > 0:
-                    mixer.music.play(loops=-1, fade_ms=int(fadein * 1000))
-                else:
-                    mixer.music.play(loops=-1)
-                
-                # Обновляем состояние
-                self.is_playing = True
-                self.current_file = filepath
-                self.last_play_time = time.time()
-                
-                logger.info(f"✅ Started playing in loop: {os.path.basename(filepath)}")
+            mixer.music.load(filepath)
+            self._track_length = self._get_track_length(filepath)
+            
+            # Применяем fadein если нужно
+            if fadein > 0:
+                mixer.music.play(loops=loops, fade_ms=int(fadein * 1000))
+            else:
+                mixer.music.play(loops=loops)
+            
+            # Обновляем состояние
+            self.is_playing = True
+            self.current_file = filepath
+            self.last_play_time = time.time()
+            self._loops = loops
+            self._arm_end_check(loops)
+            
+            event_bus.publish("playback_started", {
+                "file": filepath, "name": os.path.basename(filepath),
+                "duration": round(self._track_length, 2) if self._track_length else None,
+                "loops": loops, "fadein": fadein,
+            })
+            logger.info(f"✅ Started playing{' in loop' if loops < 0 else ''}: {os.path.basename(filepath)}")
+            return True
                 
         except Exception as e:
-            logger.error(f"❌ AudioService play_loop error: {e}")
+            logger.error(f"❌ AudioService play error: {e}")
+            event_bus.publish("playback_failed", {
+                "file": filepath, "name": os.path.basename(filepath),
+                "duration": None, "reason": "error", "error": str(e),
+            })
             self._reset_state()
+            return False
 
     def stop(self):
-        """ИСПРАВЛЕНО: Остановка воспроизведения с проверкой mixer"""
+        """ИСПРАВЛЕНО: Остановка воспроизведения (Future, как play)"""
         logger.debug(f"🛑 AudioService.stop() called")
-        
+        return self._submit("music", self._do_stop)
+
+    def _do_stop(self):
         if not self.is_mixer_initialized():
             logger.debug("Mixer not initialized - clearing state only")
+            self._finish_playback("stopped")
             self._reset_state()
-            return
+            return True
         
         try:
-            with self._init_lock:
-                if self.is_playing or mixer.music.get_busy():
-                    mixer.music.stop()
-                    time.sleep(0.05)  # Короткая задержка
+            if self.is_playing or mixer.music.get_busy():
+                mixer.music.stop()
+            self._finish_playback("stopped")
+            return True
         except Exception as e:
             logger.error(f"❌ AudioService stop error: {e}")
+            return False
         finally:
             self._reset_state()
 
     def is_busy(self):
-        """ИСПРАВЛЕНО: Проверка активности воспроизведения с проверкой mixer"""
-        if not self.is_mixer_initialized():
-            # Если mixer не инициализирован, сбрасываем состояние
-            if self.is_playing:
-                self._reset_state()
-            return False
-            
-        try:
-            busy = mixer.music.get_busy()
-            # Синхронизируем состояние с pygame
-            if not busy and self.is_playing:
-                logger.debug(f"🔍 Pygame not busy but is_playing=True - syncing state")
-                self._reset_state()
-            return busy
-        except Exception as e:
-            logger.error(f"❌ AudioService is_busy error: {e}")
-            self._reset_state()
-            return False
+        """
+        ИСПРАВЛЕНО: Играет ли музыка.
+        Состояние ведёт рабочий поток по событию окончания трека,
+        поэтому вызов не обращается к mixer и не требует опроса
+        """
+        return self.is_playing and self.is_mixer_initialized()
 
     def _reset_state(self):
         """ДОБАВЛЕНО: Сброс внутреннего состояния"""
@@ -401,8 +729,12 @@ class AudioService:
         return info
 
     def reinitialize_audio(self):
-        """ДОБАВЛЕНО: Переинициализация аудиосистемы"""
+        """ДОБАВЛЕНО: Переинициализация аудиосистемы (Future с True/False)"""
         logger.info("Reinitializing audio system...")
+        return self._submit("init", self._do_reinitialize_audio)
+
+    def _do_reinitialize_audio(self):
+        self._finish_playback("stopped")
         self._safe_init_audio()
         return self.is_mixer_initialized()
 
@@ -434,11 +766,13 @@ class AudioService:
         return devices
 
     def switch_device(self, device_identifier):
-        """Переключение на другое аудиоустройство"""
+        """Переключение на другое аудиоустройство (Future с True/False)"""
         logger.info(f"Switching audio device to: {device_identifier}")
-        
+        return self._submit("init", self._do_switch_device, device_identifier)
+
+    def _do_switch_device(self, device_identifier):
         # Останавливаем текущее воспроизведение
-        self.stop()
+        self._do_stop()
         
         # Переинициализируем с новым устройством
         with self._init_lock:
@@ -460,6 +794,9 @@ class AudioService:
                     if self._init_pygame_default():
                         self._mixer_initialized = True
                         logger.info("Fallback to system default audio successful")
+                
+                if self._mixer_initialized:
+                    self._setup_sfx_channels()
                     
                 return self._mixer_initialized
                     
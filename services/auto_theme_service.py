@@ -34,6 +34,9 @@ class AutoThemeService:
         # Блокировка для thread safety
         self._lock = threading.RLock()
         
+        # НОВОЕ: Длительность последнего переключения темы (мс)
+        self._last_switch_ms = None
+        
         logger.info("AutoThemeService v2.0.2 initialized - final version")
         
     def start(self):
@@ -94,7 +97,8 @@ class AutoThemeService:
                     'running': self.running,
                     'sensor_available': sensor_available,
                     'current_light': self.current_light_state,
-                    'threshold_seconds': self.threshold_seconds
+                    'threshold_seconds': self.threshold_seconds,
+                    'last_switch_ms': round(self._last_switch_ms, 1) if self._last_switch_ms is not None else None
                 }
             except Exception as e:
                 logger.error(f"Error getting status: {e}")
@@ -163,8 +167,13 @@ class AutoThemeService:
             logger.error(f"Error scheduling theme switch: {e}")
             
     def _do_switch_theme_on_main_thread(self, variant):
-        """ИСПРАВЛЕНО: Пересоздание экранов с правильными методами"""
-        logger.info(f"🎨 Theme switch with screen recreation: {variant}")
+        """
+        ИСПРАВЛЕНО: Переключение темы на месте, без пересоздания экранов.
+        KV-правила привязаны к свойствам ThemeManager (palette/fonts/images),
+        поэтому load() перекрашивает существующее дерево виджетов за один кадр.
+        Виджеты, созданные из Python, обновляются по событию theme_changed.
+        """
+        logger.info(f"🎨 In-place theme switch: {variant}")
         
         try:
             app = App.get_running_app()
@@ -172,64 +181,39 @@ class AutoThemeService:
                 logger.error("❌ App or ThemeManager not available")
                 return
             
-            # Получаем информацию о текущем состоянии через правильные атрибуты
             current_theme = getattr(app.theme_manager, 'theme_name', 'minecraft')
             current_variant = getattr(app.theme_manager, 'variant', 'light')
-            current_screen = "home"
-            
-            if not hasattr(app, 'root') or not app.root:
-                logger.error("❌ App.root not available")
-                return
-            
-            logger.debug(f"📋 App.root type: {type(app.root).__name__}")
-            
-            # Поиск ScreenManager
-            screen_manager = self._find_screen_manager(app)
-            if not screen_manager:
-                logger.error("❌ ScreenManager not found anywhere!")
-                return
-            
-            # Получаем текущий экран
-            try:
-                current_screen = screen_manager.current
-                logger.info(f"📋 Current screen before switch: {current_screen}")
-            except Exception as e:
-                logger.warning(f"⚠️ Could not get current screen: {e}")
-                current_screen = "home"
                 
             if current_variant == variant:
                 logger.info(f"⏭️ Theme already {variant}")
                 return
             
-            logger.info(f"🔄 Switching {current_theme}: {current_variant} → {variant} (screen: {current_screen})")
+            logger.info(f"🔄 Switching {current_theme}: {current_variant} → {variant}")
+            start = time.perf_counter()
             
-            # 1. ИСПРАВЛЕНО: Загружаем новую тему через единственный метод load()
+            # 1. Загрузка темы - KV-привязки обновляются сразу
             success = app.theme_manager.load(current_theme, variant)
                 
             if not success:
                 logger.error(f"❌ Failed to load theme")
                 return
             
-            logger.info(f"✅ Theme loaded: {current_theme}/{variant}")
-            
             # 2. Сохраняем в конфиг
             if hasattr(app, 'user_config') and app.user_config:
                 app.user_config.set('variant', variant)
             
-            # 3. Пересоздаем экраны
-            self._recreate_screens_simple(app, screen_manager, current_screen)
-            
-            # 4. Публикуем событие
+            # 3. Публикуем событие - обработчики main_thread получат его пачкой в следующем кадре
             event_bus.publish("theme_changed", {
                 "theme": current_theme,
                 "variant": variant,
-                "source": "auto_theme_recreation"
+                "source": "auto_theme"
             })
             
-            logger.info(f"🎉 Theme recreation completed: {current_theme}/{variant}")
+            self._last_switch_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"🎉 Theme switched in place: {current_theme}/{variant} in {self._last_switch_ms:.1f}ms")
             
         except Exception as e:
-            logger.error(f"❌ Error in theme recreation: {e}")
+            logger.error(f"❌ Error in theme switch: {e}")
             import traceback
             logger.error(traceback.format_exc())
 
@@ -262,77 +246,6 @@ class AutoThemeService:
         logger.warning("❌ ScreenManager not found in any location")
         return None
 
-    def _recreate_screens_simple(self, app, screen_manager, restore_screen="home"):
-        """Пересоздание экранов + TopMenu"""
-        try:
-            logger.info("🔄 Recreating screens and TopMenu...")
-            
-            # Импортируем классы экранов
-            from pages.home import HomeScreen
-            from pages.alarm import AlarmScreen  
-            from pages.schedule import ScheduleScreen
-            from pages.weather import WeatherScreen
-            from pages.pigs import PigsScreen
-            from pages.settings import SettingsScreen
-            
-            # Удаляем старые экраны
-            screen_manager.clear_widgets()
-            logger.debug("🗑️ Old screens cleared")
-            
-            # Создаем новые экраны
-            screens = [
-                HomeScreen(name="home"),
-                AlarmScreen(name="alarm"),
-                ScheduleScreen(name="schedule"), 
-                WeatherScreen(name="weather"),
-                PigsScreen(name="pigs"),
-                SettingsScreen(name="settings")
-            ]
-            
-            # Добавляем новые экраны
-            for screen in screens:
-                screen_manager.add_widget(screen)
-                logger.debug(f"✅ Created new {screen.name} screen")
-            
-            # Восстанавливаем текущий экран
-            screen_manager.current = restore_screen
-            app.root.current_page = restore_screen
-            
-            # Принудительное обновление TopMenu
-            top_menu = None
-            if hasattr(app.root, 'ids') and 'topmenu' in app.root.ids:
-                top_menu = app.root.ids.topmenu
-            elif hasattr(app.root, 'ids') and 'top_menu' in app.root.ids:
-                top_menu = app.root.ids.top_menu
-            
-            if top_menu:
-                # Обновляем текущую страницу
-                top_menu.current_page = restore_screen
-                
-                # Принудительно обновляем тему TopMenu (методы существуют!)
-                if hasattr(top_menu, 'force_complete_refresh'):
-                    top_menu.force_complete_refresh()
-                    logger.debug("✅ TopMenu force refreshed")
-                elif hasattr(top_menu, 'refresh_theme'):
-                    top_menu.refresh_theme()
-                    logger.debug("✅ TopMenu theme refreshed")
-                
-                logger.debug("✅ TopMenu fully updated")
-            else:
-                logger.warning("⚠️ TopMenu not found for update")
-            
-            # Обновляем overlay изображение (метод существует!)
-            if hasattr(app.root, '_update_overlay'):
-                app.root._update_overlay()
-                logger.debug("✅ Overlay updated")
-            
-            logger.info(f"🎉 Screens + TopMenu recreated! Current: {restore_screen}")
-            
-        except Exception as e:
-            logger.error(f"❌ Screen recreation failed: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-
     def debug_screen_manager(self):
         """Диагностика ScreenManager"""
         try:
@@ -369,22 +282,24 @@ class AutoThemeService:
         except Exception as e:
             logger.error(f"Debug failed: {e}")
 
-    def test_recreation(self):
-        """Тестирование пересоздания экранов + TopMenu"""
+    def test_theme_switch(self):
+        """Тестирование переключения темы на месте: туда и обратно с замером времени"""
         try:
             app = App.get_running_app()
-            logger.info("🧪 Testing screen + TopMenu recreation...")
-            
-            screen_manager = self._find_screen_manager(app)
-            if screen_manager:
-                current = getattr(screen_manager, 'current', 'home')
-                self._recreate_screens_simple(app, screen_manager, current)
-                logger.info("✅ Recreation test completed")
-            else:
-                logger.error("❌ Cannot test - ScreenManager not found")
+            original = getattr(app.theme_manager, 'variant', 'light')
+            other = "dark" if original == "light" else "light"
+            logger.info("🧪 Testing in-place theme switch...")
+            
+            timings = []
+            for variant in (other, original):
+                self._do_switch_theme_on_main_thread(variant)
+                timings.append(round(self._last_switch_ms, 1))
+            logger.info(f"✅ Theme switch test completed: {timings} ms")
+            return timings
                 
         except Exception as e:
-            logger.error(f"❌ Recreation test failed: {e}")
+            logger.error(f"❌ Theme switch test failed: {e}")
+            return None
 
 
 # Валидация модуля
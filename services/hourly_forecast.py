@@ -0,0 +1,327 @@
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from app.logger import app_logger as logger
+
+
+# Sidecar file format: magic, version, first epoch hour, number of hours
+SIDECAR_MAGIC = b"BWHF"
+SIDECAR_VERSION = 1
+SIDECAR_HEADER = struct.Struct("<4sHqI")
+
+# Multi-location store: magic, version, number of series; then per series
+# a name (length-prefixed UTF-8) and a length-prefixed single-series blob
+STORE_MAGIC = b"BWHS"
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct("<4sHI")
+STORE_NAME = struct.Struct("<H")
+STORE_BLOB = struct.Struct("<I")
+
+# Sentinel for missing precipitation / weather code values
+MISSING = -1
+
+# Open-Meteo weather codes that mean precipitation (drizzle, rain, showers, storms)
+RAIN_CODES = frozenset(
+    [51, 53, 55, 56, 57, 61, 63, 65, 66, 67, 80, 81, 82, 95, 96, 99]
+)
+RAIN_PROBABILITY_THRESHOLD = 50
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def current_epoch_hour():
+    """Current UTC hour as an integer number of hours since the epoch"""
+    return int(time.time() // 3600)
+
+
+def _to_epoch_hour(time_str, utc_offset_seconds=None):
+    """
+    Convert an Open-Meteo local time string to an epoch hour
+
+    Args:
+        time_str: ISO time like "2024-05-01T13:00" (local to the location)
+        utc_offset_seconds: Offset reported by the API; device timezone if None
+    """
+    local = datetime.fromisoformat(time_str)
+    if utc_offset_seconds is None:
+        return int(local.timestamp() // 3600)
+    seconds = (local - _EPOCH).total_seconds() - utc_offset_seconds
+    return int(seconds // 3600)
+
+
+def _clamp_byte(value):
+    """Fit an API integer into a signed byte, None becomes MISSING"""
+    if value is None:
+        return MISSING
+    return max(-128, min(127, int(round(value))))
+
+
+class HourlyForecast:
+    """
+    Hourly forecast series kept as typed arrays indexed by epoch hour.
+
+    Index i holds the values for hour start_hour + i, so every point lookup
+    is O(1) and range queries are O(window). Nothing derived is cached:
+    "now" and "+N hours" are evaluated against the clock on every call.
+    """
+
+    def __init__(self, start_hour=0, temperature=None, precipitation=None, weathercode=None):
+        self.start_hour = int(start_hour)
+        self.temperature = temperature if temperature is not None else array("f")
+        self.precipitation = precipitation if precipitation is not None else array("b")
+        self.weathercode = weathercode if weathercode is not None else array("b")
+
+    def __len__(self):
+        return len(self.temperature)
+
+    @property
+    def end_hour(self):
+        """First epoch hour past the end of the series"""
+        return self.start_hour + len(self)
+
+    # ========================================
+    # CONSTRUCTION
+    # ========================================
+
+    @classmethod
+    def from_api(cls, data):
+        """
+        Build the series from an Open-Meteo response
+
+        Args:
+            data: Parsed JSON with an "hourly" block
+        """
+        hourly = data.get("hourly") or {}
+        times = hourly.get("time") or []
+        if not times:
+            return cls()
+
+        offset = data.get("utc_offset_seconds")
+        hours = [_to_epoch_hour(t, offset) for t in times]
+        start = min(hours)
+        count = max(hours) - start + 1
+
+        temperature = array("f", [math.nan]) * count
+        precipitation = array("b", [MISSING]) * count
+        weathercode = array("b", [MISSING]) * count
+
+        temps = hourly.get("temperature_2m") or []
+        precips = hourly.get("precipitation_probability") or []
+        codes = hourly.get("weathercode") or []
+
+        for i, hour in enumerate(hours):
+            idx = hour - start
+            if i < len(temps) and temps[i] is not None:
+                temperature[idx] = temps[i]
+            if i < len(precips):
+                precipitation[idx] = _clamp_byte(precips[i])
+            if i < len(codes):
+                weathercode[idx] = _clamp_byte(codes[i])
+
+        return cls(start, temperature, precipitation, weathercode)
+
+    # ========================================
+    # LOOKUPS
+    # ========================================
+
+    def _index(self, hour):
+        idx = hour - self.start_hour
+        if 0 <= idx < len(self):
+            return idx
+        return None
+
+    def at(self, hour):
+        """
+        Values for one epoch hour
+
+        Returns:
+            Dict with temperature / precipitation_probability / weathercode,
+            or None if the hour is outside the series
+        """
+        idx = self._index(hour)
+        if idx is None:
+            return None
+        temp = self.temperature[idx]
+        precip = self.precipitation[idx]
+        code = self.weathercode[idx]
+        return {
+            "temperature": None if math.isnan(temp) else round(temp, 1),
+            "precipitation_probability": None if precip == MISSING else precip,
+            "weathercode": None if code == MISSING else code,
+        }
+
+    def now(self):
+        """Values for the current hour"""
+        return self.at(current_epoch_hour())
+
+    def in_hours(self, hours):
+        """Values for the hour that is N hours from now"""
+        return self.at(current_epoch_hour() + int(hours))
+
+    def temperature_range(self, hours, start_hour=None):
+        """
+        Min/max temperature over a window
+
+        Args:
+            hours: Window length in hours
+            start_hour: First epoch hour of the window (current hour if None)
+
+        Returns:
+            (min, max) tuple, or None if the window has no data
+        """
+        if start_hour is None:
+            start_hour = current_epoch_hour()
+        first = max(start_hour - self.start_hour, 0)
+        last = min(start_hour + int(hours) - self.start_hour, len(self))
+
+        low, high = math.inf, -math.inf
+        for idx in range(first, last):
+            temp = self.temperature[idx]
+            if temp < low:
+                low = temp
+            if temp > high:
+                high = temp
+        # NaN never wins a comparison, so all-missing windows stay infinite
+        if low == math.inf:
+            return None
+        return round(low, 1), round(high, 1)
+
+    def next_rain_hour(self, start_hour=None, limit=None, threshold=RAIN_PROBABILITY_THRESHOLD):
+        """
+        First hour with expected precipitation
+
+        Args:
+            start_hour: Epoch hour to start from (current hour if None)
+            limit: Maximum number of hours to scan (whole series if None)
+            threshold: Precipitation probability counted as rain
+
+        Returns:
+            Epoch hour, or None if no rain is expected within the window
+        """
+        if start_hour is None:
+            start_hour = current_epoch_hour()
+        first = max(start_hour - self.start_hour, 0)
+        last = len(self)
+        if limit is not None:
+            last = min(last, start_hour + int(limit) - self.start_hour)
+
+        for idx in range(first, last):
+            if self.precipitation[idx] >= threshold or self.weathercode[idx] in RAIN_CODES:
+                return self.start_hour + idx
+        return None
+
+    # ========================================
+    # SIDECAR PERSISTENCE
+    # ========================================
+
+    def to_bytes(self):
+        """Serialize to the compact binary sidecar format (little endian)"""
+        temperature, precipitation, weathercode = self.temperature, self.precipitation, self.weathercode
+        if sys.byteorder == "big":
+            temperature = array("f", temperature)
+            temperature.byteswap()
+        header = SIDECAR_HEADER.pack(SIDECAR_MAGIC, SIDECAR_VERSION, self.start_hour, len(self))
+        return header + temperature.tobytes() + precipitation.tobytes() + weathercode.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """Deserialize the sidecar format; raises ValueError on a bad file"""
+        if len(blob) < SIDECAR_HEADER.size:
+            raise ValueError("hourly sidecar is truncated")
+        magic, version, start_hour, count = SIDECAR_HEADER.unpack_from(blob)
+        if magic != SIDECAR_MAGIC or version != SIDECAR_VERSION:
+            raise ValueError(f"unsupported hourly sidecar ({magic!r} v{version})")
+
+        temp_size = count * array("f").itemsize
+        expected = SIDECAR_HEADER.size + temp_size + 2 * count
+        if len(blob) != expected:
+            raise ValueError(f"hourly sidecar size mismatch: {len(blob)} != {expected}")
+
+        offset = SIDECAR_HEADER.size
+        temperature = array("f")
+        temperature.frombytes(blob[offset:offset + temp_size])
+        if sys.byteorder == "big":
+            temperature.byteswap()
+        offset += temp_size
+        precipitation = array("b")
+        precipitation.frombytes(blob[offset:offset + count])
+        offset += count
+        weathercode = array("b")
+        weathercode.frombytes(blob[offset:offset + count])
+        return cls(start_hour, temperature, precipitation, weathercode)
+
+    def diagnose_state(self):
+        return {
+            "hours": len(self),
+            "start_hour": self.start_hour,
+            "end_hour": self.end_hour,
+            "covers_now": self._index(current_epoch_hour()) is not None,
+        }
+
+
+def save_hourly_store(path, series_by_name):
+    """
+    Atomically write several named series into one sidecar file
+
+    Args:
+        path: Sidecar path
+        series_by_name: {location name: HourlyForecast}
+    """
+    try:
+        parts = [STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(series_by_name))]
+        for name, series in series_by_name.items():
+            encoded = name.encode("utf-8")
+            blob = series.to_bytes()
+            parts.append(STORE_NAME.pack(len(encoded)) + encoded)
+            parts.append(STORE_BLOB.pack(len(blob)) + blob)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(tmp_path, path)
+        logger.debug(f"Saved hourly forecast store ({len(series_by_name)} locations)")
+    except Exception as e:
+        logger.error(f"Error saving hourly forecast store: {e}")
+
+
+def load_hourly_store(path):
+    """
+    Read a sidecar written by save_hourly_store
+
+    Returns:
+        {location name: HourlyForecast}. A single-series sidecar from an older
+        version is returned under the None key. Empty dict if missing or invalid.
+    """
+    try:
+        if not os.path.exists(path):
+            return {}
+        with open(path, "rb") as f:
+            blob = f.read()
+
+        if blob[:4] == SIDECAR_MAGIC:
+            return {None: HourlyForecast.from_bytes(blob)}
+
+        magic, version, count = STORE_HEADER.unpack_from(blob)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError(f"unsupported hourly store ({magic!r} v{version})")
+
+        offset = STORE_HEADER.size
+        result = {}
+        for _ in range(count):
+            (name_len,) = STORE_NAME.unpack_from(blob, offset)
+            offset += STORE_NAME.size
+            name = blob[offset:offset + name_len].decode("utf-8")
+            offset += name_len
+            (blob_len,) = STORE_BLOB.unpack_from(blob, offset)
+            offset += STORE_BLOB.size
+            result[name] = HourlyForecast.from_bytes(blob[offset:offset + blob_len])
+            offset += blob_len
+        return result
+    except Exception as e:
+        logger.warning(f"Could not load hourly forecast store: {e}")
+        return {}
@@ -0,0 +1,403 @@
+# services/ringtone_library.py
+# НОВОЕ: Библиотека рингтонов с кэшем метаданных
+#
+# Один проход по папкам рингтонов (media/ringtones и старые расположения)
+# при старте сервиса. Для каждого файла хранятся длительность, кодек,
+# частота дискретизации, размер и хэш содержимого; они сохраняются в
+# cache/ringtones/index.json и пересчитываются только для новых или
+# изменённых файлов (сравнение размера и mtime).
+#
+# Поиск "имя файла -> путь" - обращение к словарю, поэтому экран будильника
+# и срабатывание будильника не обходят папки и не вызывают stat.
+#
+# Изменения в папках отслеживает watchdog (если установлен); после
+# пересборки публикуется событие ringtones_changed {"names": [...]}.
+# Метаданные читает mutagen, если он установлен, иначе встроенный разбор
+# заголовков WAV / OGG (Vorbis, Opus) / MP3.
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import wave
+
+from app.event_bus import event_bus
+from app.fs_watch import DebouncedWatcher, WATCHDOG_AVAILABLE
+from app.logger import app_logger as logger
+
+try:
+    import mutagen
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    mutagen = None
+    MUTAGEN_AVAILABLE = False
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Порядок важен: при совпадении имён побеждает папка выше в списке
+RINGTONE_DIRS = (
+    os.path.join("media", "ringtones"),
+    os.path.join("assets", "sounds", "ringtones"),
+    os.path.join("sounds", "ringtones"),
+    os.path.join("assets", "ringtones"),
+    "ringtones",
+)
+RINGTONE_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+INDEX_PATH = os.path.join("cache", "ringtones", "index.json")
+INDEX_VERSION = 1
+
+HASH_CHUNK = 1024 * 1024
+
+
+# ========================================
+# РАЗБОР ЗАГОЛОВКОВ (без mutagen)
+# ========================================
+
+# Битрейты MPEG Layer III, кбит/с: MPEG-1 и MPEG-2/2.5
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    25: (11025, 12000, 8000),
+}
+
+
+def _probe_wav(path):
+    with wave.open(path, "rb") as f:
+        rate = f.getframerate()
+        return {"codec": "pcm", "sample_rate": rate, "duration": f.getnframes() / rate if rate else None}
+
+
+def _probe_ogg(path, size):
+    with open(path, "rb") as f:
+        head = f.read(4096)
+        f.seek(max(0, size - 65536))
+        tail = f.read()
+
+    pos = head.find(b"\x01vorbis")
+    if pos >= 0:
+        codec, rate, pre_skip = "vorbis", struct.unpack_from("<I", head, pos + 12)[0], 0
+        granule_rate = rate
+    else:
+        pos = head.find(b"OpusHead")
+        if pos < 0:
+            return {"codec": "ogg"}
+        # Гранулы Opus всегда в 48 кГц, input_rate - исходная частота
+        codec, pre_skip, rate = "opus", *struct.unpack_from("<HI", head, pos + 10)
+        granule_rate = 48000
+
+    last_page = tail.rfind(b"OggS")
+    duration = None
+    if last_page >= 0 and granule_rate:
+        granule = struct.unpack_from("<q", tail, last_page + 6)[0]
+        if granule > 0:
+            duration = (granule - pre_skip) / granule_rate
+    return {"codec": codec, "sample_rate": rate or None, "duration": duration}
+
+
+def _probe_mp3(path, size):
+    with open(path, "rb") as f:
+        data = f.read(65536)
+
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Размер ID3v2 - syncsafe integer (7 бит на байт)
+        tag_size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        offset = 10 + tag_size
+        if offset + 4 > len(data):
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(65536)
+            size -= offset
+            offset = 0
+        else:
+            size -= offset
+
+    for i in range(offset, len(data) - 4):
+        if data[i] != 0xFF or (data[i + 1] & 0xE0) != 0xE0:
+            continue
+        header = struct.unpack_from(">I", data, i)[0]
+        version_bits = (header >> 19) & 0x3
+        layer_bits = (header >> 17) & 0x3
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 0x3
+        if version_bits == 1 or layer_bits != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            continue  # Не Layer III или ложная синхронизация
+
+        version = {3: 1, 2: 2, 0: 25}[version_bits]
+        rate = _MP3_SAMPLE_RATES[version][rate_index]
+        bitrate = _MP3_BITRATES[1 if version == 1 else 2][bitrate_index] * 1000
+        samples_per_frame = 1152 if version == 1 else 576
+
+        # VBR: число кадров в заголовке Xing/Info
+        xing = data.find(b"Xing", i, i + 64)
+        if xing < 0:
+            xing = data.find(b"Info", i, i + 64)
+        if xing >= 0 and struct.unpack_from(">I", data, xing + 4)[0] & 0x1:
+            frames = struct.unpack_from(">I", data, xing + 8)[0]
+            duration = frames * samples_per_frame / rate
+        else:
+            duration = (size - (i - offset)) * 8 / bitrate
+        return {"codec": "mp3", "sample_rate": rate, "duration": duration}
+    return {"codec": "mp3"}
+
+
+def _probe(path, size):
+    """Длительность, кодек и частота дискретизации файла"""
+    if MUTAGEN_AVAILABLE:
+        try:
+            audio = mutagen.File(path)
+            if audio is not None and audio.info is not None:
+                return {
+                    "codec": type(audio).__name__.lower(),
+                    "sample_rate": getattr(audio.info, "sample_rate", None),
+                    "duration": getattr(audio.info, "length", None),
+                }
+        except Exception as e:
+            logger.debug(f"mutagen could not read {path}: {e}")
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".wav":
+        return _probe_wav(path)
+    if ext == ".ogg":
+        return _probe_ogg(path, size)
+    if ext == ".mp3":
+        return _probe_mp3(path, size)
+    return {}
+
+
+def probe_duration(path):
+    """Длительность файла в секундах по заголовку (None, если не удалось)"""
+    try:
+        return _probe(path, os.path.getsize(path)).get("duration")
+    except Exception as e:
+        logger.debug(f"Could not probe duration of {path}: {e}")
+        return None
+
+
+def _content_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ========================================
+# БИБЛИОТЕКА
+# ========================================
+
+class RingtoneLibrary:
+    """
+    НОВОЕ: Индекс рингтонов.
+    names() - отсортированный список имён, path(name) / info(name) - O(1).
+    """
+
+    def __init__(self, base_dir=BASE_DIR, dirs=RINGTONE_DIRS, index_path=INDEX_PATH):
+        self.base_dir = base_dir
+        self.dirs = tuple(dirs)
+        self.index_path = os.path.join(base_dir, index_path)
+
+        # Имя файла -> метаданные (включая абсолютный путь)
+        self._entries = {}
+        self._names = []
+        self._scanned = False
+        self._lock = threading.Lock()
+
+        # Наблюдатель (склейка событий - в DebouncedWatcher)
+        self._watcher = DebouncedWatcher(
+            [os.path.join(base_dir, d) for d in self.dirs], self._rescan, label="ringtones"
+        )
+
+        # Статистика
+        self._scan_count = 0
+        self._scan_ms = 0.0
+        self._probed = 0
+        self._last_scan = None
+
+        logger.info(f"RingtoneLibrary created (mutagen: {MUTAGEN_AVAILABLE})")
+
+    # ========================================
+    # ЖИЗНЕННЫЙ ЦИКЛ СЕРВИСА
+    # ========================================
+
+    def start(self):
+        """Первое сканирование (в потоке реестра) и запуск наблюдателя"""
+        self.scan()
+        self.start_watching()
+
+    def stop(self):
+        self._watcher.stop()
+
+    # ========================================
+    # СКАНИРОВАНИЕ
+    # ========================================
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data.get("files", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ringtone index unreadable, rebuilding: {e}")
+        return {}
+
+    def _save_index(self, files):
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "files": files}, f, indent=1, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.warning(f"Could not save ringtone index: {e}")
+
+    def scan(self):
+        """
+        Обход папок рингтонов. Метаданные берутся из индекса на диске,
+        если размер и mtime файла не изменились. Возвращает True, если
+        список рингтонов или их метаданные изменились
+        """
+        start = time.perf_counter()
+        cached = self._load_index()
+        files = {}
+        entries = {}
+        probed = 0
+
+        for rel_dir in self.dirs:
+            abs_dir = os.path.join(self.base_dir, rel_dir)
+            try:
+                with os.scandir(abs_dir) as it:
+                    dir_entries = [e for e in it if e.is_file() and e.name.lower().endswith(RINGTONE_EXTENSIONS)]
+            except OSError:
+                continue
+
+            for entry in dir_entries:
+                if entry.name in entries:
+                    continue  # Имя уже найдено в приоритетной папке
+                rel_path = os.path.join(rel_dir, entry.name)
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                meta = cached.get(rel_path)
+                if not meta or meta.get("size") != stat.st_size or meta.get("mtime_ns") != stat.st_mtime_ns:
+                    meta = self._describe(entry.path, stat)
+                    probed += 1
+                files[rel_path] = meta
+                if stat.st_size > 0:
+                    entries[entry.name] = dict(meta, name=entry.name, path=entry.path)
+                else:
+                    logger.warning(f"⚠️ Ringtone file is empty: {rel_path}")
+
+        changed = files != cached
+        if changed:
+            self._save_index(files)
+
+        names = sorted(entries)
+        changed = changed or names != self._names
+        with self._lock:
+            self._entries = entries
+            self._names = names
+            self._scanned = True
+
+        self._probed += probed
+        self._scan_count += 1
+        self._scan_ms = (time.perf_counter() - start) * 1000
+        self._last_scan = time.time()
+        logger.info(f"🎵 Ringtones indexed: {len(names)} ({probed} probed) in {self._scan_ms:.0f}ms")
+
+        if changed:
+            event_bus.publish("ringtones_changed", {"names": list(names)})
+        return changed
+
+    def _describe(self, path, stat):
+        """Метаданные нового или изменённого файла"""
+        meta = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "codec": None, "sample_rate": None, "duration": None, "sha1": None}
+        try:
+            meta.update(_probe(path, stat.st_size))
+        except Exception as e:
+            logger.warning(f"Could not read ringtone metadata {path}: {e}")
+        try:
+            meta["sha1"] = _content_hash(path)
+        except OSError as e:
+            logger.warning(f"Could not hash ringtone {path}: {e}")
+        if meta["duration"] is not None:
+            meta["duration"] = round(meta["duration"], 2)
+        return meta
+
+    def ensure_scanned(self):
+        if not self._scanned:
+            self.scan()
+
+    # ========================================
+    # ПОИСК (без обращений к диску)
+    # ========================================
+
+    def names(self):
+        """Отсортированные имена файлов рингтонов"""
+        self.ensure_scanned()
+        return list(self._names)
+
+    def path(self, name):
+        """Абсолютный путь к рингтону по имени файла или None"""
+        self.ensure_scanned()
+        entry = self._entries.get(name)
+        return entry["path"] if entry else None
+
+    def info(self, name):
+        """Метаданные рингтона (duration, codec, sample_rate, size, sha1, path) или None"""
+        self.ensure_scanned()
+        entry = self._entries.get(name)
+        return dict(entry) if entry else None
+
+    def duration(self, path):
+        """Длительность по пути файла (для AudioService) или None, если файл не из библиотеки"""
+        entry = self._entries.get(os.path.basename(path or ""))
+        if entry and os.path.normpath(os.path.abspath(path)) == os.path.normpath(entry["path"]):
+            return entry.get("duration")
+        return None
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    # ========================================
+    # НАБЛЮДЕНИЕ ЗА ПАПКАМИ
+    # ========================================
+
+    def start_watching(self):
+        """Запуск watchdog (без него список обновляется только при старте)"""
+        return self._watcher.start()
+
+    def _rescan(self, paths):
+        try:
+            self.scan()
+        except Exception as e:
+            logger.error(f"Error rescanning ringtones: {e}")
+
+    def diagnose_state(self):
+        """Диагностика библиотеки рингтонов"""
+        return {
+            "ringtones": len(self._names),
+            "dirs": list(self.dirs),
+            "index_path": self.index_path,
+            "scan_count": self._scan_count,
+            "scan_ms": round(self._scan_ms, 2),
+            "probed": self._probed,
+            "last_scan": self._last_scan,
+            "watching": self._watcher.watching,
+            "watchdog_available": WATCHDOG_AVAILABLE,
+            "mutagen_available": MUTAGEN_AVAILABLE,
+            "fs_events": self._watcher.events,
+        }
@@ -8,6 +8,7 @@ import threading
 import re
 from threading import Thread, Lock
 from app.logger import app_logger as logger
+from app.event_bus import event_bus
 
 # GPIO pins for volume buttons
 VOLUME_UP_PIN = 23
@@ -18,6 +19,7 @@ MIN_VOLUME = 0
 MAX_VOLUME = 100
 VOLUME_STEP = 5
 DEBOUNCE_TIME = 0.2  # seconds
+VOLUME_EVENT_MAX_RATE = 10  # НОВОЕ: максимум событий volume_changed в секунду
 
 # USB Audio миксеры (в порядке приоритета для GS3)
 USB_MIXER_PRIORITIES = [
@@ -93,10 +95,16 @@ class VolumeControlService:
         
         logger.info(f"VolumeControlService v{self._service_version} initializing (ID: {self._instance_id})")
         
+        # НОВОЕ: volume_changed - "последнее значение побеждает", пачки от кнопок схлопываются
+        event_bus.declare_topic("volume_changed", latest_only=True, max_rate=VOLUME_EVENT_MAX_RATE)
+        
         # Инициализируем систему
         self._init_usb_audio_system()
         self._init_gpio_system()
         
+        # Текущее значение доступно через event_bus.get_current без подписки
+        event_bus.set_current("volume_changed", {"volume": self._current_volume})
+        
         logger.info(f"VolumeControlService initialization complete")
 
     def _init_usb_audio_system(self):
@@ -469,8 +477,7 @@ class VolumeControlService:
     def _notify_volume_change(self, volume):
         """ИСПРАВЛЕНО: Уведомление об изменении громкости через event_bus"""
         try:
-            # Используем event_bus вместо прямого импорта App
-            from app.event_bus import event_bus
+            # Используем event_bus вместо прямого импорта App (топик с ограничением частоты)
             event_bus.publish("volume_changed", {"volume": volume})
             
             # Callback если установлен
@@ -1,8 +1,16 @@
 import requests
 import json
 import os
+import random
+import threading
+import time
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from app.event_bus import event_bus
 from app.logger import app_logger as logger
+from services.hourly_forecast import (
+    HourlyForecast, current_epoch_hour, load_hourly_store, save_hourly_store
+)
 
 
 # Weather code mapping to readable conditions
@@ -32,33 +40,290 @@ WEATHER_CONDITIONS = {
     99: "Thunderstorm with Heavy Hail"
 }
 
+# Name used when only a single lat/lon is configured
+DEFAULT_LOCATION_NAME = "Home"
+
+# weather.json layout version (2 = per-location store)
+CACHE_FORMAT = 2
+
+# Hours ahead for the short-term forecast shown on HomeScreen
+SHORT_FORECAST_HOURS = 5
+
+# Background refresher timing (seconds)
+REFRESH_CHECK_INTERVAL = 60
+
+# Circuit breaker: open after N consecutive failures, back off exponentially
+BREAKER_FAILURE_THRESHOLD = 2
+BREAKER_BASE_DELAY = 60
+BREAKER_MAX_DELAY = 3600
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# HTTP session settings
+HTTP_TIMEOUT = 10
+HTTP_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "bedrock-weather/2.1",
+}
+
+
+def _parse_cache_control(header):
+    """Parse a Cache-Control header into a {directive: value} dict"""
+    directives = {}
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition("=")
+        directives[name.strip().lower()] = value.strip().strip('"') or True
+    return directives
+
+
+class FetchCircuitBreaker:
+    """
+    Circuit breaker for weather API requests.
+    
+    closed    - requests allowed, consecutive failures are counted
+    open      - requests rejected until the backoff delay passes (callers keep
+                serving the last good data: negative caching of the failure)
+    half_open - exactly one probe request is allowed; success closes the
+                breaker, failure reopens it with a longer delay
+    """
+    
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 base_delay=BREAKER_BASE_DELAY, max_delay=BREAKER_MAX_DELAY):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        
+        self._lock = threading.Lock()
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.last_delay = 0.0
+        self.last_error = None
+        self.last_failure = None
+        self.last_success = None
+        
+        # Statistics
+        self.total_failures = 0
+        self.rejected = 0
+        self.probes = 0
+    
+    def allow_request(self):
+        """Check whether a request may go out now (moves open -> half_open)"""
+        with self._lock:
+            if self.state == BREAKER_CLOSED:
+                return True
+            if self.state == BREAKER_OPEN and time.monotonic() >= self.open_until:
+                self.state = BREAKER_HALF_OPEN
+                self.probes += 1
+                logger.info("Weather circuit half-open, sending probe request")
+                return True
+            # Open, or a probe is already in flight
+            self.rejected += 1
+            return False
+    
+    def seconds_until_retry(self):
+        """Seconds until the next probe is allowed (0 if requests are allowed)"""
+        if self.state != BREAKER_OPEN:
+            return 0.0
+        return max(0.0, self.open_until - time.monotonic())
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != BREAKER_CLOSED:
+                logger.info("Weather circuit closed, API reachable again")
+            self.state = BREAKER_CLOSED
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+            self.last_success = datetime.now().isoformat()
+    
+    def record_failure(self, error, retry_after=None):
+        """
+        Count a failed request and open the circuit if needed
+        
+        Args:
+            error: Short failure description for diagnostics
+            retry_after: Server-provided Retry-After in seconds, if any
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            self.last_error = str(error)
+            self.last_failure = datetime.now().isoformat()
+            
+            if self.state != BREAKER_HALF_OPEN and self.consecutive_failures < self.failure_threshold:
+                return
+            
+            # Exponential backoff with "equal jitter": half fixed, half random
+            exponent = max(0, self.consecutive_failures - self.failure_threshold)
+            delay = min(self.max_delay, self.base_delay * (2 ** exponent))
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            if retry_after:
+                delay = max(delay, min(float(retry_after), self.max_delay))
+            
+            self.state = BREAKER_OPEN
+            self.last_delay = delay
+            self.open_until = time.monotonic() + delay
+            logger.warning(
+                f"Weather circuit open after {self.consecutive_failures} failure(s), "
+                f"next attempt in {delay:.0f}s ({self.last_error})"
+            )
+    
+    def diagnose_state(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": round(self.seconds_until_retry(), 1),
+            "last_delay": round(self.last_delay, 1),
+            "last_error": self.last_error,
+            "last_failure": self.last_failure,
+            "last_success": self.last_success,
+            "total_failures": self.total_failures,
+            "rejected": self.rejected,
+            "probes": self.probes,
+        }
+
+
+def _retry_after_seconds(response):
+    """Parse a numeric Retry-After header (HTTP-date form is ignored)"""
+    try:
+        return max(0, int(response.headers.get("Retry-After", "")))
+    except (TypeError, ValueError):
+        return None
+
+
 class WeatherService:
     """Service for fetching and managing weather data"""
     
-    def __init__(self, lat, lon, path="cache/weather.json", update_interval=6):
+    def __init__(self, lat=None, lon=None, path="cache/weather.json", update_interval=6,
+                 locations=None):
         """
         Initialize the weather service
         
         Args:
-            lat: Latitude
-            lon: Longitude
+            lat: Latitude of the single default location
+            lon: Longitude of the single default location
             path: Path to cache file
             update_interval: Hours between updates
+            locations: Optional list of {"name", "latitude", "longitude"} dicts;
+                all of them are fetched in one batched request. The first one
+                is the primary location used when no location is given.
         """
-        self.lat = lat
-        self.lon = lon
+        self.locations = self._normalize_locations(locations, lat, lon)
         self.path = path
+        self.hourly_path = os.path.splitext(path)[0] + ".hourly.bin"
         self.update_interval = update_interval
-        self.weather = {}
+        
+        # Per-location cache: name -> weather dict / HourlyForecast
+        self._weather = {}
+        self._hourly = {}
+        self._updated = None
         self.api_url = self._build_api_url()
         
+        # Background refresh state: UI code never touches the network
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._refresh_thread = None
+        self._refresh_requested = False
+        self._force_refresh = False
+        self._last_attempt = None
+        self._fetch_count = 0
+        
+        # Failure backoff: offline units stop retrying requests bound to fail
+        self._breaker = FetchCircuitBreaker()
+        
+        # Pooled HTTP session: keep-alive connection and compressed responses
+        self._session = None
+        self._http_cache = {}
+        self._http_stats = {
+            "requests": 0,
+            "not_modified": 0,
+            "fresh_skips": 0,
+            "bytes_wire": 0,
+            "bytes_decoded": 0,
+            "last_status": None,
+            "last_bytes_wire": 0,
+            "last_bytes_decoded": 0,
+            "last_encoding": None,
+            "last_request_ms": None,
+            "last_parse_ms": None,
+        }
+        
         # Load cached data
         self.load()
     
+    @staticmethod
+    def _normalize_locations(locations, lat, lon):
+        """Validate configured locations, falling back to the single lat/lon"""
+        result = []
+        seen = set()
+        for entry in locations or []:
+            try:
+                name = str(entry.get("name") or "").strip() or f"Location {len(result) + 1}"
+                latitude = float(entry["latitude"])
+                longitude = float(entry["longitude"])
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Ignoring invalid weather location {entry!r}: {e}")
+                continue
+            if name in seen:
+                logger.warning(f"Duplicate weather location name ignored: {name}")
+                continue
+            seen.add(name)
+            result.append({"name": name, "latitude": latitude, "longitude": longitude})
+        
+        if not result:
+            result.append({"name": DEFAULT_LOCATION_NAME, "latitude": lat, "longitude": lon})
+        return result
+
+    # Primary location shortcuts (single-location callers)
+
+    @property
+    def primary_location(self):
+        return self.locations[0]["name"]
+
+    @property
+    def lat(self):
+        return self.locations[0]["latitude"]
+
+    @property
+    def lon(self):
+        return self.locations[0]["longitude"]
+
+    @property
+    def weather(self):
+        """Cached data of the primary location"""
+        return self._weather.get(self.primary_location) or {}
+
+    @property
+    def hourly(self):
+        """Hourly series of the primary location"""
+        return self._hourly.get(self.primary_location) or HourlyForecast()
+
+    def get_locations(self):
+        """Get configured location names, primary first"""
+        return [loc["name"] for loc in self.locations]
+
+    def _resolve_location(self, location):
+        """Map an optional location name to a configured one"""
+        if location is None:
+            return self.primary_location
+        if any(loc["name"] == location for loc in self.locations):
+            return location
+        logger.warning(f"Unknown weather location '{location}', using {self.primary_location}")
+        return self.primary_location
+    
     def _build_api_url(self):
-        """Build the Open-Meteo API URL with appropriate parameters"""
+        """Build the Open-Meteo API URL; all locations go into one request"""
+        latitudes = ",".join(str(loc["latitude"]) for loc in self.locations)
+        longitudes = ",".join(str(loc["longitude"]) for loc in self.locations)
         return (
-            f"https://api.open-meteo.com/v1/forecast?latitude={self.lat}&longitude={self.lon}"
+            f"https://api.open-meteo.com/v1/forecast?latitude={latitudes}&longitude={longitudes}"
             f"&current_weather=true"
             f"&hourly=temperature_2m,precipitation_probability,weathercode"
             f"&daily=weathercode,temperature_2m_max,temperature_2m_min,precipitation_probability_max"
@@ -66,20 +331,43 @@ class WeatherService:
         )
 
     def load(self):
+        names = self.get_locations()
         try:
             if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
                 logger.warning("weather.json is missing or empty, creating default data")
-                self.weather = self._create_default_data()
+                self._weather = {name: self._create_default_data() for name in names}
                 self.save()
                 return
             with open(self.path, "r", encoding="utf-8") as f:
                 data = f.read().strip()
                 if not data:
                     raise ValueError("weather.json is empty")
-                self.weather = json.loads(data)
+                data = json.loads(data)
+            
+            if data.get("format") == CACHE_FORMAT:
+                stored = data.get("locations") or {}
+                updated = data.get("updated")
+            else:
+                # Single-location cache from an older version belongs to the primary location
+                stored = {self.primary_location: data}
+                updated = data.get("updated")
+            
+            self._weather = {
+                name: stored.get(name) or self._create_default_data() for name in names
+            }
+            # A newly configured location has no data yet - refresh everything
+            self._updated = updated if all(name in stored for name in names) else None
+            self._http_cache = dict(data.get("http_cache") or {})
+            
+            # Hourly series live in a binary sidecar next to the JSON cache
+            series = load_hourly_store(self.hourly_path)
+            if None in series:
+                series[self.primary_location] = series.pop(None)
+            self._hourly = {name: series[name] for name in names if name in series}
         except Exception as e:
             logger.error(f"[Error loading weather data] {e}")
-            self.weather = self._create_default_data()
+            self._weather = {name: self._create_default_data() for name in names}
+            self._updated = None
             self.save()
 
 
@@ -99,132 +387,304 @@ class WeatherService:
                 "precipitation_probability": 0
             },
             "weekly_forecast": [],
-            "updated": datetime.now().isoformat()
+            # No timestamp: placeholder data is always stale
+            "updated": None
         }
 
     def save(self):
-        """Save weather data to cache file"""
+        """Save weather data of all locations to the cache file"""
         try:
             # Create cache directory if it doesn't exist
             os.makedirs(os.path.dirname(self.path), exist_ok=True)
             
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self.weather, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                store = {
+                    "format": CACHE_FORMAT,
+                    "updated": self._updated,
+                    "http_cache": dict(self._http_cache),
+                    "locations": dict(self._weather),
+                }
+            
+            # Atomic write: the refresher thread may save while the app exits
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(store, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
             logger.debug("Saved weather data to cache")
         except Exception as e:
             logger.error(f"Error saving weather data: {e}", exc_info=True)
 
     def needs_update(self):
         """Check if weather data needs to be updated"""
-        updated = self.weather.get("updated")
-        if not updated:
+        age = self.get_age_seconds()
+        if age is None:
             return True
+        # Check if update interval has passed
+        return age > timedelta(hours=self.update_interval).total_seconds()
+
+    def get_age_seconds(self):
+        """
+        Get the age of the cached weather data
+        
+        Returns:
+            Seconds since the last successful update, or None if unknown
+        """
+        updated = self._updated
+        if not updated:
+            return None
             
         try:
             last = datetime.fromisoformat(updated)
-            # Check if update interval has passed
-            return (datetime.now() - last) > timedelta(hours=self.update_interval)
+            return max(0.0, (datetime.now() - last).total_seconds())
         except Exception as e:
             logger.error(f"Error checking update time: {e}")
-            return True
+            return None
+
+    def _get_session(self):
+        """Create the pooled HTTP session on first use"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HTTP_HEADERS)
+            self._session = session
+        return self._session
+
+    def _conditional_headers(self):
+        """Build If-None-Match / If-Modified-Since from the stored validators"""
+        cache = self._http_cache
+        if cache.get("url") != self.api_url or not self._updated:
+            return {}
+        headers = {}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+        return headers
+
+    def _is_http_fresh(self):
+        """Check whether Cache-Control max-age from the last response still holds"""
+        cache = self._http_cache
+        fresh_until = cache.get("fresh_until")
+        if cache.get("url") != self.api_url or not fresh_until:
+            return False
+        try:
+            return datetime.now() < datetime.fromisoformat(fresh_until)
+        except ValueError:
+            return False
+
+    def _store_validators(self, response):
+        """Remember ETag / Last-Modified / Cache-Control of a response"""
+        directives = _parse_cache_control(response.headers.get("Cache-Control"))
+        if "no-store" in directives:
+            self._http_cache = {}
+            return
+
+        cache = {"url": self.api_url}
+        # 304 responses may omit validators - keep the previous ones
+        previous = self._http_cache if self._http_cache.get("url") == self.api_url else {}
+        etag = response.headers.get("ETag") or previous.get("etag")
+        last_modified = response.headers.get("Last-Modified") or previous.get("last_modified")
+        if etag:
+            cache["etag"] = etag
+        if last_modified:
+            cache["last_modified"] = last_modified
+
+        if "no-cache" not in directives:
+            try:
+                max_age = int(directives.get("max-age", 0))
+                age = int(response.headers.get("Age", 0))
+            except (TypeError, ValueError):
+                max_age, age = 0, 0
+            if max_age - age > 0:
+                cache["fresh_until"] = (datetime.now() + timedelta(seconds=max_age - age)).isoformat()
 
-    def fetch_weather(self):
-        """Fetch weather data from Open-Meteo API"""
+        self._http_cache = cache
+
+    def _record_response(self, response, elapsed_ms):
+        """Account wire/decoded byte sizes of a response"""
+        decoded = len(response.content)
+        wire = 0
+        try:
+            # urllib3 counts raw (compressed) bytes read from the socket
+            wire = int(response.raw.tell())
+        except Exception:
+            wire = 0
+        if not wire:
+            wire = int(response.headers.get("Content-Length") or decoded)
+
+        stats = self._http_stats
+        stats["requests"] += 1
+        stats["bytes_wire"] += wire
+        stats["bytes_decoded"] += decoded
+        stats["last_status"] = response.status_code
+        stats["last_bytes_wire"] = wire
+        stats["last_bytes_decoded"] = decoded
+        stats["last_encoding"] = response.headers.get("Content-Encoding")
+        stats["last_request_ms"] = round(elapsed_ms, 2)
+
+    def fetch_weather(self, force=False):
+        """
+        Fetch weather data from Open-Meteo API
+        
+        Args:
+            force: Ignore Cache-Control freshness (validators are still sent)
+        
+        Returns:
+            True if the cached data is up to date after the call
+        """
         try:
-            logger.info(f"Fetching weather for lat={self.lat}, lon={self.lon}")
+            if not force and self._is_http_fresh():
+                self._http_stats["fresh_skips"] += 1
+                logger.debug("Weather response still fresh per Cache-Control, skipping request")
+                return True
+            
+            # Circuit open: keep serving the last good data without trying
+            if not self._breaker.allow_request():
+                logger.debug(f"Weather circuit open, next attempt in {self._breaker.seconds_until_retry():.0f}s")
+                return False
+            
+            logger.info(f"Fetching weather for {len(self.locations)} location(s): {', '.join(self.get_locations())}")
+            
+            # Fetch data with timeout over the pooled keep-alive session
+            start = time.perf_counter()
+            response = self._get_session().get(
+                self.api_url, headers=self._conditional_headers(), timeout=HTTP_TIMEOUT
+            )
+            self._record_response(response, (time.perf_counter() - start) * 1000)
             
-            # Fetch data with timeout
-            response = requests.get(self.api_url, timeout=10)
+            # Data unchanged on the server - only the timestamp moves
+            if response.status_code == 304:
+                self._http_stats["not_modified"] += 1
+                self._store_validators(response)
+                now = datetime.now().isoformat()
+                with self._lock:
+                    self._weather = {
+                        name: dict(weather, updated=now) for name, weather in self._weather.items()
+                    }
+                    self._updated = now
+                self.save()
+                self._breaker.record_success()
+                logger.info("Weather data not modified (304)")
+                self._publish_update(not_modified=True)
+                return True
             
             # Check if request was successful
             if response.status_code != 200:
                 logger.error(f"API request failed with status code {response.status_code}")
+                self._breaker.record_failure(
+                    f"HTTP {response.status_code}", retry_after=_retry_after_seconds(response)
+                )
                 return False
                 
             # Parse JSON response
+            parse_start = time.perf_counter()
             data = response.json()
             logger.debug(f"Received weather data from API")
             
             # Process the API response
             self._process_api_response(data)
+            self._http_stats["last_parse_ms"] = round((time.perf_counter() - parse_start) * 1000, 2)
+            
+            self._store_validators(response)
             
             # Save to cache
             self.save()
+            with self._lock:
+                hourly = dict(self._hourly)
+            save_hourly_store(self.hourly_path, hourly)
+            self._fetch_count += 1
+            self._breaker.record_success()
+            
+            self._publish_update(not_modified=False)
             return True
             
         except requests.exceptions.Timeout:
             logger.error("Weather API request timed out")
+            self._breaker.record_failure("timeout")
             return False
         except requests.exceptions.ConnectionError:
             logger.error("Connection error while fetching weather data")
+            self._breaker.record_failure("connection error")
             return False
         except Exception as e:
             logger.error(f"Error fetching weather: {e}", exc_info=True)
+            self._breaker.record_failure(e)
             return False
+
+    def _publish_update(self, not_modified):
+        """Notify subscribers that new weather data landed"""
+        stats = self._http_stats
+        event_bus.publish("weather_updated", {
+            "updated": self._updated,
+            "age_seconds": 0.0,
+            "locations": self.get_locations(),
+            "not_modified": not_modified,
+            "bytes_wire": stats["last_bytes_wire"],
+            "bytes_decoded": stats["last_bytes_decoded"],
+            "parse_ms": None if not_modified else stats["last_parse_ms"],
+        })
     
     def _process_api_response(self, data):
-        """Process the API response and update weather data"""
-        try:
-            now = datetime.now()
-            
-            # Extract time data
-            times = data["hourly"]["time"]
+        """
+        Process the API response and update weather data of all locations
+        
+        Args:
+            data: Parsed JSON; a list with one entry per location for batched
+                requests, a single object when one location is configured
+        """
+        items = data if isinstance(data, list) else [data]
+        if len(items) != len(self.locations):
+            raise ValueError(f"Expected {len(self.locations)} locations in response, got {len(items)}")
+        
+        now = datetime.now()
+        weather_by_location, hourly_by_location = {}, {}
+        for location, item in zip(self.locations, items):
+            weather, hourly = self._process_location(item, now)
+            weather_by_location[location["name"]] = weather
+            hourly_by_location[location["name"]] = hourly
+        
+        # Swap in one step so readers never see a half-built store
+        with self._lock:
+            self._weather = weather_by_location
+            self._hourly = hourly_by_location
+            self._updated = now.isoformat()
+        
+        logger.info("Weather data updated successfully")
 
+    def _process_location(self, data, now):
+        """Build the cached weather dict and hourly series for one location"""
+        try:
             # Current weather
             current = data["current_weather"]
 
-            # Find 5-hour forecast index
-            t_5h = (now + timedelta(hours=5)).replace(minute=0, second=0, microsecond=0).isoformat()
-            try:
-                idx_5h = times.index(t_5h)
-            except ValueError:
-                idx_5h = -1
-
-            # If no 5-hour forecast, look for closest alternative
-            if idx_5h < 0:
-                # Try same time tomorrow
-                t_24h = (now + timedelta(hours=24)).replace(minute=0, second=0, microsecond=0).isoformat()
-                try:
-                    idx_5h = times.index(t_24h)
-                except ValueError:
-                    # fallback — closest future time
-                    idx_5h = next((i for i, t in enumerate(times) if t > now.isoformat()), 0)
-
-            # Extract 5-hour forecast if available
-            if idx_5h >= 0 and idx_5h < len(data["hourly"]["temperature_2m"]):
-                forecast_5h = {
-                    "temperature": data["hourly"]["temperature_2m"][idx_5h],
-                    "precipitation_probability": data["hourly"]["precipitation_probability"][idx_5h],
-                    "weathercode": data["hourly"]["weathercode"][idx_5h]
-                }
-            else:
-                forecast_5h = {}
+            # Hourly series indexed by epoch hour - lookups are evaluated on demand
+            hourly = HourlyForecast.from_api(data)
+            forecast_5h = self._describe_hour(hourly.in_hours(SHORT_FORECAST_HOURS))
+            hour_now = hourly.now() or {}
             
             # Get text conditions
             current_condition = WEATHER_CONDITIONS.get(current.get("weathercode", -1), "Unknown")
-            forecast_condition = WEATHER_CONDITIONS.get(forecast_5h.get("weathercode", -1), "Unknown") if forecast_5h else "Unknown"
             
             # Process weekly forecast data
             weekly_forecast = self._process_weekly_forecast(data)
             
             # Build weather data structure
-            self.weather = {
+            weather = {
                 "current": {
                     "time": current.get("time", now.isoformat()),
                     "temperature": current.get("temperature", 0),
                     "condition": current_condition,
-                    "precipitation_probability": data["hourly"]["precipitation_probability"][0] if "hourly" in data and "precipitation_probability" in data["hourly"] and len(data["hourly"]["precipitation_probability"]) > 0 else 0,
-                },
-                "forecast_5h": {
-                    "temperature": forecast_5h.get("temperature"),
-                    "condition": forecast_condition,
-                    "precipitation_probability": forecast_5h.get("precipitation_probability")
+                    "precipitation_probability": hour_now.get("precipitation_probability") or 0,
                 },
+                # Snapshot for older readers of weather.json; get_weather() recomputes it
+                "forecast_5h": forecast_5h,
                 "weekly_forecast": weekly_forecast,
                 "updated": now.isoformat()
             }
             
-            logger.info("Weather data updated successfully")
+            return weather, hourly
             
         except Exception as e:
             logger.error(f"Error processing weather data: {e}", exc_info=True)
@@ -275,28 +735,237 @@ class WeatherService:
             
         return weekly_forecast
 
-    def get_weather(self):
-        """Get current weather data, updating if needed"""
-        if self.needs_update():
-            logger.info("Weather data needs update, fetching...")
-            self.fetch_weather()
-        return self.weather
-    def get_current_weather(self):
+    def get_weather(self, location=None):
+        """
+        Get cached weather data immediately, never blocking on the network
+        
+        Args:
+            location: Location name (primary location if None)
+        
+        Returns:
+            Copy of the cached data with "age_seconds" (None if unknown) and
+            "stale" keys. Stale data triggers a background refresh; subscribe
+            to "weather_updated" to be notified when fresh data lands.
+        """
+        name = self._resolve_location(location)
+        with self._lock:
+            weather = dict(self._weather.get(name) or self._create_default_data())
+            hourly = self._hourly.get(name) or HourlyForecast()
+        weather["location"] = name
+        weather["age_seconds"] = self.get_age_seconds()
+        weather["stale"] = self.needs_update()
+        self._apply_hourly(weather, hourly)
+        if weather["stale"]:
+            self.request_refresh()
+        return weather
+
+    def get_current_weather(self, location=None):
         """Get current weather data only (compatibility method)"""
-        weather_data = self.get_weather()
+        weather_data = self.get_weather(location)
         return weather_data.get("current", {})
 
-    def get_forecast_5h(self):
+    def get_forecast_5h(self, location=None):
         """Get 5-hour forecast data only"""
-        weather_data = self.get_weather()
-        return weather_data.get("forecast_5h", {})
+        return self.get_forecast_in(SHORT_FORECAST_HOURS, location)
 
-    def get_weekly_forecast(self):
+    def get_weekly_forecast(self, location=None):
         """Get weekly forecast data only"""
-        weather_data = self.get_weather()
+        weather_data = self.get_weather(location)
         return weather_data.get("weekly_forecast", [])
     
+    # ========================================
+    # HOURLY LOOKUPS
+    # ========================================
+
+    def _describe_hour(self, values):
+        """Turn raw hourly values into the forecast dict used by the UI"""
+        if not values:
+            return {}
+        return {
+            "temperature": values["temperature"],
+            "condition": WEATHER_CONDITIONS.get(values["weathercode"], "Unknown"),
+            "precipitation_probability": values["precipitation_probability"],
+        }
+
+    def _apply_hourly(self, weather, hourly):
+        """
+        Replace time-dependent fields with values for the current clock hour
+        
+        Args:
+            weather: Copy of the cached data to update in place
+            hourly: HourlyForecast snapshot
+        """
+        if not len(hourly):
+            return
+        
+        hour_now = hourly.now()
+        if hour_now:
+            current = dict(weather.get("current") or {})
+            age = weather.get("age_seconds")
+            # The observed temperature is only better than the series within its own hour
+            if age is None or age >= 3600:
+                if hour_now["temperature"] is not None:
+                    current["temperature"] = hour_now["temperature"]
+                if hour_now["weathercode"] is not None:
+                    current["condition"] = WEATHER_CONDITIONS.get(hour_now["weathercode"], "Unknown")
+            if hour_now["precipitation_probability"] is not None:
+                current["precipitation_probability"] = hour_now["precipitation_probability"]
+            weather["current"] = current
+        
+        forecast = self._describe_hour(hourly.in_hours(SHORT_FORECAST_HOURS))
+        if forecast:
+            weather["forecast_5h"] = forecast
+
+    def _get_hourly(self, location):
+        name = self._resolve_location(location)
+        with self._lock:
+            return name, self._hourly.get(name) or HourlyForecast()
+
+    def get_forecast_in(self, hours, location=None):
+        """
+        Get the forecast for the hour N hours from now
+        
+        Args:
+            hours: Offset from the current hour
+            location: Location name (primary location if None)
+        
+        Returns:
+            Dict with temperature / condition / precipitation_probability,
+            empty if the hour is not covered by the cached series
+        """
+        name, hourly = self._get_hourly(location)
+        forecast = self._describe_hour(hourly.in_hours(hours))
+        if not forecast and hours == SHORT_FORECAST_HOURS:
+            # No hourly series yet (old cache) - fall back to the stored snapshot
+            return dict((self._weather.get(name) or {}).get("forecast_5h") or {})
+        return forecast
+
+    def get_temperature_range(self, hours=24, location=None):
+        """
+        Get min/max temperature over the next hours
+        
+        Returns:
+            (min, max) tuple or None if there is no data
+        """
+        return self._get_hourly(location)[1].temperature_range(hours)
+
+    def get_next_rain(self, limit=None, location=None):
+        """
+        Get the next hour with expected precipitation
+        
+        Args:
+            limit: Hours to look ahead (whole forecast if None)
+            location: Location name (primary location if None)
+        
+        Returns:
+            Dict with "in_hours" and local "time", or None if no rain expected
+        """
+        hourly = self._get_hourly(location)[1]
+        hour = hourly.next_rain_hour(limit=limit)
+        if hour is None:
+            return None
+        return {
+            "in_hours": hour - current_epoch_hour(),
+            "time": datetime.fromtimestamp(hour * 3600).isoformat(timespec="minutes"),
+            "precipitation_probability": hourly.at(hour)["precipitation_probability"],
+        }
+
     def force_update(self):
-        """Force an immediate update of weather data"""
+        """Force a weather request in the background, ignoring Cache-Control max-age"""
         logger.info("Forcing weather update")
-        return self.fetch_weather()
\ No newline at end of file
+        self.request_refresh(force=True, ignore_max_age=True)
+        return True
+
+    # ========================================
+    # BACKGROUND REFRESH
+    # ========================================
+
+    def start(self):
+        """Start the background refresh thread"""
+        with self._lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop,
+                name="WeatherRefresh",
+                daemon=True
+            )
+            self._refresh_thread.start()
+        logger.info("Weather refresher started")
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop_event.set()
+        self._wake_event.set()
+        thread = self._refresh_thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        self._refresh_thread = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        logger.info("Weather refresher stopped")
+
+    def request_refresh(self, force=False, ignore_max_age=False):
+        """
+        Ask the refresher thread to fetch new data; returns immediately
+        
+        Args:
+            force: Refresh even if the update interval has not passed yet
+            ignore_max_age: Also send the request while Cache-Control max-age holds
+        """
+        if ignore_max_age:
+            self._force_refresh = True
+        if force or ignore_max_age:
+            self._refresh_requested = True
+        if self._refresh_thread is None and not self._stop_event.is_set():
+            self.start()
+        self._wake_event.set()
+
+    def _refresh_due(self):
+        """Decide whether the refresher should hit the API now"""
+        # Requests made while the circuit is open wait for the probe
+        if self._breaker.seconds_until_retry() > 0:
+            return False
+        return self._refresh_requested or self.needs_update()
+
+    def _refresh_loop(self):
+        """Refresher thread: fetch when data is stale or a refresh is requested"""
+        while not self._stop_event.is_set():
+            # Clear before checking so a request made during a fetch isn't lost
+            self._wake_event.clear()
+            try:
+                if self._refresh_due():
+                    forced = self._force_refresh
+                    self._refresh_requested = False
+                    self._force_refresh = False
+                    self._last_attempt = datetime.now()
+                    # Requested refreshes honor Cache-Control max-age unless forced
+                    self.fetch_weather(force=forced)
+            except Exception as e:
+                logger.error(f"Error in weather refresher: {e}")
+            
+            # Wake up in time for the half-open probe
+            retry_in = self._breaker.seconds_until_retry()
+            timeout = min(REFRESH_CHECK_INTERVAL, retry_in) if retry_in > 0 else REFRESH_CHECK_INTERVAL
+            self._wake_event.wait(timeout)
+
+    def diagnose_state(self):
+        """Diagnostic snapshot of the weather service"""
+        thread = self._refresh_thread
+        return {
+            "locations": self.locations,
+            "updated": self._updated,
+            "age_seconds": self.get_age_seconds(),
+            "needs_update": self.needs_update(),
+            "refresher_running": bool(thread and thread.is_alive()),
+            "refresh_requested": self._refresh_requested,
+            "force_refresh": self._force_refresh,
+            "last_attempt": self._last_attempt.isoformat() if self._last_attempt else None,
+            "breaker": self._breaker.diagnose_state(),
+            "fetch_count": self._fetch_count,
+            "hourly": {name: series.diagnose_state() for name, series in self._hourly.items()},
+            "http_cache": dict(self._http_cache),
+            "http": dict(self._http_stats),
+        }
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Conditional-request behaviour of WeatherService against a local stand-in server"""
+
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.weather_service import WeatherService
+
+ETAG = '"fixture-v1"'
+
+
+def _fixture():
+    """Minimal Open-Meteo response for one location"""
+    start = datetime.now().replace(minute=0, second=0, microsecond=0)
+    hours = [start + timedelta(hours=i) for i in range(48)]
+    days = [start.date() + timedelta(days=i) for i in range(7)]
+    return {
+        "utc_offset_seconds": 0,
+        "current_weather": {"time": start.isoformat(timespec="minutes"), "temperature": 12.5, "weathercode": 1},
+        "hourly": {
+            "time": [h.isoformat(timespec="minutes") for h in hours],
+            "temperature_2m": [10.0 + i % 5 for i in range(48)],
+            "precipitation_probability": [i % 100 for i in range(48)],
+            "weathercode": [1] * 48,
+        },
+        "daily": {
+            "time": [d.isoformat() for d in days],
+            "weathercode": [1] * 7,
+            "temperature_2m_max": [15.0] * 7,
+            "temperature_2m_min": [5.0] * 7,
+            "precipitation_probability_max": [20] * 7,
+        },
+    }
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    max_age = 0
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = gzip.compress(json.dumps(_fixture()).encode())
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.send_header("Cache-Control", f"max-age={self.max_age}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _StandIn.requests = []
+    _StandIn.max_age = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def service(server, tmp_path):
+    svc = WeatherService(lat=51.5, lon=-0.17, path=str(tmp_path / "weather.json"))
+    svc.api_url = f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+    yield svc
+    svc.stop()
+
+
+def test_200_then_304_with_validators(service):
+    assert service.fetch_weather()
+    assert _StandIn.requests[0].get("If-None-Match") is None
+    assert service.diagnose_state()["http"]["last_status"] == 200
+
+    assert service.fetch_weather()
+    assert _StandIn.requests[1].get("If-None-Match") == ETAG
+    stats = service.diagnose_state()["http"]
+    assert stats["last_status"] == 304
+    assert stats["not_modified"] == 1
+    assert service.get_weather()["current"]["temperature"] == 12.5
+
+
+def test_max_age_suppresses_requests_unless_forced(service):
+    _StandIn.max_age = 600
+    assert service.fetch_weather()
+    assert service.fetch_weather()
+    assert len(_StandIn.requests) == 1
+    assert service.diagnose_state()["http"]["fresh_skips"] == 1
+
+    assert service.fetch_weather(force=True)
+    assert len(_StandIn.requests) == 2
+
+
+def test_force_update_bypasses_max_age(service):
+    _StandIn.max_age = 600
+    assert service.fetch_weather()
+
+    done = threading.Event()
+    service._publish_update = lambda **kwargs: done.set()
+    service.force_update()
+    assert done.wait(5)
+    assert len(_StandIn.requests) == 2
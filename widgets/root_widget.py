@@ -6,6 +6,7 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.app import App
 from app.event_bus import event_bus
 from app.logger import app_logger as logger
+from app.screen_factory import ScreenFactory, DEFAULT_CACHE_SIZE
 
 
 class RootWidget(FloatLayout):
@@ -16,11 +17,12 @@ class RootWidget(FloatLayout):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # ИСПРАВЛЕНО: Подписка на полное обновление темы + overlay
-        event_bus.subscribe("theme_changed", self.refresh_theme_completely)
+        event_bus.subscribe("theme_changed", self.refresh_theme_completely, mode="main_thread")
         
         # Инициализируем screen_manager как None
         # Будет установлен после загрузки KV файла
         self.screen_manager = None
+        self.screen_factory = None
 
     def on_kv_post(self, base_widget):
         """Вызывается после загрузки KV файла"""
@@ -29,11 +31,22 @@ class RootWidget(FloatLayout):
             if hasattr(self, 'ids') and 'sm' in self.ids:
                 self.screen_manager = self.ids.sm
                 logger.debug("screen_manager initialized from KV")
+                self._setup_screen_factory()
             else:
                 logger.warning("ScreenManager 'sm' not found in KV file")
         except Exception as e:
             logger.error(f"Error in RootWidget on_kv_post: {e}")
 
+    def _setup_screen_factory(self):
+        """НОВОЕ: Ленивая фабрика экранов - создаётся только стартовый экран"""
+        max_alive = DEFAULT_CACHE_SIZE
+        app = App.get_running_app()
+        if hasattr(app, 'user_config') and app.user_config:
+            max_alive = app.user_config.get("screen_cache_size", DEFAULT_CACHE_SIZE)
+
+        self.screen_factory = ScreenFactory(self.screen_manager, max_alive=max_alive)
+        self.screen_factory.show(self.current_page)
+
     def get_theme_manager(self):
         """Безопасное получение theme_manager"""
         app = App.get_running_app()
@@ -43,36 +56,27 @@ class RootWidget(FloatLayout):
         return None
         
     def switch_screen(self, page_name):
-        """Переключение экрана с улучшенной обработкой ошибок"""
+        """ИСПРАВЛЕНО: Переключение экрана через ленивую фабрику экранов"""
         try:
-            # Метод 1: Используем screen_manager атрибут
-            if self.screen_manager:
-                self.screen_manager.current = page_name
-                self.current_page = page_name
-                
-                # Обновляем overlay для новой страницы
-                self._update_overlay()
-                
-                logger.debug(f"Switched to screen: {page_name}")
-                return True
-                
-            # Метод 2: Используем ids.sm
-            elif hasattr(self, 'ids') and 'sm' in self.ids:
-                self.ids.sm.current = page_name
-                self.current_page = page_name
-                
-                # Устанавливаем screen_manager если не был установлен
-                if not self.screen_manager:
-                    self.screen_manager = self.ids.sm
-                
-                # Обновляем overlay для новой страницы
-                self._update_overlay()
-                
-                logger.debug(f"Switched to screen: {page_name} via ids.sm")
-                return True
-            else:
+            if not self.screen_manager and hasattr(self, 'ids') and 'sm' in self.ids:
+                self.screen_manager = self.ids.sm
+                self._setup_screen_factory()
+
+            if not self.screen_factory:
                 logger.error("ScreenManager not found in root widget - no sm in ids and no screen_manager attribute")
                 return False
+
+            if not self.screen_factory.show(page_name):
+                logger.error(f"Cannot switch to unknown screen: {page_name}")
+                return False
+
+            self.current_page = page_name
+            
+            # Обновляем overlay для новой страницы
+            self._update_overlay()
+            
+            logger.debug(f"Switched to screen: {page_name}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error switching screen to {page_name}: {e}")
@@ -187,6 +191,7 @@ class RootWidget(FloatLayout):
                 "has_sm_in_ids": hasattr(self, 'ids') and 'sm' in self.ids if hasattr(self, 'ids') else False,
                 "screen_manager_type": type(self.screen_manager).__name__ if self.screen_manager else None,
                 "available_screens": list(self.screen_manager.screen_names) if self.screen_manager else [],
+                "screen_factory": self.screen_factory.diagnose_state() if self.screen_factory else None,
                 "theme_manager_available": bool(self.get_theme_manager())
             }
         except Exception as e:
@@ -16,8 +16,8 @@ class TopMenu(BoxLayout):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Подписка на события
-        event_bus.subscribe("language_changed", self.refresh_text)
-        event_bus.subscribe("theme_changed", self.refresh_theme)
+        event_bus.subscribe("language_changed", self.refresh_text, mode="main_thread")
+        event_bus.subscribe("theme_changed", self.refresh_theme, mode="main_thread")
         self._last_refresh_time = 0
         self._refresh_scheduled = False
 